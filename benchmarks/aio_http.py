@@ -0,0 +1,108 @@
+"""Benchmark on-demand figure rendering through scilayout.aio.
+
+A local stand-in HTTP server renders a figure for every request with a
+`scilayout.aio.RenderService`, while concurrent clients measure the latency of each
+request and the overall throughput.
+
+Usage ::
+
+    python benchmarks/aio_http.py --requests 200 --concurrency 16 --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from scilayout import aio, figure
+
+
+def build_figure():
+    """A typical two panel figure with a few hundred points per panel."""
+    fig = figure()
+    fig.set_size_cm(12, 6)
+    rng = np.random.default_rng(0)
+    for n, label in enumerate("ab"):
+        ax = fig.add_panel((1 + 6 * n, 1, 5, 4.5), panellabel=label, method="size")
+        ax.plot(np.cumsum(rng.normal(size=500)))
+        ax.set_xlabel("Time (s)")
+    return fig
+
+
+async def serve(service, fmt, host="127.0.0.1"):
+    """Start an HTTP server that answers every GET with a rendered figure."""
+
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        try:
+            body = await service.render(build_figure, fmt, dpi=150)
+            head = f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n\r\n"
+        except Exception as error:  # report failures to the client
+            body = str(error).encode()
+            head = f"HTTP/1.1 500 Error\r\nContent-Length: {len(body)}\r\n\r\n"
+        writer.write(head.encode() + body)
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, host, 0)
+
+
+async def request(host, port):
+    """Fetch one figure and return the latency in seconds."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"GET /figure HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    status = await reader.readline()
+    headers = await reader.readuntil(b"\r\n\r\n")
+    length = int(headers.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    await reader.readexactly(length)
+    writer.close()
+    if b" 200 " not in status:
+        msg = f"Request failed: {status.decode().strip()}"
+        raise RuntimeError(msg)
+    return time.perf_counter() - start
+
+
+async def main(args):
+    service = aio.RenderService(workers=args.workers, max_pending=args.max_pending)
+    server = await serve(service, args.format)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    # Wait for the workers to warm up before timing
+    await asyncio.gather(*(request(host, port) for _ in range(args.concurrency)))
+
+    queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(None)
+    latencies = []
+
+    async def client():
+        while not queue.empty():
+            queue.get_nowait()
+            latencies.append(await request(host, port))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    server.close()
+    await server.wait_closed()
+    service.close()
+
+    latencies = np.array(latencies) * 1000
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {args.workers} workers")
+    print(f"p50 latency: {np.percentile(latencies, 50):.1f} ms")
+    print(f"p99 latency: {np.percentile(latencies, 99):.1f} ms")
+    print(f"throughput: {args.requests / elapsed:.1f} figures/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--format", default="png")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""Benchmark the png encoding profiles of savefigure.
+
+Exports figures typical of scilayout (a multi-panel figure of line plots, one of
+images and a poster-sized figure) with matplotlib's png encoding and with each
+`png_profile`, and compares the time taken and the file size. The time of a render
+to the raw pixel buffer is shown as well, the rest of an export is mostly encoding.
+The parallel profile only gains with several cpu cores.
+
+Usage ::
+
+    python benchmarks/png_encoding.py --dpi 600 --repeat 3
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from scilayout import Figure, base, strips
+
+
+def line_figure():
+    """A six panel figure of line plots and a scatter plot."""
+    fig = Figure()
+    fig.set_size_cm(18, 12)
+    rng = np.random.default_rng(0)
+    for n in range(6):
+        row, col = divmod(n, 3)
+        ax = fig.add_panel(
+            (1.5 + 5.8 * col, 1 + 5.5 * row, 6 + 5.8 * col, 5 + 5.5 * row),
+            panellabel="abcdef"[n],
+        )
+        if n == 5:
+            ax.scatter(rng.normal(size=2000), rng.normal(size=2000), s=2)
+        else:
+            ax.plot(np.cumsum(rng.normal(size=(500, 3)), axis=0))
+        ax.set_xlabel("Time (s)")
+    return fig
+
+
+def image_figure():
+    """A figure of microscopy-like images with colour bars."""
+    fig = Figure()
+    fig.set_size_cm(18, 9)
+    rng = np.random.default_rng(1)
+    for n in range(3):
+        ax = fig.add_panel((1 + 6 * n, 1, 6 + 6 * n, 6), panellabel="abc"[n])
+        image = ax.imshow(rng.gamma(2, size=(400, 400)), cmap="magma")
+        fig.colorbar(image, ax=ax, location="bottom")
+    return fig
+
+
+def poster_figure():
+    """An A2 poster with a grid of panels."""
+    fig = Figure()
+    fig.set_size_cm(42, 59.4)
+    rng = np.random.default_rng(2)
+    for row in range(4):
+        for col in range(3):
+            ax = fig.add_panel(
+                (3 + 13 * col, 3 + 14 * row, 13 + 13 * col, 13 + 14 * row),
+            )
+            if (row + col) % 2:
+                ax.imshow(rng.random((50, 50)))
+            else:
+                ax.plot(np.cumsum(rng.normal(size=2000)))
+    return fig
+
+
+def best_time(fn, repeat):
+    """The shortest time of several calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main(args):
+    profiles = (None, *strips.PNG_PROFILES)
+    print(f"{os.cpu_count()} cpu cores")
+    for name, build in (
+        ("lines", line_figure),
+        ("images", image_figure),
+        ("poster", poster_figure),
+    ):
+        fig = build()
+        render_time, _ = best_time(
+            lambda fig=fig: base.render_rgba(fig, dpi=args.dpi), args.repeat,
+        )
+        print(f"{name} at {args.dpi:g} dpi, rendering takes {render_time:.2f}s")
+        baseline = None
+        for profile in profiles:
+            seconds, data = best_time(
+                lambda fig=fig, profile=profile: fig.export_bytes(
+                    "png", dpi=args.dpi, png_profile=profile,
+                ),
+                args.repeat,
+            )
+            baseline = baseline or (seconds, len(data))
+            print(
+                f"  {profile or 'matplotlib':>10}: {len(data) / 1e6:6.2f} MB "
+                f"({len(data) / baseline[1]:.2f}x) in {seconds:.2f}s "
+                f"({baseline[0] / seconds:.1f}x faster)",
+            )
+        fig.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--dpi", type=float, default=600.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,59 @@
+"""Benchmark rasterizing dense artists in vector exports.
+
+Exports a figure with a large scatter plot to pdf and svg, once with every artist kept
+as vectors and once with dense artists rasterized, and compares file size and time.
+
+Usage ::
+
+    python benchmarks/rasterize.py --points 1000000 --dpi 300
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from scilayout import Figure, style
+
+
+def build_figure(n_points):
+    """A two panel figure, one panel with a dense scatter and one with a line."""
+    fig = Figure()
+    fig.set_size_cm(16, 7)
+    rng = np.random.default_rng(0)
+    ax = fig.add_panel((1.5, 1, 7.5, 6), panellabel="a")
+    ax.scatter(rng.normal(size=n_points), rng.normal(size=n_points), s=0.5)
+    ax.set_xlabel("x")
+    ax = fig.add_panel((9.5, 1, 15.5, 6), panellabel="b")
+    ax.plot(np.cumsum(rng.normal(size=500)))
+    ax.set_xlabel("Time (s)")
+    return fig
+
+
+def export(fig, fmt, dpi, threshold):
+    """Export the figure and return the size in bytes and the time taken."""
+    start = time.perf_counter()
+    size = len(fig.export_bytes(fmt, dpi=dpi, rasterize_threshold=threshold))
+    return size, time.perf_counter() - start
+
+
+def main(args):
+    fig = build_figure(args.points)
+    threshold = style.params["export.rasterize_threshold"]
+    print(f"{args.points} points, rasterize threshold {threshold}, {args.dpi} dpi")
+    for fmt in ("pdf", "svg"):
+        vector_size, vector_time = export(fig, fmt, args.dpi, math.inf)
+        size, seconds = export(fig, fmt, args.dpi, threshold)
+        print(
+            f"{fmt}: {vector_size / 1e6:.2f} MB in {vector_time:.2f}s as vectors, "
+            f"{size / 1e6:.2f} MB in {seconds:.2f}s rasterized "
+            f"({vector_size / size:.0f}x smaller, {vector_time / seconds:.1f}x faster)",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--dpi", type=float, default=300.0)
+    main(parser.parse_args())
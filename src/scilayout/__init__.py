@@ -9,6 +9,7 @@ __version__ = "0.1.1b1"
 __all__ = ["__version__"]
 # Import dependencies
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 # Import sub-modules
 from . import (
@@ -19,6 +20,9 @@ from . import (
     stats,
     style,
 )
+from .document import export_document
+from .multiples import small_multiples
+from .threaded import export_threaded
 
 # TODO: add sub-modules to __all__ to finalise API
 # __all__ += [
@@ -56,3 +60,31 @@ def figure(**kwargs) -> classes.SciFigure:
         msg = "Cannot set FigureClass in scilayout.figure(), use scilayout.classes.SciFigure instead."
         raise ValueError(msg)
     return plt.figure(FigureClass=classes.SciFigure, **kwargs)
+
+
+def Figure(**kwargs) -> classes.SciFigure:
+    """Create a SciFigure that is not managed by pyplot.
+
+    The figure is attached directly to an Agg canvas instead of going through
+    plt.figure(), so it is never added to pyplot's figure registry and is freed as
+    soon as it is no longer referenced. Use this in servers and other long-running
+    processes that render figures without showing them.
+
+    Keyword arguments are passed to scilayout.classes.SciFigure (and so to
+    matplotlib.figure.Figure).
+
+    Example usage:
+
+    ```python
+    import scilayout
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 6)
+    ax = fig.add_panel((1, 1, 7, 5))
+    png = fig.export_bytes("png")
+    ```
+    :return: SciFigure object with an Agg canvas
+    :rtype: scilayout.classes.SciFigure
+    """
+    fig = classes.SciFigure(**kwargs)
+    FigureCanvasAgg(fig)  # attaches itself to the figure
+    return fig
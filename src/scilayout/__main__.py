@@ -0,0 +1,7 @@
+"""Allow scilayout to be run with `python -m scilayout`."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
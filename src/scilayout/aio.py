@@ -0,0 +1,215 @@
+"""Render figures from asyncio code without blocking the event loop.
+
+Figures are built and exported in a pool of worker processes that have matplotlib,
+pyplot and the fonts loaded before the first request arrives. Figure objects never
+leave the workers, only the exported bytes are returned.
+
+Example usage:
+
+```python
+from scilayout import aio
+
+async def handler(request):
+    spec = {"size": [8, 6], "panels": [{"location": [1, 1, 6, 5], "label": "a"}]}
+    return await aio.render_figure(spec, "png", timeout=10)
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from . import render
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from .classes import SciFigure
+
+
+class RenderService:
+    """A bounded pool of warm worker processes that render figures to bytes.
+
+    At most `max_pending` renders are queued or running at once, further calls to
+    `render` wait for a free slot, which pushes back on whatever is producing requests.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        fork: bool = False,
+    ) -> None:
+        """Start the worker processes.
+
+        Parameters
+        ----------
+        workers : int | None
+            Number of worker processes, defaults to the number of CPUs.
+        max_pending : int | None
+            Number of renders that may be queued or running at once, defaults to
+            twice the number of workers.
+        fork : bool
+            Warm up the current process and fork the workers from it, rather than
+            starting fresh workers that each warm up on their own.
+
+        """
+        if fork:
+            render.warm_up()
+            context = multiprocessing.get_context("fork")
+            initializer = None
+        else:
+            context = multiprocessing.get_context("spawn")
+            initializer = render.warm_up
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=initializer,
+        )
+        self.max_pending = 2 * workers if max_pending is None else max_pending
+        self.pending = 0
+        """Number of renders currently queued or running."""
+        # Slots are freed from the executor's threads, and the service may be awaited
+        # from more than one event loop, so they are counted under a thread lock
+        self._lock = threading.Lock()
+        self._waiters: list[asyncio.Future] = []
+
+    async def _acquire(self) -> None:
+        """Wait for a free slot and take it."""
+        while True:
+            with self._lock:
+                if self.pending < self.max_pending:
+                    self.pending += 1
+                    return
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def _release(self, _: object = None) -> None:
+        """Free a slot and wake the renders waiting for one, from any thread."""
+        with self._lock:
+            self.pending -= 1
+            waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            # Raises if the event loop of the waiting task has closed
+            with contextlib.suppress(RuntimeError):
+                waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    async def render(
+        self,
+        spec: str | Path | dict[str, Any] | Callable[[], SciFigure],
+        format: str = "png",
+        *,
+        timeout: float | None = None,
+        **export_kwargs: Any,
+    ) -> bytes:
+        """Render a figure in a worker process.
+
+        Parameters
+        ----------
+        spec : str | Path | dict | Callable[[], SciFigure]
+            Script or layout specification file, layout specification dictionary
+            (see `scilayout.render`), or a picklable function that returns the figure.
+        format : str
+            File format to export, e.g. "png", "svg" or "pdf".
+        timeout : float | None
+            Seconds to wait for the figure before raising `asyncio.TimeoutError`.
+        export_kwargs : dict
+            Keyword arguments for `scilayout.base.savefigure`.
+
+        Returns
+        -------
+        bytes
+            The exported figure.
+
+        Notes
+        -----
+        If the render times out or the awaiting task is cancelled, a render that has
+        not started is dropped. One that is already running in a worker finishes in the
+        background and keeps its slot until it does.
+
+        """
+        await self._acquire()
+        try:
+            future = self._executor.submit(
+                render.render_bytes, spec, format, **export_kwargs,
+            )
+        except BaseException:
+            self._release()
+            raise
+        # Freed once the worker is done, even if the awaiting loop has closed by then
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            future.cancel()
+            raise
+
+    def close(self, wait: bool = True) -> None:
+        """Shut down the worker processes.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for running renders to finish, queued renders are cancelled.
+
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> RenderService:
+        """Use the service as an async context manager that closes it on exit."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the service without blocking the event loop."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    """Let a render that is waiting for a slot try again."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_default_service: RenderService | None = None
+
+
+async def render_figure(
+    spec: str | Path | dict[str, Any] | Callable[[], SciFigure],
+    format: str = "png",
+    *,
+    timeout: float | None = None,
+    **export_kwargs: Any,
+) -> bytes:
+    """Render a figure to bytes in a shared pool of worker processes.
+
+    The pool is started on first use with default settings, create a `RenderService`
+    to control the number of workers and pending renders.
+    See `RenderService.render` for the parameters.
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = RenderService()
+    return await _default_service.render(
+        spec, format, timeout=timeout, **export_kwargs,
+    )
+
+
+def shutdown() -> None:
+    """Shut down the shared pool used by `render_figure`."""
+    global _default_service
+    if _default_service is not None:
+        _default_service.close()
+        _default_service = None
@@ -0,0 +1,1371 @@
+"""Vector artwork from svg and pdf files, placed into a cm extent of a figure.
+
+Schematics and illustrations drawn in a vector editor are imported as paths, so that
+they are exported together with the rest of the figure instead of being pasted in
+afterwards. A file is parsed once into an `Artwork`: the vertices and path codes of all
+painted paths in two arrays, with their fill and stroke colours, stroke widths and dash
+patterns. The parsed artwork is cached on the hash of the file's content, and the file
+is only read again when its modification time or size changes, so every export and
+every artist showing the same file reuse the parsed geometry. A `VectorArtwork` draws
+it as a single path collection, scaled into a cm extent of the figure or of a panel.
+
+Supported are svg paths, basic shapes, groups, `use` references, `transform`
+attributes and fill and stroke styles (as attributes, `style` attributes and simple
+class, id and element rules of `<style>` sheets, gradients are drawn in the mean
+colour of their stops), and the paths painted by the content stream of the first page
+of a pdf, including form XObjects. Text, images, clipping and the even-odd fill rule
+are not, so convert text to outlines before saving the artwork.
+
+Example usage:
+
+```python
+fig.add_artwork("setup.svg", (1, 1, 8, 5))
+ax = fig.add_panel((9, 1, 14, 5), panellabel="b")
+ax.add_vector_artwork("pathway.pdf")
+ax.set_axis_off()
+```
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import math
+import os
+import re
+import warnings
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+from xml.etree import ElementTree
+
+import numpy as np
+from matplotlib import colors as mcolors
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D, Bbox
+
+if TYPE_CHECKING:
+    from matplotlib.backend_bases import RendererBase
+
+    from .classes import PanelAxes, SciFigure
+
+HAIRLINE = 0.25
+"""Width of zero width pdf strokes, which are drawn as thin as possible, in points."""
+
+CACHE_SIZE = 32
+"""Number of parsed artworks (and of files they were read from) kept."""
+
+# Parsed artworks keyed on the hash of the file content, and the modification time,
+# size and content hash of the files they were read from, least recently used first
+_artworks: OrderedDict[str, Artwork] = OrderedDict()
+_files: OrderedDict[str, tuple[tuple[int, int], str]] = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+_TRANSPARENT = (0.0, 0.0, 0.0, 0.0)
+
+
+def cache_info() -> tuple[int, int, int]:
+    """Hits, misses and size of the cache of parsed artworks."""
+    return _cache_stats["hits"], _cache_stats["misses"], len(_artworks)
+
+
+def clear_cache() -> None:
+    """Forget parsed artworks, files are parsed again when next drawn."""
+    _artworks.clear()
+    _files.clear()
+    _cache_stats.update(hits=0, misses=0)
+
+
+@dataclass
+class Artwork:
+    """Painted paths of a vector file, shared by every artist drawing the file.
+
+    Coordinates are in the units of the file (user units of svg, points of pdf), from
+    the top left corner of the artwork with y down, like cm in a figure.
+    """
+
+    size: tuple[float, float]
+    """Width and height of the artwork."""
+    vertices: np.ndarray
+    """Vertices of all paths, one after the other."""
+    codes: np.ndarray
+    """Path codes of the vertices."""
+    starts: np.ndarray
+    """Index of the first vertex of each path, followed by the number of vertices."""
+    facecolors: np.ndarray
+    """Fill colour of each path, transparent for paths that are not filled."""
+    edgecolors: np.ndarray
+    """Stroke colour of each path, transparent for paths that are not stroked."""
+    linewidths: np.ndarray
+    """Stroke width of each path, in the units of the artwork."""
+    dashes: list[tuple[float, tuple[float, ...] | None]]
+    """Dash offset and pattern of each path, in multiples of its stroke width."""
+    skipped: int = 0
+    """Number of text and image elements that are not drawn."""
+    digest: str = ""
+    """Hash of the file content."""
+
+    def __len__(self) -> int:
+        """Number of paths."""
+        return len(self.starts) - 1
+
+    def paths(self) -> list[Path]:
+        """The paths, as views of the shared vertex and code arrays."""
+        return [
+            Path(self.vertices[start:stop], self.codes[start:stop])
+            for start, stop in zip(self.starts[:-1], self.starts[1:])
+        ]
+
+
+class _Builder:
+    """Collects painted paths into the arrays of an `Artwork`."""
+
+    def __init__(self) -> None:
+        self.vertices: list[np.ndarray] = []
+        self.codes: list[np.ndarray] = []
+        self.facecolors: list[tuple] = []
+        self.edgecolors: list[tuple] = []
+        self.linewidths: list[float] = []
+        self.dashes: list[tuple[float, tuple[float, ...] | None]] = []
+        self.skipped = 0
+
+    def add(
+        self,
+        vertices: np.ndarray,
+        codes: np.ndarray,
+        face: tuple | None,
+        edge: tuple | None,
+        linewidth: float,
+        dashes: tuple[float, tuple[float, ...] | None] = (0.0, None),
+    ) -> None:
+        """Add a path with its paint, stroke width and dashes in artwork units."""
+        if face is None and (edge is None or linewidth <= 0):
+            return
+        if not np.isin(codes, (Path.LINETO, Path.CURVE3, Path.CURVE4)).any():
+            return
+        if edge is None or linewidth <= 0:
+            edge, linewidth, dashes = None, 0.0, (0.0, None)
+        offset, pattern = dashes
+        if pattern is not None:
+            pattern = tuple(length / linewidth for length in pattern)
+            offset /= linewidth
+        self.vertices.append(vertices)
+        self.codes.append(codes)
+        self.facecolors.append(_TRANSPARENT if face is None else face)
+        self.edgecolors.append(_TRANSPARENT if edge is None else edge)
+        self.linewidths.append(linewidth)
+        self.dashes.append((offset, pattern))
+
+    def build(self, size: tuple[float, float], name: str) -> Artwork:
+        """The artwork of the paths added."""
+        if not self.codes:
+            msg = f"{name} has no paths to draw"
+            raise ValueError(msg)
+        return Artwork(
+            size=(float(size[0]), float(size[1])),
+            vertices=np.concatenate(self.vertices),
+            codes=np.concatenate(self.codes).astype(Path.code_type),
+            starts=np.cumsum([0, *map(len, self.codes)]),
+            facecolors=np.array(self.facecolors, dtype=float),
+            edgecolors=np.array(self.edgecolors, dtype=float),
+            linewidths=np.array(self.linewidths, dtype=float),
+            dashes=self.dashes,
+            skipped=self.skipped,
+        )
+
+
+def _stroke_scale(matrix: np.ndarray) -> float:
+    """How much a transformation scales stroke widths, on average over directions."""
+    return math.sqrt(abs(np.linalg.det(matrix[:2, :2])))
+
+
+# --- svg ---
+_SVG_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_SVG_LENGTH = re.compile(
+    rf"\s*({_SVG_NUMBER.pattern})\s*(px|pt|pc|mm|cm|in|em|ex|%)?\s*",
+)
+_SVG_UNITS = {
+    None: 1.0,
+    "px": 1.0,
+    "pt": 96 / 72,
+    "pc": 16.0,
+    "mm": 96 / 25.4,
+    "cm": 96 / 2.54,
+    "in": 96.0,
+    "em": 16.0,
+    "ex": 8.0,
+}
+_SVG_TRANSFORM = re.compile(
+    r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)",
+)
+_SVG_SEPARATOR = re.compile(r"[\s,]*")
+_SVG_COMMAND = re.compile(r"[MmZzLlHhVvCcSsQqTtAa]")
+_SVG_RULE = re.compile(r"([^{}]+)\{([^}]*)\}")
+
+_INHERITED = (
+    "fill",
+    "fill-opacity",
+    "stroke",
+    "stroke-opacity",
+    "stroke-width",
+    "stroke-dasharray",
+    "stroke-dashoffset",
+    "color",
+    "visibility",
+)
+_PROPERTIES = (*_INHERITED, "opacity", "display")
+# Elements that are not drawn where they are defined
+_NOT_RENDERED = (
+    "defs",
+    "clipPath",
+    "mask",
+    "symbol",
+    "marker",
+    "pattern",
+    "linearGradient",
+    "radialGradient",
+    "filter",
+    "style",
+    "title",
+    "desc",
+    "metadata",
+)
+_CONTAINERS = ("svg", "g", "a", "switch")
+_SKIPPED = ("text", "image", "foreignObject")
+
+
+def _local(tag: str) -> str:
+    """Tag without its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _declarations(text: str) -> dict[str, str]:
+    """Properties of a css declaration block or style attribute."""
+    declarations = {}
+    for declaration in text.split(";"):
+        name, _, value = declaration.partition(":")
+        if value.strip():
+            declarations[name.strip()] = value.strip()
+    return declarations
+
+
+def _svg_matrix(value: str | None) -> np.ndarray:
+    """Matrix (column vectors) of an svg transform attribute."""
+    matrix = np.eye(3)
+    for name, arguments in _SVG_TRANSFORM.findall(value or ""):
+        values = [float(number) for number in _SVG_NUMBER.findall(arguments)]
+        step = np.eye(3)
+        if name == "matrix" and len(values) == 6:
+            step[:2] = np.reshape(values, (3, 2)).T
+        elif name == "translate" and values:
+            step[:2, 2] = values[0], values[1] if len(values) > 1 else 0.0
+        elif name == "scale" and values:
+            step[0, 0], step[1, 1] = values[0], values[-1]
+        elif name == "rotate" and values:
+            angle = math.radians(values[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            cx, cy = values[1:3] if len(values) == 3 else (0.0, 0.0)
+            step[:2, :2] = ((cos, -sin), (sin, cos))
+            step[:2, 2] = cx - cos * cx + sin * cy, cy - sin * cx - cos * cy
+        elif name == "skewX" and values:
+            step[0, 1] = math.tan(math.radians(values[0]))
+        elif name == "skewY" and values:
+            step[1, 0] = math.tan(math.radians(values[0]))
+        matrix = matrix @ step
+    return matrix
+
+
+class _SvgPathData:
+    """Parser of svg path data into vertices and path codes."""
+
+    def __init__(self, data: str) -> None:
+        self.data = data
+        self.pos = 0
+        self.vertices: list[tuple[float, float]] = []
+        self.codes: list[int] = []
+        self.current = self.start = (0.0, 0.0)
+        self.control: tuple[float, float] | None = None
+        self.closed = False
+
+    def parse(self) -> tuple[np.ndarray, np.ndarray]:
+        """Vertices and codes of the path."""
+        command = None
+        while True:
+            self.pos = _SVG_SEPARATOR.match(self.data, self.pos).end()
+            if self.pos >= len(self.data):
+                break
+            match = _SVG_COMMAND.match(self.data, self.pos)
+            if match is not None:
+                command = match.group()
+                self.pos = match.end()
+            elif command is None or command in "Zz":
+                msg = f"Invalid svg path data at {self.data[self.pos:self.pos + 20]!r}"
+                raise ValueError(msg)
+            previous = command
+            command = self._segment(command)
+            if previous.upper() not in "CSQT":
+                self.control = None
+        return np.array(self.vertices, dtype=float).reshape(-1, 2), np.array(
+            self.codes, dtype=Path.code_type,
+        )
+
+    def _number(self) -> float:
+        self.pos = _SVG_SEPARATOR.match(self.data, self.pos).end()
+        match = _SVG_NUMBER.match(self.data, self.pos)
+        if match is None:
+            msg = f"Invalid svg path data at {self.data[self.pos:self.pos + 20]!r}"
+            raise ValueError(msg)
+        self.pos = match.end()
+        return float(match.group())
+
+    def _flag(self) -> bool:
+        self.pos = _SVG_SEPARATOR.match(self.data, self.pos).end()
+        flag = self.data[self.pos : self.pos + 1]
+        if flag not in ("0", "1"):
+            msg = f"Invalid svg arc flag at {self.data[self.pos:self.pos + 20]!r}"
+            raise ValueError(msg)
+        self.pos += 1
+        return flag == "1"
+
+    def _point(self, relative: bool) -> tuple[float, float]:
+        x, y = self._number(), self._number()
+        if relative:
+            return self.current[0] + x, self.current[1] + y
+        return x, y
+
+    def _add(self, code: int, *points: tuple[float, float]) -> None:
+        if not self.codes:
+            msg = "Svg path data must start with a moveto"
+            raise ValueError(msg)
+        if self.closed:
+            # Drawing on after closing a subpath starts from its first point
+            self.vertices.append(self.start)
+            self.codes.append(Path.MOVETO)
+            self.closed = False
+        self.vertices.extend(points)
+        self.codes.extend([code] * len(points))
+        self.current = points[-1]
+
+    def _segment(self, command: str) -> str:
+        """Parse the arguments of a command, and return the command that may follow
+        without being repeated."""
+        relative = command.islower()
+        kind = command.upper()
+        if kind == "M":
+            self.current = self.start = self._point(relative)
+            self.vertices.append(self.current)
+            self.codes.append(Path.MOVETO)
+            self.closed = False
+            return "l" if relative else "L"
+        if kind == "Z":
+            self._add(Path.CLOSEPOLY, self.start)
+            self.current = self.start
+            self.closed = True
+        elif kind == "L":
+            self._add(Path.LINETO, self._point(relative))
+        elif kind == "H":
+            x = self._number() + (self.current[0] if relative else 0.0)
+            self._add(Path.LINETO, (x, self.current[1]))
+        elif kind == "V":
+            y = self._number() + (self.current[1] if relative else 0.0)
+            self._add(Path.LINETO, (self.current[0], y))
+        elif kind in "CS":
+            if kind == "C":
+                first = self._point(relative)
+            else:
+                first = self._reflected()
+            second, end = self._point(relative), self._point(relative)
+            self._add(Path.CURVE4, first, second, end)
+            self.control = second
+        elif kind in "QT":
+            control = self._point(relative) if kind == "Q" else self._reflected()
+            self._add(Path.CURVE3, control, self._point(relative))
+            self.control = control
+        elif kind == "A":
+            rx, ry, angle = self._number(), self._number(), self._number()
+            large, sweep = self._flag(), self._flag()
+            self._arc(rx, ry, angle, large, sweep, self._point(relative))
+        return command
+
+    def _reflected(self) -> tuple[float, float]:
+        """First control point of a smooth curve, the reflection of the previous."""
+        if self.control is None:
+            return self.current
+        return (
+            2 * self.current[0] - self.control[0],
+            2 * self.current[1] - self.control[1],
+        )
+
+    def _arc(
+        self,
+        rx: float,
+        ry: float,
+        angle: float,
+        large: bool,
+        sweep: bool,
+        end: tuple[float, float],
+    ) -> None:
+        """Elliptical arc as cubic Béziers, from the endpoint parameterization."""
+        (x1, y1), (x2, y2) = self.current, end
+        if (x1, y1) == (x2, y2):
+            return
+        rx, ry = abs(rx), abs(ry)
+        if rx == 0 or ry == 0:
+            self._add(Path.LINETO, end)
+            return
+        phi = math.radians(angle)
+        cos, sin = math.cos(phi), math.sin(phi)
+        dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+        x = cos * dx + sin * dy
+        y = -sin * dx + cos * dy
+        radii = (x / rx) ** 2 + (y / ry) ** 2
+        if radii > 1:
+            rx, ry = rx * math.sqrt(radii), ry * math.sqrt(radii)
+        numerator = (rx * ry) ** 2 - (rx * y) ** 2 - (ry * x) ** 2
+        coefficient = math.sqrt(max(numerator, 0) / ((rx * y) ** 2 + (ry * x) ** 2))
+        if large == sweep:
+            coefficient = -coefficient
+        cx, cy = coefficient * rx * y / ry, -coefficient * ry * x / rx
+        theta = math.atan2((y - cy) / ry, (x - cx) / rx)
+        delta = math.atan2((-y - cy) / ry, (-x - cx) / rx) - theta
+        if sweep and delta < 0:
+            delta += 2 * math.pi
+        elif not sweep and delta > 0:
+            delta -= 2 * math.pi
+        first, last = sorted((theta, theta + delta))
+        points = Path.arc(math.degrees(first), math.degrees(last)).vertices
+        if delta < 0:
+            points = points[::-1]
+        ellipse = np.array(
+            [(rx * cos, -ry * sin), (rx * sin, ry * cos)],
+        )
+        points = points[1:] @ ellipse.T + (
+            cos * cx - sin * cy + (x1 + x2) / 2,
+            sin * cx + cos * cy + (y1 + y2) / 2,
+        )
+        points[-1] = end
+        self._add(Path.CURVE4, *map(tuple, points))
+
+
+def _svg_path(data: str) -> tuple[np.ndarray, np.ndarray]:
+    """Vertices and codes of svg path data."""
+    return _SvgPathData(data).parse()
+
+
+class _SvgParser:
+    """Paints the elements of an svg document into a builder."""
+
+    def __init__(self, root: ElementTree.Element, name: str) -> None:
+        self.root = root
+        self.name = name
+        self.ids = {
+            element.get("id"): element for element in root.iter() if element.get("id")
+        }
+        self.rules = self._stylesheet()
+        self.builder = _Builder()
+        self._using: set[str] = set()
+
+    def parse(self) -> Artwork:
+        view_box = [float(value) for value in _SVG_NUMBER.findall(
+            self.root.get("viewBox", ""),
+        )]
+        if len(view_box) == 4 and view_box[2] > 0 and view_box[3] > 0:
+            x, y, width, height = view_box
+        else:
+            x, y = 0.0, 0.0
+            width = self._length(self.root.get("width"), 0)
+            height = self._length(self.root.get("height"), 0)
+        self.size = (width, height)
+        matrix = np.eye(3)
+        matrix[:2, 2] = -x, -y
+        for child in self.root:
+            self._element(child, matrix, {"opacity": 1.0})
+        if not (width > 0 and height > 0) and self.builder.vertices:
+            # Without a size, the artwork extends to its right and bottom edges
+            width, height = np.concatenate(self.builder.vertices).max(axis=0)
+        if not (width > 0 and height > 0):
+            msg = f"{self.name} has no size, set the viewBox of the svg element"
+            raise ValueError(msg)
+        return self.builder.build((width, height), self.name)
+
+    # --- Styles ---
+    def _stylesheet(self) -> dict[str, dict[str, str]]:
+        """Declarations of simple selectors (element, .class or #id) of style sheets."""
+        rules: dict[str, dict[str, str]] = {}
+        for element in self.root.iter():
+            if _local(element.tag) != "style" or not element.text:
+                continue
+            text = re.sub(r"/\*.*?\*/", "", element.text, flags=re.DOTALL)
+            for selectors, body in _SVG_RULE.findall(text):
+                declarations = _declarations(body)
+                for selector in selectors.split(","):
+                    rules.setdefault(selector.strip(), {}).update(declarations)
+        return rules
+
+    def _style(self, element: ElementTree.Element, parent: dict) -> dict:
+        """Properties of an element, inherited from its parent where not set."""
+        style = {name: parent[name] for name in _INHERITED if name in parent}
+        own = {name: element.get(name) for name in _PROPERTIES if element.get(name)}
+        selectors = [
+            _local(element.tag),
+            *(f".{name}" for name in element.get("class", "").split()),
+            f"#{element.get('id')}",
+        ]
+        for selector in selectors:
+            own.update(self.rules.get(selector, {}))
+        own.update(_declarations(element.get("style", "")))
+        style.update(own)
+        style["opacity"] = parent["opacity"] * self._float(own.get("opacity", "1"))
+        return style
+
+    @staticmethod
+    def _float(value: str) -> float:
+        value = value.strip()
+        if value.endswith("%"):
+            return float(value[:-1]) / 100
+        return float(value)
+
+    def _length(self, value: str | None, reference: float) -> float:
+        """User units of a length, relative to a reference length for percentages."""
+        if value is None:
+            return 0.0
+        match = _SVG_LENGTH.fullmatch(value)
+        if match is None:
+            return 0.0
+        number, unit = float(match[1]), match[2]
+        if unit == "%":
+            return number / 100 * reference
+        return number * _SVG_UNITS[unit]
+
+    def _lengths(self) -> tuple[float, float, float]:
+        """Reference lengths of percentages: width, height and their mean diagonal."""
+        width, height = self.size
+        return width, height, math.hypot(width, height) / math.sqrt(2)
+
+    def _paint(self, value: str | None, style: dict, opacity: str) -> tuple | None:
+        """Colour of a fill or stroke, or None if not painted."""
+        value = (value or "none").strip()
+        color = None
+        if value.startswith("url("):
+            reference, _, value = value[4:].partition(")")
+            color = self._gradient(reference.strip("'\" #"))
+            value = value.strip() or "none"
+        if color is None:
+            if value in ("none", "transparent"):
+                return None
+            if value == "currentColor":
+                value = style.get("color", "black")
+            color = self._color(value)
+        alpha = color[3] * self._float(opacity) * style["opacity"]
+        return (*color[:3], min(max(alpha, 0.0), 1.0))
+
+    def _color(self, value: str) -> tuple:
+        match = re.fullmatch(r"rgba?\(([^)]*)\)", value)
+        if match is not None:
+            channels = [part.strip() for part in re.split(r"[\s,/]+", match[1].strip())]
+            red, green, blue = (
+                float(part[:-1]) / 100 if part.endswith("%") else float(part) / 255
+                for part in channels[:3]
+            )
+            alpha = self._float(channels[3]) if len(channels) > 3 else 1.0
+            return red, green, blue, alpha
+        try:
+            return mcolors.to_rgba(value)
+        except ValueError:
+            msg = f"Unknown colour {value!r} in {self.name}"
+            raise ValueError(msg) from None
+
+    def _gradient(self, identifier: str) -> tuple | None:
+        """Mean colour of the stops of a gradient."""
+        gradient = self.ids.get(identifier)
+        seen = set()
+        while gradient is not None and identifier not in seen:
+            seen.add(identifier)
+            stops = [child for child in gradient if _local(child.tag) == "stop"]
+            if stops:
+                colors = []
+                for stop in stops:
+                    style = {**stop.attrib, **_declarations(stop.get("style", ""))}
+                    color = self._color(style.get("stop-color", "black"))
+                    opacity = self._float(style.get("stop-opacity", "1"))
+                    colors.append((*color[:3], color[3] * opacity))
+                return tuple(np.mean(colors, axis=0))
+            reference = gradient.get("href") or gradient.get(
+                "{http://www.w3.org/1999/xlink}href", "",
+            )
+            identifier = reference.lstrip("#")
+            gradient = self.ids.get(identifier)
+        return None
+
+    # --- Elements ---
+    def _element(
+        self, element: ElementTree.Element, matrix: np.ndarray, parent: dict,
+    ) -> None:
+        tag = _local(element.tag)
+        if tag in _NOT_RENDERED or not isinstance(element.tag, str):
+            return
+        style = self._style(element, parent)
+        if style.get("display") == "none":
+            return
+        matrix = matrix @ _svg_matrix(element.get("transform"))
+        if tag in _CONTAINERS:
+            if tag == "svg":
+                x, y = (self._length(element.get(name), 0) for name in ("x", "y"))
+                matrix = matrix @ _svg_matrix(f"translate({x}, {y})")
+            for child in element:
+                self._element(child, matrix, style)
+        elif tag == "use":
+            self._use(element, matrix, style)
+        elif tag in _SKIPPED:
+            self.builder.skipped += 1
+        else:
+            path = self._shape(tag, element)
+            if path is not None and style.get("visibility", "visible") == "visible":
+                self._draw(*path, matrix, style)
+
+    def _use(
+        self, element: ElementTree.Element, matrix: np.ndarray, style: dict,
+    ) -> None:
+        """Draw the element a `use` element refers to, at its position."""
+        reference = element.get("href") or element.get(
+            "{http://www.w3.org/1999/xlink}href", "",
+        )
+        identifier = reference.lstrip("#")
+        target = self.ids.get(identifier)
+        if target is None or identifier in self._using:
+            return
+        x, y = (self._length(element.get(name), 0) for name in ("x", "y"))
+        matrix = matrix @ _svg_matrix(f"translate({x}, {y})")
+        self._using.add(identifier)
+        if _local(target.tag) == "symbol":
+            style = self._style(target, style)
+            for child in target:
+                self._element(child, matrix, style)
+        else:
+            self._element(target, matrix, style)
+        self._using.discard(identifier)
+
+    def _shape(
+        self, tag: str, element: ElementTree.Element,
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        """Vertices and codes of a basic shape or path, None for other elements."""
+        width, height, diagonal = self._lengths()
+
+        def length(name: str, reference: float) -> float:
+            return self._length(element.get(name), reference)
+
+        if tag == "path":
+            return _svg_path(element.get("d", ""))
+        if tag == "rect":
+            x, y = length("x", width), length("y", height)
+            w, h = length("width", width), length("height", height)
+            if w <= 0 or h <= 0:
+                return None
+            rx, ry = element.get("rx"), element.get("ry")
+            rx = length("rx", width) if rx is not None else None
+            ry = length("ry", height) if ry is not None else None
+            rx, ry = min(rx if rx is not None else ry or 0, w / 2), min(
+                ry if ry is not None else rx or 0, h / 2,
+            )
+            if rx <= 0 or ry <= 0:
+                data = f"M{x},{y} h{w} v{h} h{-w} Z"
+            else:
+                data = (
+                    f"M{x + rx},{y} H{x + w - rx} A{rx},{ry} 0 0 1 {x + w},{y + ry} "
+                    f"V{y + h - ry} A{rx},{ry} 0 0 1 {x + w - rx},{y + h} "
+                    f"H{x + rx} A{rx},{ry} 0 0 1 {x},{y + h - ry} "
+                    f"V{y + ry} A{rx},{ry} 0 0 1 {x + rx},{y} Z"
+                )
+            return _svg_path(data)
+        if tag in ("circle", "ellipse"):
+            cx, cy = length("cx", width), length("cy", height)
+            if tag == "circle":
+                rx = ry = length("r", diagonal)
+            else:
+                rx, ry = length("rx", width), length("ry", height)
+            if rx <= 0 or ry <= 0:
+                return None
+            data = (
+                f"M{cx + rx},{cy} A{rx},{ry} 0 0 1 {cx - rx},{cy} "
+                f"A{rx},{ry} 0 0 1 {cx + rx},{cy} Z"
+            )
+            return _svg_path(data)
+        if tag == "line":
+            x1, y1 = length("x1", width), length("y1", height)
+            x2, y2 = length("x2", width), length("y2", height)
+            return _svg_path(f"M{x1},{y1} L{x2},{y2}")
+        if tag in ("polyline", "polygon"):
+            points = _SVG_NUMBER.findall(element.get("points", ""))
+            if len(points) < 4:
+                return None
+            data = "M" + " ".join(points[: len(points) // 2 * 2])
+            return _svg_path(data + (" Z" if tag == "polygon" else ""))
+        return None
+
+    def _draw(
+        self,
+        vertices: np.ndarray,
+        codes: np.ndarray,
+        matrix: np.ndarray,
+        style: dict,
+    ) -> None:
+        """Paint a path with the fill and stroke of its style."""
+        face = self._paint(
+            style.get("fill", "black"), style, style.get("fill-opacity", "1"),
+        )
+        edge = self._paint(style.get("stroke"), style, style.get("stroke-opacity", "1"))
+        scale = _stroke_scale(matrix)
+        diagonal = self._lengths()[2]
+        linewidth = self._length(style.get("stroke-width", "1"), diagonal) * scale
+        dasharray = style.get("stroke-dasharray", "none").strip()
+        pattern = [
+            self._length(value, diagonal) * scale
+            for value in re.split(r"[\s,]+", dasharray)
+            if value and value != "none"
+        ]
+        if len(pattern) % 2:
+            pattern *= 2
+        offset = self._length(style.get("stroke-dashoffset", "0"), diagonal) * scale
+        dashes = (offset, tuple(pattern)) if sum(pattern) > 0 else (0.0, None)
+        vertices = vertices @ matrix[:2, :2].T + matrix[:2, 2]
+        self.builder.add(vertices, codes, face, edge, linewidth, dashes)
+
+
+def _parse_svg(data: bytes, name: str) -> Artwork:
+    try:
+        root = ElementTree.fromstring(data)
+    except ElementTree.ParseError:
+        msg = f"{name} is not an svg or pdf file"
+        raise ValueError(msg) from None
+    if _local(root.tag) != "svg":
+        msg = f"{name} is not an svg or pdf file"
+        raise ValueError(msg)
+    return _SvgParser(root, name).parse()
+
+
+# --- pdf ---
+class _Name(str):
+    """A pdf name object."""
+
+
+class _Ref(int):
+    """An indirect reference to a pdf object, by its object number."""
+
+
+class _Stream:
+    """A pdf stream: a dictionary and (encoded) data."""
+
+    def __init__(self, dictionary: dict, data: bytes) -> None:
+        self.dictionary = dictionary
+        self.data = data
+
+    def decode(self) -> bytes:
+        """The data with its filters undone."""
+        filters = self.dictionary.get("Filter") or []
+        if not isinstance(filters, list):
+            filters = [filters]
+        data = self.data
+        for name in filters:
+            if name not in ("FlateDecode", "Fl"):
+                msg = f"Unsupported pdf stream filter {name}"
+                raise ValueError(msg)
+            data = zlib.decompressobj().decompress(data)
+        return data
+
+
+class _PdfLexer:
+    """Tokens and objects of pdf files and content streams."""
+
+    _token = re.compile(
+        rb"""(?:\s|%[^\r\n]*)*(?:
+            (?P<number>[-+]?(?:\d+\.?\d*|\.\d+))(?=[\s()<>\[\]{}/%]|$)
+          | /(?P<name>[^\s()<>\[\]{}/%]*)
+          | (?P<delimiter><<|>>|[\[\]{}()<])
+          | (?P<keyword>[^\s()<>\[\]{}/%]+)
+        )""",
+        re.VERBOSE,
+    )
+
+    def __init__(self, data: bytes, pos: int = 0, references: bool = False) -> None:
+        self.data = data
+        self.pos = pos
+        # Content streams have no indirect references, so numbers need no look ahead
+        self.references = references
+
+    def token(self) -> tuple[str, bytes] | None:
+        """Kind and value of the next token, None at the end of the data."""
+        match = self._token.match(self.data, self.pos)
+        if match is None:
+            return None
+        self.pos = match.end()
+        kind = match.lastgroup
+        if match[kind] == b"(":
+            return "string", self._string()
+        if match[kind] == b"<":
+            end = self.data.find(b">", self.pos)
+            end = len(self.data) if end < 0 else end
+            value, self.pos = self.data[self.pos : end], end + 1
+            return "string", value
+        return kind, match[kind]
+
+    def _string(self) -> bytes:
+        """Literal string, after its opening parenthesis."""
+        data, start, depth = self.data, self.pos, 1
+        while depth:
+            if self.pos >= len(data):
+                msg = "Unterminated string in pdf data"
+                raise ValueError(msg)
+            char = data[self.pos]
+            if char == 0x5C:  # backslash
+                self.pos += 1
+            elif char == 0x28:
+                depth += 1
+            elif char == 0x29:
+                depth -= 1
+            self.pos += 1
+        return data[start : self.pos - 1]
+
+    def object(self) -> Any:
+        """The next object."""
+        token = self.token()
+        if token is None:
+            msg = "Unexpected end of pdf data"
+            raise ValueError(msg)
+        return self.value(*token)
+
+    def value(self, kind: str, value: bytes) -> Any:
+        """The object starting with a token."""
+        if kind == "number":
+            if self.references:
+                pos = self.pos
+                generation, keyword = self.token(), self.token()
+                if (
+                    generation is not None
+                    and generation[0] == "number"
+                    and keyword == ("keyword", b"R")
+                ):
+                    return _Ref(int(value))
+                self.pos = pos
+            return float(value) if b"." in value else int(value)
+        if kind == "name":
+            return _Name(value.decode("latin-1"))
+        if kind == "string":
+            return value
+        if value == b"[":
+            items = []
+            while (token := self.token()) not in (None, ("delimiter", b"]")):
+                items.append(self.value(*token))
+            return items
+        if value == b"<<":
+            items = []
+            while (token := self.token()) not in (None, ("delimiter", b">>")):
+                items.append(self.value(*token))
+            return dict(zip(items[::2], items[1::2]))
+        return {b"true": True, b"false": False}.get(value)
+
+
+class _PdfDocument:
+    """Objects of a pdf file, parsed when first accessed."""
+
+    def __init__(self, data: bytes, name: str) -> None:
+        self.data = data
+        self.name = name
+        # Later definitions (incremental updates) replace earlier ones
+        self.offsets = {
+            int(match[1]): match.end()
+            for match in re.finditer(rb"(?<!\d)(\d+)\s+\d+\s+obj\b", data)
+        }
+        self.objects: dict[int, Any] = {}
+        self._compressed: dict[int, tuple[bytes, int]] | None = None
+
+    def resolve(self, value: Any) -> Any:
+        """The object a reference refers to, other values as they are."""
+        while isinstance(value, _Ref):
+            number = int(value)
+            if number not in self.objects:
+                self.objects[number] = None  # guards against reference cycles
+                self.objects[number] = self._read(number)
+            value = self.objects[number]
+        return value
+
+    def _read(self, number: int) -> Any:
+        if number not in self.offsets:
+            return self._read_compressed(number)
+        lexer = _PdfLexer(self.data, self.offsets[number], references=True)
+        value = lexer.object()
+        if isinstance(value, dict) and lexer.token() == ("keyword", b"stream"):
+            start = lexer.pos
+            if self.data.startswith(b"\r\n", start):
+                start += 2
+            elif self.data[start : start + 1] in (b"\n", b"\r"):
+                start += 1
+            length = self.resolve(value.get("Length"))
+            end = start + length if isinstance(length, int) else -1
+            if end < 0 or self.data.find(b"endstream", end, end + 32) < 0:
+                end = self.data.find(b"endstream", start)
+                end = len(self.data) if end < 0 else end
+            return _Stream(value, self.data[start:end])
+        return value
+
+    def _read_compressed(self, number: int) -> Any:
+        """An object from an object stream."""
+        if self._compressed is None:
+            self._compressed = {}
+            for stream_number in list(self.offsets):
+                stream = self.resolve(_Ref(stream_number))
+                if (
+                    isinstance(stream, _Stream)
+                    and stream.dictionary.get("Type") == "ObjStm"
+                ):
+                    content = stream.decode()
+                    lexer = _PdfLexer(content)
+                    header = [lexer.object() for _ in range(2 * stream.dictionary["N"])]
+                    first = stream.dictionary["First"]
+                    for item, offset in zip(header[::2], header[1::2]):
+                        self._compressed.setdefault(item, (content, first + offset))
+        if number not in self._compressed:
+            return None
+        content, pos = self._compressed[number]
+        return _PdfLexer(content, pos, references=True).object()
+
+    def first_page(self) -> dict:
+        """Dictionary of the first page."""
+        root = None
+        pos = self.data.rfind(b"trailer")
+        if pos >= 0:
+            trailer = _PdfLexer(self.data, pos + 7, references=True).object()
+            if isinstance(trailer, dict):
+                root = trailer.get("Root")
+        if root is None:
+            # Files with cross-reference streams have the trailer in their dictionary
+            for number in self.offsets:
+                stream = self.resolve(_Ref(number))
+                if (
+                    isinstance(stream, _Stream)
+                    and stream.dictionary.get("Type") == "XRef"
+                ):
+                    root = stream.dictionary.get("Root", root)
+        root = self.resolve(root)
+        node = self.resolve(root.get("Pages")) if isinstance(root, dict) else None
+        while isinstance(node, dict) and node.get("Type") != "Page":
+            kids = self.resolve(node.get("Kids"))
+            node = self.resolve(kids[0]) if kids else None
+        if not isinstance(node, dict):
+            msg = f"{self.name} has no pages"
+            raise ValueError(msg)
+        return node
+
+    def inherited(self, page: dict, key: str) -> Any:
+        """An attribute of a page, or of the page tree nodes it inherits from."""
+        node = page
+        for _ in range(64):
+            if not isinstance(node, dict):
+                break
+            if key in node:
+                return self.resolve(node[key])
+            node = self.resolve(node.get("Parent"))
+        return None
+
+
+_PATH_OPERATORS = {"m": 2, "l": 2, "c": 6, "v": 4, "y": 4, "re": 4, "h": 0}
+_PAINT_OPERATORS = ("S", "s", "f", "F", "f*", "B", "B*", "b", "b*", "n")
+_COLOR_OPERATORS = ("g", "G", "rg", "RG", "k", "K", "sc", "SC", "scn", "SCN")
+_INLINE_IMAGE_END = re.compile(rb"\sEI(?=[\s%]|$)")
+
+
+class _PdfPainter:
+    """Interpreter of pdf content streams, painting their paths into a builder."""
+
+    def __init__(
+        self, document: _PdfDocument, builder: _Builder, ctm: np.ndarray,
+    ) -> None:
+        self.document = document
+        self.builder = builder
+        # Graphics state, with the current transformation matrix ctm from user space
+        # to artwork units (row vectors, as in pdf)
+        self.state: dict[str, Any] = {
+            "ctm": ctm,
+            "fill": (0.0, 0.0, 0.0),
+            "stroke": (0.0, 0.0, 0.0),
+            "fill_alpha": 1.0,
+            "stroke_alpha": 1.0,
+            "linewidth": 1.0,
+            "dashes": (0.0, None),
+        }
+        self.points: list[tuple[float, float]] = []
+        self.codes: list[int] = []
+        self.start = self.current = (0.0, 0.0)
+        self._running: set[int] = set()
+
+    def run(self, content: bytes, resources: Any) -> None:
+        """Paint the paths of a content stream."""
+        resources = self.document.resolve(resources)
+        if not isinstance(resources, dict):
+            resources = {}
+        stack: list[dict] = []
+        operands: list = []
+        lexer = _PdfLexer(content)
+        while (token := lexer.token()) is not None:
+            kind, value = token
+            if kind != "keyword":
+                operands.append(lexer.value(kind, value))
+                continue
+            op = value.decode("latin-1")
+            numbers = [
+                float(item)
+                for item in operands
+                if isinstance(item, (int, float)) and not isinstance(item, bool)
+            ]
+            if op in _PATH_OPERATORS and len(numbers) >= _PATH_OPERATORS[op]:
+                self._construct(op, numbers)
+            elif op in _PAINT_OPERATORS:
+                self._paint(op)
+            elif op == "q":
+                stack.append(dict(self.state))
+            elif op == "Q" and stack:
+                self.state = stack.pop()
+            elif op == "cm" and len(numbers) == 6:
+                self.state["ctm"] = _pdf_matrix(numbers) @ self.state["ctm"]
+            elif op == "w" and numbers:
+                self.state["linewidth"] = numbers[0]
+            elif op == "d" and len(operands) == 2:
+                self.state["dashes"] = self._dashes(*operands)
+            elif op in _COLOR_OPERATORS:
+                color = _device_color(numbers)
+                if color is not None:
+                    self.state["fill" if op.islower() else "stroke"] = color
+            elif op in ("cs", "CS"):
+                self.state["fill" if op == "cs" else "stroke"] = (0.0, 0.0, 0.0)
+            elif op == "gs" and operands:
+                self._graphics_state(resources, operands[-1])
+            elif op == "Do" and operands:
+                self._xobject(resources, operands[-1])
+            elif op in ("BT", "sh"):
+                self.builder.skipped += 1
+            elif op == "BI":
+                match = _INLINE_IMAGE_END.search(content, lexer.pos)
+                lexer.pos = len(content) if match is None else match.end()
+                self.builder.skipped += 1
+            operands = []
+
+    def _construct(self, op: str, numbers: list[float]) -> None:
+        """Add to the current path."""
+        if op == "m":
+            self.start = self.current = (numbers[0], numbers[1])
+            self.points.append(self.current)
+            self.codes.append(Path.MOVETO)
+        elif op == "re":
+            x, y, w, h = numbers[:4]
+            self.points.extend([(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)])
+            self.codes.extend([Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO])
+            self.codes.append(Path.CLOSEPOLY)
+            self.start = self.current = (x, y)
+        elif not self.codes:
+            return
+        elif op == "h":
+            self.points.append(self.start)
+            self.codes.append(Path.CLOSEPOLY)
+            self.current = self.start
+        elif op == "l":
+            self.current = (numbers[0], numbers[1])
+            self.points.append(self.current)
+            self.codes.append(Path.LINETO)
+        else:
+            pairs = [tuple(numbers[i : i + 2]) for i in range(0, len(numbers), 2)]
+            if op == "v":
+                pairs = [self.current, *pairs[:2]]
+            elif op == "y":
+                pairs = [pairs[0], pairs[1], pairs[1]]
+            self.points.extend(pairs[:3])
+            self.codes.extend([Path.CURVE4] * 3)
+            self.current = pairs[2]
+
+    def _paint(self, op: str) -> None:
+        """Fill and or stroke the current path, and start a new one."""
+        if op in ("s", "b", "b*") and self.codes:
+            self.points.append(self.start)
+            self.codes.append(Path.CLOSEPOLY)
+        if op != "n" and self.codes:
+            state = self.state
+            ctm = state["ctm"]
+            vertices = np.array(self.points, dtype=float) @ ctm[:2, :2] + ctm[2, :2]
+            scale = _stroke_scale(ctm)
+            fill = op not in ("S", "s")
+            stroke = op not in ("f", "F", "f*")
+            offset, pattern = state["dashes"]
+            if pattern is not None:
+                offset = offset * scale
+                pattern = tuple(dash * scale for dash in pattern)
+            self.builder.add(
+                vertices,
+                np.array(self.codes, dtype=Path.code_type),
+                (*state["fill"], state["fill_alpha"]) if fill else None,
+                (*state["stroke"], state["stroke_alpha"]) if stroke else None,
+                state["linewidth"] * scale or HAIRLINE,
+                (offset, pattern),
+            )
+        self.points, self.codes = [], []
+
+    def _dashes(
+        self, pattern: Any, phase: Any,
+    ) -> tuple[float, tuple[float, ...] | None]:
+        pattern = [float(dash) for dash in self.document.resolve(pattern) or []]
+        if len(pattern) % 2:
+            pattern *= 2
+        if not isinstance(phase, (int, float)) or sum(pattern) <= 0:
+            return 0.0, None
+        return float(phase), tuple(pattern)
+
+    def _graphics_state(self, resources: dict, name: Any) -> None:
+        """Apply the alpha, stroke width and dashes of a named graphics state."""
+        states = self.document.resolve(resources.get("ExtGState"))
+        if not isinstance(states, dict):
+            return
+        state = self.document.resolve(states.get(name))
+        if not isinstance(state, dict):
+            return
+        if isinstance(state.get("CA"), (int, float)):
+            self.state["stroke_alpha"] = float(state["CA"])
+        if isinstance(state.get("ca"), (int, float)):
+            self.state["fill_alpha"] = float(state["ca"])
+        if isinstance(state.get("LW"), (int, float)):
+            self.state["linewidth"] = float(state["LW"])
+        dashes = self.document.resolve(state.get("D"))
+        if isinstance(dashes, list) and len(dashes) == 2:
+            self.state["dashes"] = self._dashes(*dashes)
+
+    def _xobject(self, resources: dict, name: Any) -> None:
+        """Paint a form XObject, images are skipped."""
+        xobjects = self.document.resolve(resources.get("XObject"))
+        reference = xobjects.get(name) if isinstance(xobjects, dict) else None
+        xobject = self.document.resolve(reference)
+        if not isinstance(xobject, _Stream):
+            return
+        subtype = xobject.dictionary.get("Subtype")
+        if subtype == "Image":
+            self.builder.skipped += 1
+        if subtype != "Form" or id(xobject) in self._running:
+            return
+        matrix = self.document.resolve(xobject.dictionary.get("Matrix"))
+        if not isinstance(matrix, list) or len(matrix) != 6:
+            matrix = [1, 0, 0, 1, 0, 0]
+        saved = self.state, self.points, self.codes, self.start, self.current
+        self.state = dict(self.state, ctm=_pdf_matrix(matrix) @ self.state["ctm"])
+        self.points, self.codes = [], []
+        self._running.add(id(xobject))
+        self.run(xobject.decode(), xobject.dictionary.get("Resources", resources))
+        self._running.discard(id(xobject))
+        self.state, self.points, self.codes, self.start, self.current = saved
+
+
+def _pdf_matrix(values: list[float]) -> np.ndarray:
+    """3 x 3 matrix (row vectors) of the six numbers of a pdf matrix."""
+    a, b, c, d, e, f = (float(value) for value in values)
+    return np.array([[a, b, 0.0], [c, d, 0.0], [e, f, 1.0]])
+
+
+def _device_color(values: list[float]) -> tuple[float, float, float] | None:
+    """Rgb of gray, rgb or cmyk colour components."""
+    if len(values) == 1:
+        return (values[0],) * 3
+    if len(values) == 3:
+        return tuple(values)
+    if len(values) == 4:
+        c, m, y, k = values
+        return (1 - c) * (1 - k), (1 - m) * (1 - k), (1 - y) * (1 - k)
+    return None
+
+
+def _parse_pdf(data: bytes, name: str) -> Artwork:
+    document = _PdfDocument(data, name)
+    page = document.first_page()
+    box = document.inherited(page, "CropBox") or document.inherited(page, "MediaBox")
+    if not isinstance(box, list) or len(box) != 4:
+        msg = f"{name} has no page size"
+        raise ValueError(msg)
+    x0, y0, x1, y1 = (float(document.resolve(value)) for value in box)
+    x0, x1 = min(x0, x1), max(x0, x1)
+    y0, y1 = min(y0, y1), max(y0, y1)
+    builder = _Builder()
+    # Pdf user space, y up from the bottom left corner of the page, to the top left
+    painter = _PdfPainter(document, builder, _pdf_matrix([1, 0, 0, -1, -x0, y1]))
+    contents = document.resolve(page.get("Contents"))
+    streams = contents if isinstance(contents, list) else [contents]
+    content = b"\n".join(
+        stream.decode()
+        for stream in map(document.resolve, streams)
+        if isinstance(stream, _Stream)
+    )
+    painter.run(content, document.inherited(page, "Resources"))
+    return builder.build((x1 - x0, y1 - y0), name)
+
+
+def parse_artwork(data: bytes, name: str = "The artwork") -> Artwork:
+    """Parse the content of an svg (or gzipped svgz) or pdf file.
+
+    Parameters
+    ----------
+    data : bytes
+        Content of the file.
+    name : str
+        Name of the file, for error messages.
+
+    Returns
+    -------
+    Artwork
+        The painted paths.
+
+    """
+    if data.startswith(b"\x1f\x8b"):
+        data = gzip.decompress(data)
+    if b"%PDF-" in data[:1024]:
+        return _parse_pdf(data, name)
+    return _parse_svg(data, name)
+
+
+def load_artwork(path: str | os.PathLike) -> Artwork:
+    """The artwork of an svg or pdf file, parsed once for every content of the file.
+
+    The file is only read again when its modification time or size changes, and
+    only parsed again when its content does. Files with text or image elements, which
+    are not drawn, raise a UserWarning when they are parsed.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _files.get(path)
+    if cached is not None and cached[0] == version and cached[1] in _artworks:
+        _cache_stats["hits"] += 1
+        _files.move_to_end(path)
+        _artworks.move_to_end(cached[1])
+        return _artworks[cached[1]]
+    with open(path, "rb") as file:
+        data = file.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    artwork = _artworks.get(digest)
+    if artwork is None:
+        _cache_stats["misses"] += 1
+        artwork = parse_artwork(data, name=path)
+        artwork.digest = digest
+        _artworks[digest] = artwork
+        if artwork.skipped:
+            warnings.warn(
+                f"{path}: {artwork.skipped} text and image elements are not drawn, "
+                "convert text to outlines",
+                stacklevel=2,
+            )
+    else:
+        _cache_stats["hits"] += 1
+        _artworks.move_to_end(digest)
+    _files[path] = (version, digest)
+    _files.move_to_end(path)
+    if cached is not None and cached[1] != digest:
+        # Forget the previous content, unless another file has it
+        if all(other != cached[1] for _, other in _files.values()):
+            _artworks.pop(cached[1], None)
+    while len(_artworks) > CACHE_SIZE:
+        _artworks.popitem(last=False)
+    while len(_files) > CACHE_SIZE:
+        _files.popitem(last=False)
+    return artwork
+
+
+class VectorArtwork(PathCollection):
+    """The paths of an svg or pdf file, fitted into a cm extent of a figure.
+
+    Create with `SciFigure.add_artwork`, or `PanelAxes.add_vector_artwork` to fill a
+    panel. The artwork keeps its aspect ratio and is placed at the top left of the
+    extent, stroke widths are scaled with it.
+    """
+
+    def __init__(
+        self,
+        figure: SciFigure,
+        path: str | os.PathLike,
+        location: tuple[float, float, float, float] | None = None,
+        method: str = "bbox",
+        panel: PanelAxes | None = None,
+    ) -> None:
+        """Load the artwork, see `SciFigure.add_artwork`."""
+        self.path = path
+        self.artwork = load_artwork(path)
+        self.panel = panel
+        self._scale = None
+        # Artwork units to display units, updated in place when drawn
+        self._placement = Affine2D()
+        super().__init__(
+            self.artwork.paths(),
+            facecolors=self.artwork.facecolors,
+            edgecolors=self.artwork.edgecolors,
+            linewidths=self.artwork.linewidths,
+            linestyles=self.artwork.dashes,
+            transform=self._placement,
+        )
+        self.set_figure(figure)
+        if panel is None:
+            self.set_location(location, method=method)
+
+    def set_location(
+        self,
+        location: tuple[float, float, float, float],
+        method: str = "bbox",
+    ) -> None:
+        """Set the extent in cm the artwork is fitted into.
+
+        Parameters
+        ----------
+        location : ExtentCM | BoundCM | tuple[float, float, float, float]
+            Coordinates from the top left corner of the figure in cm.
+        method : str
+            "bbox" (default) for (x0, y0, x1, y1) or "size" for (x, y, width, height).
+
+        """
+        if self.panel is not None:
+            msg = "The artwork fills its panel, set the location of the panel instead"
+            raise ValueError(msg)
+        x0, y0, x1, y1 = location
+        if method == "size":
+            x1, y1 = x0 + x1, y0 + y1
+        elif method != "bbox":
+            msg = 'Method must be either "size" or "bbox"'
+            raise ValueError(msg)
+        if x0 >= x1 or y0 >= y1:
+            msg = "x0 must be less than x1 and y0 must be less than y1"
+            raise ValueError(msg)
+        self._location = (x0, y0, x1, y1)
+        self.stale = True
+
+    def get_location(self) -> tuple[float, float, float, float]:
+        """The extent (x0, y0, x1, y1) in cm the artwork is fitted into."""
+        if self.panel is not None:
+            return self.panel.get_location()
+        return self._location
+
+    def _place(self) -> None:
+        """Map the artwork into its extent, and scale the stroke widths along."""
+        fig = self.get_figure()
+        x0, y0, x1, y1 = self.get_location()
+        width, height = self.artwork.size
+        scale = min((x1 - x0) / width, (y1 - y0) / height)  # cm per artwork unit
+        origin, right, down = (fig.transCM + fig.transFigure).transform(
+            [(x0, y0), (x0 + scale, y0), (x0, y0 + scale)],
+        )
+        placement = Affine2D.from_values(*(right - origin), *(down - origin), *origin)
+        self._placement.set_matrix(placement.get_matrix())
+        if scale != self._scale:
+            self._scale = scale
+            self.set_linewidths(self.artwork.linewidths * scale / 2.54 * 72)
+
+    def get_window_extent(self, renderer: RendererBase | None = None) -> Bbox:
+        """Extent of the paths in display units."""
+        self._place()
+        return Path(self.artwork.vertices, self.artwork.codes).get_extents(
+            self._placement,
+        )
+
+    def draw(self, renderer: RendererBase) -> None:
+        """Place the artwork in its extent and draw its paths."""
+        self._place()
+        super().draw(renderer)
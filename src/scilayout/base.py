@@ -1,12 +1,20 @@
 """Base plotting functions for use in scientific plotting."""
 
+import os
+import threading
+import warnings
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
 
 from . import locations, style
+from .grid import CMOverlay
 from .types import centimetres, inches
 
 
@@ -99,72 +107,276 @@ def create_panel_locations(
     return panel_array
 
 
+# Metadata that changes between saves (dates, software versions) is cleared so that
+# saving the same figure always produces the same bytes.
+DETERMINISTIC_METADATA = {
+    ".pdf": {"Creator": "", "Producer": "", "CreationDate": None},
+    ".eps": {"Creator": "", "Producer": "", "CreationDate": None},
+    ".svg": {"Creator": None, "Date": None},
+    ".png": {"Software": None},
+    ".tif": None,  # Pillow writes no dates or versions to tiff files
+    ".tiff": None,
+}
+SVG_HASHSALT = "scilayout"
+"""Fixed salt for the clip-path and glyph ids in svg output (random by default)."""
+
+# Held while an export changes process-wide state (rcParams, environment variables)
+# so that figures can be saved from several threads at once
+_global_state_lock = threading.RLock()
+
+
+@contextmanager
+def _fixed_creation_date():
+    """Fix the creation date written by backends that ignore the metadata argument.
+
+    The eps backend always writes the current time unless SOURCE_DATE_EPOCH is set
+    (see https://reproducible-builds.org/specs/source-date-epoch/).
+    """
+    if "SOURCE_DATE_EPOCH" in os.environ:
+        yield
+        return
+    os.environ["SOURCE_DATE_EPOCH"] = "0"
+    try:
+        yield
+    finally:
+        del os.environ["SOURCE_DATE_EPOCH"]
+
+
+def artist_complexity(artist: mpl.artist.Artist) -> int:
+    """Count the vertices and markers an artist puts into a vector file.
+
+    :param artist: A line, collection or patch
+    :type artist: matplotlib.artist.Artist
+    :return: Number of vertices plus number of markers, 0 for other artists
+    :rtype: int
+    """
+    if isinstance(artist, mpl.lines.Line2D):
+        n_points = len(artist.get_xydata())
+        has_line = artist.get_linestyle() not in ("None", "", " ")
+        has_markers = artist.get_marker() not in (None, "None", "", " ")
+        return n_points * (has_line + has_markers)
+    if isinstance(artist, mpl.collections.Collection):
+        n_vertices = sum(len(path.vertices) for path in artist.get_paths())
+        return n_vertices + len(artist.get_offsets())
+    if isinstance(artist, mpl.patches.Patch):
+        return len(artist.get_path().vertices)
+    return 0
+
+
+def dense_artists(
+    fig: mpl.figure.Figure,
+    threshold: int,
+) -> list[mpl.artist.Artist]:
+    """Find the plotted artists that are too complex to keep as vectors.
+
+    Only the data of each axes (lines, collections and patches) is considered, so axes,
+    ticks, text, panel labels and scale bars always stay as vectors.
+
+    :param fig: Figure to search
+    :type fig: matplotlib.figures.Figure
+    :param threshold: Complexity (see artist_complexity) above which an artist is dense
+    :type threshold: int
+    :return: Dense artists that are not already rasterized
+    :rtype: list[matplotlib.artist.Artist]
+    """
+    return [
+        artist
+        for ax in fig.get_axes()
+        for artist in (*ax.lines, *ax.collections, *ax.patches)
+        if not artist.get_rasterized() and artist_complexity(artist) > threshold
+    ]
+
+
+@contextmanager
+def _rasterize_dense(fig, threshold):
+    """Temporarily rasterize the dense artists of a figure."""
+    dense = [] if threshold is None else dense_artists(fig, threshold)
+    for artist in dense:
+        artist.set_rasterized(True)
+    try:
+        yield
+    finally:
+        for artist in dense:
+            artist.set_rasterized(False)
+
+
 def savefigure(
     fig: mpl.figure.Figure,
-    fpath: Path,
+    fpath: Path | BinaryIO,
     dpi: float = 300.0,
     transparent_png: bool = True,
     bbox: str = "tight",
     allow_overwrite: bool = True,
+    format: str = None,
+    rasterize_threshold: int | None = None,
+    strip_height: int | None = None,
+    png_profile: str | None = None,
 ) -> None:
     """Save figure using settings optimised for version control and document embedding.
 
     The default 'tight' bounding box will crop the whitespace around the figure.
+    Output is deterministic: dates and software versions are left out of the metadata
+    and svg ids use a fixed salt, so saving an unchanged figure gives identical bytes.
+    In pdf and svg output, plotted artists with more vertices and markers than
+    style.params['export.rasterize_threshold'] are rasterized at the export dpi.
 
     :param fig: Figure to save
     :type fig: matplotlib.figures.Figure
-    :param fpath: Path to save the figure to
-    :type fpath: pathlib.Path or str
+    :param fpath: Path to save the figure to, a binary file-like object to write to,
+        or the PdfPages of a multi-page pdf to add the figure to
+    :type fpath: pathlib.Path or str or BinaryIO or PdfPages
     :param dpi: Dots per inch, default 300
     :type dpi: float or int
-    :param transparent_png: Make png output transparent
+    :param transparent_png: Make png and tiff output transparent
     :type transparent_png: bool
     :param bbox: Bounding box to use for pdf and eps output, default 'tight'
     :type bbox: str
+    :param format: File format (e.g. 'pdf'), defaults to the suffix of fpath.
+        Required for file-like objects without a name.
+    :type format: str, optional
+    :param rasterize_threshold: Complexity above which artists are rasterized in pdf
+        and svg output, defaults to style.params['export.rasterize_threshold'].
+        Use math.inf to keep everything as vectors.
+    :type rasterize_threshold: int, optional
+    :param strip_height: Render png and tiff output this many rows at a time, so that
+        memory use does not grow with the size of the image (e.g. for posters at high
+        dpi). The pixels are those of a render of the whole figure, except that the
+        antialiased edges of strokes can differ by one level in a few pixels.
+    :type strip_height: int, optional
+    :param png_profile: How to compress png output, 'fast' (lowest zlib level),
+        'small' (highest zlib level and the best filter for each row) or 'parallel'
+        (compressed on a pool of threads). Defaults to matplotlib's png encoding.
+    :type png_profile: str, optional
     """
-    if not isinstance(fpath, Path):
-        fpath = Path(fpath)
-    if fpath.exists():
-        if allow_overwrite:
-            print(f"Overwriting {fpath}")  # TODO: use logging to display messages
-        else:
-            msg = f"{fpath} already exists, set allow_overwrite=True to overwrite"
-            raise FileExistsError(msg)
-    fig_fmt = fpath.suffix
+    if hasattr(fpath, "write") or isinstance(fpath, PdfPages):
+        suffix = Path(getattr(fpath, "name", "")).suffix
+    else:
+        if not isinstance(fpath, Path):
+            fpath = Path(fpath)
+        if fpath.exists():
+            if allow_overwrite:
+                print(f"Overwriting {fpath}")  # TODO: use logging to display messages
+            else:
+                msg = f"{fpath} already exists, set allow_overwrite=True to overwrite"
+                raise FileExistsError(msg)
+        suffix = fpath.suffix
+    fig_fmt = suffix if format is None else "." + format.lstrip(".").lower()
 
     common_kwargs = {
         "bbox_inches": bbox,  # bounding box method
         "facecolor": fig.get_facecolor(),
         "transparent": True,  # No background colour
         "dpi": dpi,
+        "format": fig_fmt[1:],
     }
+    if rasterize_threshold is None:
+        rasterize_threshold = style.params["export.rasterize_threshold"]
     # TODO: investigate savefig preventing update of plot in qt5 backend until click on fig
 
-    if fig_fmt in [".pdf", ".eps"]:
-        metadata = {  # Cleaning this metadata makes version control easier
-            "Creator": "",
-            "Producer": "",
-            "CreationDate": None,
-        }  # TODO: allow users to specify their own metadata
-        fig.savefig(fpath, metadata=metadata, **common_kwargs)
+    if fig_fmt == ".pdf":
+        # TODO: allow users to specify their own metadata
+        with _rasterize_dense(fig, rasterize_threshold):
+            fig.savefig(fpath, metadata=DETERMINISTIC_METADATA[fig_fmt], **common_kwargs)
+    elif fig_fmt == ".eps":
+        # Writing to an open file keeps the file name out of the eps title
+        with _global_state_lock, _fixed_creation_date(), _open_binary(fpath) as f:
+            fig.savefig(f, metadata=DETERMINISTIC_METADATA[fig_fmt], **common_kwargs)
     elif fig_fmt == ".svg":
-        with plt.rc_context(
-            {"svg.fonttype": "none"},
-        ):  # force text to be text, not paths
-            fig.savefig(fpath, **common_kwargs)
-    elif fig_fmt == ".png":
+        with _global_state_lock, plt.rc_context(
+            {"svg.fonttype": "none", "svg.hashsalt": SVG_HASHSALT},
+        ), _rasterize_dense(fig, rasterize_threshold):  # force text to be text, not paths
+            fig.savefig(fpath, metadata=DETERMINISTIC_METADATA[fig_fmt], **common_kwargs)
+    elif fig_fmt in (".png", ".tif", ".tiff"):
         alpha = 0 if transparent_png else 1
         axes = fig.get_axes()
         fig.patch.set_alpha(alpha)
         for ax in axes:
             ax.patch.set_alpha(alpha)
 
-        fig.savefig(fpath, **common_kwargs)
+        if png_profile is not None and fig_fmt == ".png":
+            common_kwargs["png_profile"] = png_profile
+        if strip_height is not None or "png_profile" in common_kwargs:
+            common_kwargs["backend"] = "module://scilayout.strips"
+            common_kwargs["strip_height"] = strip_height
+        fig.savefig(fpath, metadata=DETERMINISTIC_METADATA[fig_fmt], **common_kwargs)
+    elif not fig_fmt:
+        msg = "Cannot determine the file format, specify it with format="
+        raise ValueError(msg)
     else:
         msg = f"File format {fig_fmt} not recognised"
         raise ValueError(msg)
 
 
+@contextmanager
+def _open_binary(fpath):
+    """Open a path for binary writing, or pass through an already open file."""
+    if hasattr(fpath, "write"):
+        yield fpath
+    else:
+        with fpath.open("wb") as f:
+            yield f
+
+
+def render_rgba(fig: mpl.figure.Figure, dpi: float = 300.0) -> memoryview:
+    """Render a figure with Agg and return the renderer's RGBA buffer without copying.
+
+    The whole figure canvas is rendered (no bounding box cropping).
+    Use numpy.asarray() on the result for an array of shape (height, width, 4).
+
+    :param fig: Figure to render
+    :type fig: matplotlib.figures.Figure
+    :param dpi: Dots per inch, default 300
+    :type dpi: float or int
+    :return: RGBA pixels, rows from the top of the figure
+    :rtype: memoryview
+    """
+    original_canvas = fig.canvas
+    original_dpi = fig.dpi
+    canvas = FigureCanvasAgg(fig)  # temporarily attaches itself to the figure
+    # cm overlays are left out of exports, but this draw is not a save
+    overlays = [
+        artist for artist in fig.artists
+        if isinstance(artist, CMOverlay) and artist.get_visible()
+    ]
+    try:
+        fig.dpi = dpi
+        for overlay in overlays:
+            overlay.set_visible(False)
+        canvas.draw()
+        renderer = canvas.get_renderer()
+    finally:
+        for overlay in overlays:
+            overlay.set_visible(True)
+        fig.dpi = original_dpi
+        fig.set_canvas(original_canvas)
+    # The memoryview keeps the renderer (and so the buffer) alive
+    return renderer.buffer_rgba()
+
+
+def add_cm_overlay(
+    figure: mpl.figure.Figure,
+    width_cm: float | None = None,
+    height_cm: float | None = None,
+) -> CMOverlay:
+    """Add an overlay to view the cm size of all items on the figure.
+
+    The overlay is a single artist that is not drawn when the figure is saved.
+    For a SciFigure, use SciFigure.add_overlay() instead.
+
+    :param figure: figure to overlay a grid onto
+    :type figure: matplotlib.figures.Figure
+    :param width_cm: Width of the figure in cm (default None, uses figure size)
+    :type width_cm: float
+    :param height_cm: Height of the figure in cm (default None, uses figure size)
+    :type height_cm: float
+    :return: The overlay artist
+    :rtype: scilayout.grid.CMOverlay
+    """
+    overlay = CMOverlay(figure, width_cm=width_cm, height_cm=height_cm)
+    figure.add_artist(overlay)
+    return overlay
+
+
 def add_cm_overlay_grid(
     figure: mpl.figure.Figure,
     width_cm: float | None = None,
@@ -177,6 +389,8 @@ def add_cm_overlay_grid(
 ]:
     """Add an overlay to view the cm size of all items on the figure.
 
+    Deprecated, use add_cm_overlay() which draws the overlay as a single artist.
+
     :param figure: figure to overlay a grid onto
     :type figure: matplotlib.figures.Figure
     :param width_cm: Width of the figure in cm (default None, uses figure size)
@@ -189,6 +403,11 @@ def add_cm_overlay_grid(
                   mpl.collections.PathCollection,
                   mpl.collections.PathCollection]
     """
+    warnings.warn(
+        "add_cm_overlay_grid is deprecated, use add_cm_overlay instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     # Allow user to specify what the position is meant to be
     # rather than what it actually is
     width_cm_actual, height_cm_actual = locations.inch_to_cm(figure.get_size_inches())
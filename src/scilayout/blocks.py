@@ -0,0 +1,748 @@
+"""Sub-figures embedded in a figure as pre-rendered blocks.
+
+Summary figures often combine sub-figures that other scripts already make as standalone
+figures. Instead of re-running all of that plotting code into one figure, a
+`SubfigureBlock` embeds the finished sub-figure, either another figure or an exported
+file, scaled to fit a cm extent of the parent figure. Raster images (png, tiff, jpeg)
+are embedded as images, svg and pdf files are read with `scilayout.artwork` and stay
+vector (with the same limits: text must be converted to outlines).
+
+A source figure is drawn once, when the block is added, into a display list: the
+drawing calls (paths, markers, collections, images and text) in points, with images
+and rasterized artists at the capture dpi. Vector output (pdf, svg, eps) replays the
+display list scaled into place, so the sub-figure stays vector, in svg as a `<g>`
+element. Raster output draws the display list (or the image file) once per pixel size
+and keeps the result in a cache keyed by a hash of the content, which is then copied
+into every export of that size. Either way the parent never draws the artists of the
+sub-figure again.
+
+Example usage:
+
+```python
+inset = scilayout.Figure()
+inset.set_size_cm(6, 4)
+...  # plot as a standalone figure
+
+fig.add_subfigure_block(inset, (1, 1, 7, 5))
+fig.add_subfigure_block("microscopy.png", (8, 1, 12, 5))
+fig.add_subfigure_block("schematic.svg", (13, 1, 17, 5))
+```
+
+Changes to a source figure after the block is added are shown after `refresh`. A file
+is read again when its modification time changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.artist import Artist
+from matplotlib.backend_bases import GraphicsContextBase, RendererBase
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.backends.backend_mixed import MixedModeRenderer
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.transforms import (
+    Affine2D,
+    Bbox,
+    IdentityTransform,
+    Transform,
+    TransformedPath,
+)
+from PIL import Image, UnidentifiedImageError
+
+from . import artwork
+from .grid import CMOverlay
+
+if TYPE_CHECKING:
+    from .classes import SciFigure
+
+CACHE_SIZE = 16
+"""Number of rendered blocks kept."""
+
+MODES = ("auto", "raster")
+"""How blocks are drawn: "auto" keeps figure, svg and pdf sources vector in vector
+output, "raster" draws them as an image at the export dpi everywhere."""
+
+VECTOR_SUFFIXES = (".svg", ".svgz", ".pdf")
+"""Suffixes of files that are embedded as vector artwork rather than as images."""
+
+
+# Rendered blocks keyed on (content hash, width, height), least recently used first
+_rasters: OrderedDict[tuple[str, int, int], np.ndarray] = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def cache_info() -> tuple[int, int, int]:
+    """Hits, misses and size of the cache of rendered blocks."""
+    return _cache_stats["hits"], _cache_stats["misses"], len(_rasters)
+
+
+def clear_cache() -> None:
+    """Empty the cache of rendered blocks."""
+    _rasters.clear()
+    _cache_stats.update(hits=0, misses=0)
+
+
+def _cached_raster(
+    source: _FigureSource | _ImageSource, width: int, height: int,
+) -> np.ndarray:
+    """The source drawn at width x height pixels, rows from the bottom."""
+    key = (source.digest, width, height)
+    image = _rasters.get(key)
+    if image is None:
+        _cache_stats["misses"] += 1
+        image = source.raster(width, height)
+        _rasters[key] = image
+        while len(_rasters) > CACHE_SIZE:
+            _rasters.popitem(last=False)
+    else:
+        _cache_stats["hits"] += 1
+        _rasters.move_to_end(key)
+    return image
+
+
+def _resized(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Resample an RGBA image, smoothing when it shrinks and keeping pixels sharp when
+    it grows (like matplotlib's "antialiased" interpolation)."""
+    if image.shape[:2] == (height, width):
+        return image
+    shrinks = width < image.shape[1] or height < image.shape[0]
+    resample = Image.Resampling.LANCZOS if shrinks else Image.Resampling.NEAREST
+    resized = Image.fromarray(image, "RGBA").resize((width, height), resample)
+    return np.array(resized)
+
+
+# --- Display lists ---
+def _frozen_gc(gc: GraphicsContextBase) -> GraphicsContextBase:
+    """A copy of a graphics context that no longer depends on live transforms."""
+    frozen = GraphicsContextBase()
+    frozen.copy_properties(gc)
+    cliprect = gc.get_clip_rectangle()
+    frozen.set_clip_rectangle(None if cliprect is None else cliprect.frozen())
+    path, affine = gc.get_clip_path()
+    if path is not None:
+        frozen.set_clip_path(TransformedPath(path, affine.frozen()))
+    return frozen
+
+
+class _Recorder(RendererBase):
+    """A renderer that keeps the drawing calls of a figure instead of drawing them.
+
+    Display units are points (72 dpi), images are sampled at the image dpi.
+    """
+
+    def __init__(self, width: float, height: float, image_dpi: float) -> None:
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.dpi = 72.0
+        self.image_dpi = image_dpi
+        self.calls: list[tuple] = []
+
+    def get_canvas_width_height(self) -> tuple[float, float]:
+        return self.width, self.height
+
+    def flipy(self) -> bool:
+        return False
+
+    def option_scale_image(self) -> bool:
+        return True
+
+    def option_image_nocomposite(self) -> bool:
+        return not rcParams["image.composite_image"]
+
+    def get_image_magnification(self) -> float:
+        return self.image_dpi / self.dpi
+
+    def open_group(self, s: str, gid: str | None = None) -> None:
+        self.calls.append(("open_group", s, gid))
+
+    def close_group(self, s: str) -> None:
+        self.calls.append(("close_group", s))
+
+    def draw_path(self, gc, path, transform, rgbFace=None) -> None:
+        self.calls.append(("path", _frozen_gc(gc), path, transform.frozen(), rgbFace))
+
+    def draw_markers(
+        self, gc, marker_path, marker_trans, path, trans, rgbFace=None,
+    ) -> None:
+        self.calls.append((
+            "markers",
+            _frozen_gc(gc),
+            marker_path,
+            marker_trans.frozen(),
+            path,
+            trans.frozen(),
+            rgbFace,
+        ))
+
+    def draw_path_collection(
+        self,
+        gc,
+        master_transform,
+        paths,
+        all_transforms,
+        offsets,
+        offset_trans,
+        facecolors,
+        edgecolors,
+        linewidths,
+        linestyles,
+        antialiaseds,
+        urls,
+        offset_position,
+        **kwargs,
+    ) -> None:
+        self.calls.append((
+            "collection",
+            _frozen_gc(gc),
+            master_transform.frozen(),
+            list(paths),
+            np.array(all_transforms),
+            np.array(offsets),
+            offset_trans.frozen(),
+            np.array(facecolors),
+            np.array(edgecolors),
+            np.array(linewidths, dtype=float),
+            list(linestyles),
+            list(antialiaseds),
+            list(urls),
+            offset_position,
+            kwargs,
+        ))
+
+    def draw_gouraud_triangles(self, gc, triangles_array, colors_array, transform):
+        self.calls.append((
+            "gouraud",
+            _frozen_gc(gc),
+            np.array(triangles_array),
+            np.array(colors_array),
+            transform.frozen(),
+        ))
+
+    def draw_image(self, gc, x, y, im, transform=None) -> None:
+        gc = _frozen_gc(gc)
+        if transform is None:
+            # Sampled at the image dpi, with the alpha of the gc already applied
+            height, width = im.shape[:2]
+            magnification = self.get_image_magnification()
+            transform = Affine2D().scale(width / magnification, height / magnification)
+            gc.set_alpha(1.0)
+        self.calls.append(("image", gc, x, y, np.array(im), transform.frozen()))
+
+    def draw_text(self, gc, x, y, s, prop, angle, ismath=False, mtext=None) -> None:
+        self.calls.append(("text", _frozen_gc(gc), x, y, s, prop.copy(), angle, ismath))
+
+    def draw_tex(self, gc, x, y, s, prop, angle, *, mtext=None) -> None:
+        self.calls.append(("tex", _frozen_gc(gc), x, y, s, prop.copy(), angle))
+
+
+class _Replay:
+    """Draws recorded calls on another renderer, scaled by `scale` and moved to
+    (x, y) in its display units."""
+
+    def __init__(self, renderer: RendererBase, scale: float, x: float, y: float):
+        self.renderer = renderer
+        self.transform = Affine2D().scale(scale).translate(x, y)
+        self.scaling = Affine2D().scale(scale)
+        # Points of the recording in points of the renderer
+        self.point_scale = scale * 72.0 / renderer.dpi
+
+    def gc(self, recorded: GraphicsContextBase) -> GraphicsContextBase:
+        """A graphics context of the renderer with the recorded properties."""
+        gc = self.renderer.new_gc()
+        gc.copy_properties(recorded)
+        cliprect = recorded.get_clip_rectangle()
+        if cliprect is not None:
+            gc.set_clip_rectangle(Bbox(self.transform.transform(cliprect.get_points())))
+        path, affine = recorded.get_clip_path()
+        if path is not None:
+            gc.set_clip_path(TransformedPath(path, affine + self.transform))
+        gc.set_linewidth(recorded.get_linewidth() * self.point_scale)
+        offset, dashes = recorded.get_dashes()
+        if dashes is not None:
+            gc.set_dashes(*self._dashes(offset, dashes))
+        gc.set_hatch_linewidth(recorded.get_hatch_linewidth() * self.point_scale)
+        return gc
+
+    def _dashes(self, offset: float, dashes: Any) -> tuple[float, list | None]:
+        """A dash pattern in points of the renderer."""
+        if dashes is None:
+            return offset, None
+        return offset * self.point_scale, [dash * self.point_scale for dash in dashes]
+
+    def __call__(self, calls: list[tuple]) -> None:
+        for kind, *args in calls:
+            getattr(self, f"_{kind}")(*args)
+
+    def _open_group(self, s: str, gid: str | None) -> None:
+        self.renderer.open_group(s, gid=gid)
+
+    def _close_group(self, s: str) -> None:
+        self.renderer.close_group(s)
+
+    def _path(self, gc, path, transform, rgbFace) -> None:
+        gc = self.gc(gc)
+        self.renderer.draw_path(gc, path, transform + self.transform, rgbFace)
+        gc.restore()
+
+    def _markers(self, gc, marker_path, marker_trans, path, trans, rgbFace) -> None:
+        gc = self.gc(gc)
+        self.renderer.draw_markers(
+            gc,
+            marker_path,
+            marker_trans + self.scaling,
+            path,
+            trans + self.transform,
+            rgbFace,
+        )
+        gc.restore()
+
+    def _collection(
+        self,
+        gc,
+        master_transform,
+        paths,
+        all_transforms,
+        offsets,
+        offset_trans,
+        facecolors,
+        edgecolors,
+        linewidths,
+        linestyles,
+        antialiaseds,
+        urls,
+        offset_position,
+        kwargs,
+    ) -> None:
+        gc = self.gc(gc)
+        # Paths are drawn at their offsets, which take the move
+        master_transform += self.scaling if len(offsets) else self.transform
+        linestyles = [self._dashes(*linestyle) for linestyle in linestyles]
+        self.renderer.draw_path_collection(
+            gc,
+            master_transform,
+            paths,
+            all_transforms,
+            offsets,
+            offset_trans + self.transform,
+            facecolors,
+            edgecolors,
+            linewidths * self.point_scale,
+            linestyles,
+            antialiaseds,
+            urls,
+            offset_position,
+            **kwargs,
+        )
+        gc.restore()
+
+    def _gouraud(self, gc, triangles_array, colors_array, transform) -> None:
+        gc = self.gc(gc)
+        self.renderer.draw_gouraud_triangles(
+            gc, triangles_array, colors_array, transform + self.transform,
+        )
+        gc.restore()
+
+    def _image(self, gc, x, y, im, transform) -> None:
+        gc = self.gc(gc)
+        x, y = self.transform.transform((x, y))
+        transform = transform + self.scaling
+        if self.renderer.option_scale_image():
+            self.renderer.draw_image(gc, x, y, im, transform)
+        else:
+            x, y, im = _sampled(im, x, y, transform)
+            self.renderer.draw_image(gc, x, y, im)
+        gc.restore()
+
+    def _text(self, gc, x, y, s, prop, angle, ismath) -> None:
+        gc = self.gc(gc)
+        x, y = self._text_position(x, y)
+        self.renderer.draw_text(gc, x, y, s, self._scaled(prop), angle, ismath)
+        gc.restore()
+
+    def _tex(self, gc, x, y, s, prop, angle) -> None:
+        gc = self.gc(gc)
+        x, y = self._text_position(x, y)
+        self.renderer.draw_tex(gc, x, y, s, self._scaled(prop), angle)
+        gc.restore()
+
+    def _text_position(self, x: float, y: float) -> tuple[float, float]:
+        """Where text goes, from the top for renderers whose y axis points down."""
+        x, y = self.transform.transform((x, y))
+        if self.renderer.flipy():
+            y = self.renderer.get_canvas_width_height()[1] - y
+        return x, y
+
+    def _scaled(self, prop: FontProperties) -> FontProperties:
+        prop = prop.copy()
+        prop.set_size(prop.get_size_in_points() * self.point_scale)
+        return prop
+
+
+def _sampled(
+    im: np.ndarray, x: float, y: float, transform: Transform,
+) -> tuple[int, int, np.ndarray]:
+    """Resample an image placed by an affine transform of the unit square to the
+    pixels it covers, for renderers that cannot scale images."""
+    a, b, c, d, e, f = transform.to_values()
+    corners = transform.transform([(0, 0), (1, 0), (0, 1), (1, 1)]) + (x, y)
+    (x0, y0), (x1, y1) = np.floor(corners.min(axis=0)), np.ceil(corners.max(axis=0))
+    width, height = max(int(x1 - x0), 1), max(int(y1 - y0), 1)
+    if b == c == 0:
+        image = _resized(im, max(round(abs(a)), 1), max(round(abs(d)), 1))
+        image = image[:, ::-1] if a < 0 else image
+        image = image[::-1] if d < 0 else image
+        left, bottom = corners.min(axis=0)
+        return round(left), round(bottom), np.ascontiguousarray(image)
+    # Rotated or skewed: map each output pixel back to the image, both with rows from
+    # the bottom
+    inverse = (
+        Affine2D().translate(x0, y0)
+        + transform.inverted()
+        + Affine2D().scale(im.shape[1], im.shape[0])
+    )
+    (ia, ib, ic, id_, ie, if_) = inverse.to_values()
+    image = Image.fromarray(np.ascontiguousarray(im), "RGBA").transform(
+        (width, height),
+        Image.Transform.AFFINE,
+        (ia, ic, ie, ib, id_, if_),
+        Image.Resampling.BILINEAR,
+    )
+    return int(x0), int(y0), np.array(image)
+
+
+class _ContentHash:
+    """Hashes recorded calls by what they draw: paths and points are hashed after their
+    (frozen) transforms are applied, graphics contexts by their public properties."""
+
+    _AXES = np.array([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+    def __init__(self) -> None:
+        self.hash = hashlib.blake2b(digest_size=16)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+    def update(self, *values: Any) -> None:
+        for value in values:
+            if isinstance(value, np.ndarray):
+                self.hash.update(f"{value.dtype.str}{value.shape}".encode())
+                self.hash.update(np.ascontiguousarray(value).tobytes())
+            elif isinstance(value, Path):
+                self.update(value.vertices, value.codes)
+            elif isinstance(value, Transform):
+                # An affine transform is fixed by where it maps the unit axes
+                self.update(value.transform(self._AXES))
+            elif isinstance(value, Bbox):
+                self.update(value.get_points())
+            elif isinstance(value, GraphicsContextBase):
+                path, affine = value.get_clip_path()
+                self.update(
+                    value.get_alpha(),
+                    value.get_antialiased(),
+                    value.get_capstyle(),
+                    value.get_joinstyle(),
+                    value.get_dashes(),
+                    value.get_forced_alpha(),
+                    value.get_linewidth(),
+                    value.get_rgb(),
+                    value.get_url(),
+                    value.get_gid(),
+                    value.get_snap(),
+                    value.get_hatch(),
+                    value.get_hatch_color(),
+                    value.get_hatch_linewidth(),
+                    value.get_sketch_params(),
+                    value.get_clip_rectangle(),
+                    None if path is None else affine.transform_path(path),
+                )
+            elif isinstance(value, FontProperties):
+                self.update(value.get_fontconfig_pattern())
+            elif isinstance(value, (list, tuple)):
+                self.hash.update(b"(%d" % len(value))
+                self.update(*value)
+                self.hash.update(b")")
+            elif isinstance(value, dict):
+                self.update(sorted(value.items()))
+            else:
+                self.hash.update(repr(value).encode() + b"\0")
+
+    def calls(self, calls: list[tuple]) -> None:
+        """Hash recorded calls, with their paths in recorded display units."""
+        for kind, *args in calls:
+            if kind == "path":
+                gc, path, transform, rgbFace = args
+                args = [gc, transform.transform_path(path), rgbFace]
+            elif kind == "markers":
+                gc, marker_path, marker_trans, path, trans, rgbFace = args
+                args = [
+                    gc,
+                    marker_trans.transform_path(marker_path),
+                    trans.transform_path(path),
+                    rgbFace,
+                ]
+            elif kind == "collection":
+                gc, master_transform, paths, all_transforms, offsets, offset_trans = (
+                    args[:6]
+                )
+                args = [
+                    gc,
+                    [master_transform.transform_path(path) for path in paths],
+                    all_transforms,
+                    offset_trans.transform(offsets) if len(offsets) else offsets,
+                    *args[6:],
+                ]
+            elif kind == "gouraud":
+                gc, triangles, colors, transform = args
+                points = transform.transform(triangles.reshape(-1, 2))
+                args = [gc, points, colors]
+            self.update(kind, args)
+
+
+# --- Sources ---
+class _FigureSource:
+    """A figure captured as a display list."""
+
+    def __init__(self, figure: Figure, dpi: float) -> None:
+        self.figure = figure
+        self.dpi = dpi
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Record the drawing calls of the figure and hash them."""
+        fig = self.figure
+        width, height = fig.get_size_inches()
+        recorder = _Recorder(width * 72, height * 72, self.dpi)
+        # cm overlays are left out, as in exports
+        overlays = [
+            artist for artist in fig.artists
+            if isinstance(artist, CMOverlay) and artist.get_visible()
+        ]
+        original_dpi = fig.dpi
+        try:
+            fig.dpi = recorder.dpi
+            for overlay in overlays:
+                overlay.set_visible(False)
+            fig.draw(MixedModeRenderer(fig, width, height, self.dpi, recorder))
+        finally:
+            for overlay in overlays:
+                overlay.set_visible(True)
+            fig.dpi = original_dpi
+        self.calls = recorder.calls
+        self.size = (recorder.width, recorder.height)
+        content = _ContentHash()
+        content.update(self.size)
+        content.calls(self.calls)
+        self.digest = content.hexdigest()
+
+    def raster(self, width: int, height: int) -> np.ndarray:
+        """Draw the display list at width x height pixels, rows from the bottom."""
+        scale = width / self.size[0]
+        renderer = RendererAgg(width, height, 72.0 * scale)
+        _Replay(renderer, scale, 0, 0)(self.calls)
+        return np.asarray(renderer.buffer_rgba())[::-1].copy()
+
+    def draw(self, renderer: RendererBase, gc: GraphicsContextBase, bbox: Bbox):
+        """Replay the display list into bbox of a vector renderer."""
+        _Replay(renderer, bbox.width / self.size[0], bbox.x0, bbox.y0)(self.calls)
+
+
+class _ArtworkSource(_FigureSource):
+    """An svg or pdf file, replayed like a captured figure from its parsed paths."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = os.path.abspath(path)
+        self.digest = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Parse the file if it changed (parsed artworks are shared, see
+        `scilayout.artwork.load_artwork`) and record its paths in one collection."""
+        art = artwork.load_artwork(self.path)
+        if art.digest == self.digest:
+            return
+        # One artwork unit is recorded as one point, the block is scaled to fit anyway
+        width, height = art.size
+        linewidths = np.asarray(art.linewidths, dtype=float)
+        linestyles = [
+            (offset * lw, None if dashes is None else [dash * lw for dash in dashes])
+            for (offset, dashes), lw in zip(art.dashes, linewidths)
+        ]
+        self.calls = [(
+            "collection",
+            GraphicsContextBase(),
+            Affine2D().scale(1, -1).translate(0, height),  # y up from the bottom
+            art.paths(),
+            np.empty((0, 3, 3)),
+            np.empty((0, 2)),
+            IdentityTransform(),
+            art.facecolors,
+            art.edgecolors,
+            linewidths,
+            linestyles,
+            [True],
+            [None],
+            "screen",
+            {},
+        )]
+        self.size = (width, height)
+        self.digest = art.digest
+
+
+class _ImageSource:
+    """A raster image file, read again when its modification time changes."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = os.path.abspath(path)
+        self._stat = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Read and hash the file if it changed."""
+        stat = os.stat(self.path)
+        if (stat.st_mtime_ns, stat.st_size) == self._stat:
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        try:
+            with Image.open(BytesIO(data)) as image:
+                self.image = np.asarray(image.convert("RGBA"))  # rows from the top
+        except UnidentifiedImageError:
+            msg = (
+                f"{self.path} is not a raster image, export the figure as png, tiff, "
+                "svg or pdf"
+            )
+            raise ValueError(msg) from None
+        self.digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self.size = (self.image.shape[1], self.image.shape[0])
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+
+    def raster(self, width: int, height: int) -> np.ndarray:
+        """The image resampled to width x height pixels, rows from the bottom."""
+        return np.ascontiguousarray(_resized(self.image, width, height)[::-1])
+
+    def draw(self, renderer: RendererBase, gc: GraphicsContextBase, bbox: Bbox):
+        """Draw the image at its own resolution into bbox of a vector renderer."""
+        transform = Affine2D().scale(bbox.width, bbox.height)
+        renderer.draw_image(gc, bbox.x0, bbox.y0, self.image[::-1], transform)
+
+
+# --- Artist ---
+class SubfigureBlock(Artist):
+    """A pre-rendered sub-figure, fitted into a cm extent of a figure.
+
+    Create with `SciFigure.add_subfigure_block`. The sub-figure keeps its aspect ratio
+    and is placed at the top left of the extent.
+    """
+
+    def __init__(
+        self,
+        figure: SciFigure,
+        source: Figure | str | os.PathLike,
+        location: tuple[float, float, float, float],
+        method: str = "bbox",
+        mode: str = "auto",
+        dpi: float = 300.0,
+    ) -> None:
+        """Capture the source, see `SciFigure.add_subfigure_block`."""
+        super().__init__()
+        if mode not in MODES:
+            msg = f"Mode must be one of {MODES}"
+            raise ValueError(msg)
+        self.set_figure(figure)
+        self.mode = mode
+        self.source = source
+        if isinstance(source, Figure):
+            self._source = _FigureSource(source, dpi)
+        elif os.fspath(source).lower().endswith(VECTOR_SUFFIXES):
+            self._source = _ArtworkSource(source)
+        else:
+            self._source = _ImageSource(source)
+        self.set_location(location, method=method)
+
+    @property
+    def digest(self) -> str:
+        """Hash of the content, the key of the block's rendered rasters."""
+        return self._source.digest
+
+    def refresh(self) -> None:
+        """Capture the source figure again, e.g. after plotting more on it."""
+        self._source.refresh()
+        self.stale = True
+
+    def set_location(
+        self,
+        location: tuple[float, float, float, float],
+        method: str = "bbox",
+    ) -> None:
+        """Set the extent in cm the sub-figure is fitted into.
+
+        Parameters
+        ----------
+        location : ExtentCM | BoundCM | tuple[float, float, float, float]
+            Coordinates from the top left corner of the figure in cm.
+        method : str
+            "bbox" (default) for (x0, y0, x1, y1) or "size" for (x, y, width, height).
+
+        """
+        x0, y0, x1, y1 = location
+        if method == "size":
+            x1, y1 = x0 + x1, y0 + y1
+        elif method != "bbox":
+            msg = 'Method must be either "size" or "bbox"'
+            raise ValueError(msg)
+        if x0 >= x1 or y0 >= y1:
+            msg = "x0 must be less than x1 and y0 must be less than y1"
+            raise ValueError(msg)
+        self._location = (x0, y0, x1, y1)
+        self.stale = True
+
+    def get_location(self) -> tuple[float, float, float, float]:
+        """The extent (x0, y0, x1, y1) in cm the sub-figure is fitted into."""
+        return self._location
+
+    def get_window_extent(self, renderer: RendererBase | None = None) -> Bbox:
+        """Where the sub-figure is drawn, in display units."""
+        fig = self.get_figure()
+        x0, y0, x1, y1 = self._location
+        width, height = self._source.size
+        scale = min((x1 - x0) / width, (y1 - y0) / height)
+        corners = [(x0, y0 + height * scale), (x0 + width * scale, y0)]
+        return Bbox((fig.transCM + fig.transFigure).transform(corners))
+
+    def draw(self, renderer: RendererBase) -> None:
+        """Copy the cached raster, or replay the source into vector output."""
+        if not self.get_visible():
+            return
+        if isinstance(self._source, (_ArtworkSource, _ImageSource)):
+            self._source.refresh()
+        bbox = self.get_window_extent(renderer)
+        gc = renderer.new_gc()
+        gc.set_alpha(self.get_alpha())
+        renderer.open_group("subfigure", gid=self.get_gid())
+        if self.mode == "raster" or not renderer.option_scale_image():
+            magnification = renderer.get_image_magnification()
+            image = _cached_raster(
+                self._source,
+                max(round(bbox.width * magnification), 1),
+                max(round(bbox.height * magnification), 1),
+            )
+            if renderer.option_scale_image():
+                transform = Affine2D().scale(bbox.width, bbox.height)
+                renderer.draw_image(gc, bbox.x0, bbox.y0, image, transform)
+            else:
+                renderer.draw_image(gc, round(bbox.x0), round(bbox.y0), image)
+        else:
+            self._source.draw(renderer, gc, bbox)
+        renderer.close_group("subfigure")
+        gc.restore()
+        self.stale = False
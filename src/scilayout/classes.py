@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+from io import BytesIO
 from typing import Any
 
 import matplotlib as mpl
+import numpy as np
 from matplotlib import figure
 from matplotlib.axes import Axes
 from matplotlib.text import Text
 
-from . import base, locations, style
-from .grid import GuideGridClass
+from . import base, dense, extents, locations, pyramid, style
+from .artwork import VectorArtwork
+from .blocks import SubfigureBlock
+from .grid import CMOverlay, GuideGridClass
+from .groups import PanelGroup
+from .panels import PanelRegistry
 from .types import BoundCM, ExtentCM, centimetres
 
 
@@ -22,11 +28,17 @@ class SciFigure(figure.Figure):
     -------
     draw_grid()
         Add a centimetre grid overlay onto the figure.
+    add_overlay()
+        Add cm markers over the figure while laying it out.
 
     """
 
     grid: GuideGridClass
     """Handler for guide grid."""
+    panels: PanelRegistry
+    """The panels of the figure and their extents in cm."""
+    groups: list[PanelGroup]
+    """Groups of panels placed directly on the figure."""
 
     def __init__(
         self,
@@ -40,8 +52,10 @@ class SciFigure(figure.Figure):
         """
         # must initialise before super because it'll call clear
         self.grid = GuideGridClass(self)
+        self.panels = PanelRegistry(self)
+        self.groups = []
         super().__init__(*args, **kwargs)
-        self.cm_overlay = None
+        self.cm_overlay: CMOverlay | None = None
         self.transCM = locations.CMTransform(self)
 
     def set_size_cm(self, w: float, h: float) -> None:
@@ -57,11 +71,34 @@ class SciFigure(figure.Figure):
         """
         base.set_figure_size_cm(self, w, h)
         # TODO: resize panels to preserve their position
+        # The cm overlay follows the new size through its transform
+
+    def add_overlay(self, **kwargs: dict) -> CMOverlay:
+        """Add markers every cm and half cm over the figure.
+
+        The overlay is not drawn when the figure is saved.
+
+        Parameters
+        ----------
+        kwargs : dict
+            Key word arguments to pass to scilayout.grid.CMOverlay.
 
+        Returns
+        -------
+        CMOverlay
+            The overlay artist
+
+        """
+        self.remove_overlay()
+        self.cm_overlay = CMOverlay(self, **kwargs)
+        self.add_artist(self.cm_overlay)
+        return self.cm_overlay
+
+    def remove_overlay(self) -> None:
+        """Remove the cm overlay, if there is one."""
         if self.cm_overlay is not None:
-            # redraw overlay
-            self.remove_overlay()
-            self.add_overlay()
+            self.cm_overlay.remove()
+            self.cm_overlay = None
 
     def add_panel(
         self,
@@ -110,6 +147,101 @@ class SciFigure(figure.Figure):
             self, location=location, panellabel=panellabel, method=method, **kwargs,
         )
 
+    def add_group(
+        self,
+        origin: tuple[float, float] = (0.0, 0.0),
+        scale: float = 1.0,
+    ) -> PanelGroup:
+        """Add a group of panels that is moved and scaled as one.
+
+        Parameters
+        ----------
+        origin : tuple[float, float]
+            Location (cm) of the group's top left corner on the figure.
+        scale : float
+            Size of a cm of the group on the figure.
+
+        Returns
+        -------
+        PanelGroup
+            The group, add panels, text and nested groups to it in its own cm frame.
+
+        """
+        group = PanelGroup(self, origin=origin, scale=scale)
+        self.groups.append(group)
+        return group
+
+    def add_subfigure_block(
+        self,
+        source: figure.Figure | str,
+        extent_cm: BoundCM | ExtentCM,
+        method: str = "bbox",
+        mode: str = "auto",
+        dpi: float = 300.0,
+    ) -> SubfigureBlock:
+        """Embed another figure, or a file exported from one, without redrawing it.
+
+        A source figure is captured once as a display list, which stays vector in pdf
+        and svg output (a <g> element in svg) and is drawn to a cached raster of the
+        export size in png and tiff output. svg and pdf files are read as vector
+        artwork (see `scilayout.artwork`) and drawn the same way.
+
+        Parameters
+        ----------
+        source : matplotlib.figure.Figure | str | Path
+            Figure (usually a SciFigure) or path of a png, tiff, jpeg, svg or pdf file.
+        extent_cm : BoundCM | ExtentCM | tuple[float, float, float, float]
+            Extent in cm the sub-figure is fitted into, keeping its aspect ratio.
+        method : str
+            "bbox" (default) for (x0, y0, x1, y1) or "size" for (x, y, width, height).
+        mode : str
+            "auto" (default) or "raster" to draw a source figure, svg or pdf as an
+            image at the export dpi in vector output as well.
+        dpi : float
+            Resolution at which images and rasterized artists of a source figure are
+            captured.
+
+        Returns
+        -------
+        SubfigureBlock
+            The block, call its refresh() after changing the source figure.
+
+        """
+        block = SubfigureBlock(
+            self, source, extent_cm, method=method, mode=mode, dpi=dpi,
+        )
+        self.add_artist(block)
+        return block
+
+    def add_artwork(
+        self,
+        path: str,
+        extent_cm: BoundCM | ExtentCM,
+        method: str = "bbox",
+    ) -> VectorArtwork:
+        """Place the artwork of an svg or pdf file, e.g. a schematic, as vector paths.
+
+        The file is parsed once, and parsed again only when its content changes.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of an svg or pdf file, of which the first page is placed.
+        extent_cm : BoundCM | ExtentCM | tuple[float, float, float, float]
+            Extent in cm the artwork is fitted into, keeping its aspect ratio.
+        method : str
+            "bbox" (default) for (x0, y0, x1, y1) or "size" for (x, y, width, height).
+
+        Returns
+        -------
+        VectorArtwork
+            The collection of paths of the artwork.
+
+        """
+        artwork = VectorArtwork(self, path, extent_cm, method=method)
+        self.add_artist(artwork)
+        return artwork
+
     def draw_grid(
         self,
         **kwargs: dict,
@@ -134,6 +266,8 @@ class SciFigure(figure.Figure):
         """Clear the figure (including removal of grid)."""
         super().clear(**kwargs)
         self.cm_overlay = None
+        self.panels._clear()
+        self.groups = []
         if self.grid:
             self.grid._detach_ax()
 
@@ -145,6 +279,14 @@ class SciFigure(figure.Figure):
         super().clf(**kwargs)
         self.cm_overlay = None
 
+    def delaxes(self, ax: Axes) -> None:
+        """Remove an axes from the figure, and from the panels if it is one."""
+        super().delaxes(ax)
+        self.panels._remove(ax)
+        group = getattr(ax, "group", None)
+        if group is not None and ax in group.panels:
+            group.panels.remove(ax)
+
     def set_location(
         self,
         x: int,
@@ -162,6 +304,9 @@ class SciFigure(figure.Figure):
         """
         # TODO: add support for other backends
 
+        if self.canvas.manager is None:
+            msg = "Figure has no window, create it with scilayout.figure() to place it on screen."
+            raise RuntimeError(msg)
         backend = mpl.get_backend()
         window = self.canvas.manager.window
 
@@ -182,14 +327,71 @@ class SciFigure(figure.Figure):
 
         Parameters
         ----------
-        savepath : str | Path
-            The path to save the figure to
+        savepath : str | Path | BinaryIO
+            The path to save the figure to, or a file-like object to write to
         kwargs : dict
             Additional arguments to pass to savefigure
 
         """
         base.savefigure(self, savepath, **kwargs)
 
+    def export_bytes(
+        self,
+        format: str = "png",
+        **kwargs: dict,
+    ) -> memoryview:
+        """Export the figure to an in-memory buffer instead of a file.
+
+        Parameters
+        ----------
+        format : str
+            File format, any format supported by savefigure (e.g. "png", "pdf", "svg"),
+            or "rgba" for the raw Agg pixel buffer of the whole figure (shape
+            (height, width, 4), not cropped) which is returned without copying.
+        kwargs : dict
+            Additional arguments to pass to savefigure, only "dpi" applies to "rgba".
+
+        Returns
+        -------
+        memoryview
+            The exported figure, use bytes() on it if a bytes object is needed.
+
+        """
+        if format == "rgba":
+            return base.render_rgba(self, **kwargs)
+        buffer = BytesIO()
+        base.savefigure(self, buffer, format=format, **kwargs)
+        return buffer.getbuffer()
+
+    def export_pyramid(
+        self,
+        path_pattern: str,
+        dpis: tuple[float, ...] = (72, 150, 300, 600),
+        **kwargs: dict,
+    ) -> list:
+        """Export the figure as png at several dpi from a single render.
+
+        The figure is rendered at the highest dpi and the lower resolutions are made by
+        downsampling that image.
+
+        Parameters
+        ----------
+        path_pattern : str
+            Output path formatted with the dpi, e.g. "figure_{dpi}dpi.png".
+        dpis : tuple[float, ...]
+            Resolutions to export.
+        kwargs : dict
+            Additional arguments to pass to scilayout.pyramid.export_pyramid, e.g.
+            thumbnail=256 or deepzoom="figure.dzi".
+
+        Returns
+        -------
+        list[Path]
+            The exported paths, highest resolution first.
+
+        """
+        return pyramid.export_pyramid(self, path_pattern, dpis, **kwargs)
+
     def close(self) -> None:
         """Close figure window (convenience function)."""
         mpl.pyplot.close(self)
@@ -202,6 +404,8 @@ class PanelAxes(Axes):
     """
 
     panellabel: PanelLabel
+    group: PanelGroup | None = None
+    """Group the panel is positioned in, if any."""
 
     def __init__(
         self,
@@ -209,12 +413,18 @@ class PanelAxes(Axes):
         location: BoundCM | ExtentCM,
         panellabel: str = None,
         method: str = "bbox",
+        group: PanelGroup | None = None,
         **kwargs,
     ) -> None:
         rect = (0, 0, 1, 1)  # dummy rect
         super().__init__(fig, rect, **kwargs)
         fig.add_axes(self)  # apparently this isn't in the super or something
         # TODO: test this behaves as expected
+        if group is not None:
+            # Placed from its location in the group's frame whenever it is drawn
+            self.group = group
+            self._local_location = (0.0, 0.0, 1.0, 1.0)  # until set_location below
+            self.set_axes_locator(group._locate)
         self.panellabel = None
         if panellabel is not None:
             self.add_label(panellabel)
@@ -230,7 +440,8 @@ class PanelAxes(Axes):
         If method is 'size' then location is (x, y, width, height)
 
         location : ExtentCM | BoundCM | Tuple[float, float, float, float]
-            Coordinates from top left corner in cm
+            Coordinates from top left corner in cm, of the group's frame for panels in
+            a group
         method : str
             Coordinate system of 'bbox' or 'size', default 'bbox'
         """
@@ -249,12 +460,34 @@ class PanelAxes(Axes):
         else:
             msg = 'Method must be either "size" or "bbox"'
             raise ValueError(msg)
-        self.set_position(locations.locationcm_to_position(self.get_figure(), location))
+        fig = self.get_figure()
+        if self.group is not None:
+            location = tuple(self.group.to_figure_cm(location))
+        position = locations.locationcm_to_position(fig, location)
+        if isinstance(fig, SciFigure):
+            fig.panels._set(self, location)
+        self._place(position, location)
+
+    def _place(
+        self,
+        position: tuple[float, float, float, float],
+        location: tuple[float, float, float, float],
+    ) -> None:
+        """Set the position in figure fraction of the location in figure cm.
+
+        The panel label is moved with the panel.
+        """
+        if self.group is not None:
+            self._local_location = tuple(self.group.from_figure_cm(location))
+        self.set_position(position)
         if self.panellabel is not None:
             self.panellabel.set_offset(self.panellabel.xoffset, self.panellabel.yoffset)
 
     def get_location(self) -> tuple:
         """Get location of axes in cm (from top left corner)."""
+        if self.group is not None:
+            # The position is only updated from the group when the figure is drawn
+            return tuple(self.group.to_figure_cm(self._local_location))
         # TODO: use self.get_figure().transCM?
         figsize = locations.inch_to_cm(self.get_figure().get_size_inches())
         bbox_pos = self.get_position().get_points()
@@ -270,6 +503,13 @@ class PanelAxes(Axes):
         # TODO: improve type hinting
         return xmin, ymin, xmax, ymax
 
+    def set_zorder(self, level: float) -> None:
+        """Set the zorder, which decides the panel on top in `SciFigure.panels`."""
+        super().set_zorder(level)
+        fig = self.get_figure()
+        if isinstance(fig, SciFigure):
+            fig.panels._zorder_changed()
+
     def add_label(
         self,
         label: str,
@@ -293,6 +533,123 @@ class PanelAxes(Axes):
         if ha is not None:
             self.panellabel.set_alignment(h=ha)
 
+    def plot_dense(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        **kwargs: Any,
+    ) -> dense.DenseLine:
+        """Plot a line with many more points than the panel has pixels.
+
+        The line is reduced to the minimum and maximum y value in each pixel column of
+        the panel at the dpi it is drawn or exported at, and recomputed when the x limits
+        change. See `scilayout.dense`.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            x values in ascending order, may be memory-mapped.
+        y : np.ndarray
+            y values, may be memory-mapped.
+        kwargs : dict
+            Keyword arguments for matplotlib.lines.Line2D (e.g. color, linewidth).
+
+        Returns
+        -------
+        DenseLine
+            The line.
+
+        """
+        if "color" not in kwargs and "c" not in kwargs:
+            kwargs["color"] = self._get_lines.get_next_color()
+        line = dense.DenseLine(x, y, **kwargs)
+        self.add_line(line)
+        self._request_autoscale_view()
+        return line
+
+    def scatter_dense(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        pixels_per_bin: int = 1,
+        **kwargs: Any,
+    ) -> dense.DensityImage:
+        """Plot scatter data with many more points than the panel has pixels.
+
+        The points are counted in a 2D histogram with a bin for each pixel of the panel
+        at the dpi it is drawn or exported at, shown as an image coloured by count, and
+        recounted when the limits change. See `scilayout.dense`.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            x values, may be memory-mapped.
+        y : np.ndarray
+            y values, may be memory-mapped.
+        pixels_per_bin : int
+            Width and height of each bin in pixels, default 1.
+        kwargs : dict
+            Keyword arguments for matplotlib.image.AxesImage (e.g. cmap, norm).
+
+        Returns
+        -------
+        DensityImage
+            The image.
+
+        """
+        image = dense.DensityImage(self, x, y, pixels_per_bin=pixels_per_bin, **kwargs)
+        self.add_image(image)
+        (x_low, x_high), (y_low, y_high) = dense.data_range(x), dense.data_range(y)
+        self.update_datalim([(x_low, y_low), (x_high, y_high)])
+        self._request_autoscale_view()
+        return image
+
+    def add_vector_artwork(self, path: str) -> VectorArtwork:
+        """Fill the panel with the artwork of an svg or pdf file, e.g. a schematic.
+
+        The artwork keeps its aspect ratio and follows the panel when it is moved. Call
+        `set_axis_off` to show only the artwork.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of an svg or pdf file, of which the first page is placed.
+
+        Returns
+        -------
+        VectorArtwork
+            The collection of paths of the artwork.
+
+        """
+        artwork = VectorArtwork(self.get_figure(), path, panel=self)
+        self.add_collection(artwork, autolim=False)
+        return artwork
+
+    def clear_data(self) -> None:
+        """Remove plotted data, keeping the panel layout.
+
+        Lines, collections, images, patches, tables, texts and the legend are removed,
+        while the location, panel label, axis labels, title, ticks and limits settings
+        are kept, so the panel can be reused for a new dataset. The colour cycle restarts.
+        """
+        for container in list(self.containers):
+            container.remove()
+        label = None if self.panellabel is None else self.panellabel.text
+        for artist in [
+            *self.lines,
+            *self.collections,
+            *self.images,
+            *self.patches,
+            *self.tables,
+            *self.texts,
+        ]:
+            if artist is not label:
+                artist.remove()
+        if self.legend_ is not None:
+            self.legend_.remove()
+        self.set_prop_cycle(None)
+        self.relim()
+
     def clear(self) -> None:
         """Clear the axes."""
         # Handle the panel label during clear
@@ -333,6 +690,9 @@ class PanelLabel:
         """Create text item to identify the panel."""
         self.text = base.create_panel_label(ax, label)
         self.ax = ax
+        if ax.group is not None:
+            # Positioned in the group's frame, so that it moves with the group
+            self.text.set_transform(ax.group.transCM + ax.get_figure().transFigure)
         self.xoffset = style.params["panellabel.xoffset"]
         self.yoffset = style.params["panellabel.yoffset"]
         self.set_offset(x=self.xoffset, y=self.yoffset)
@@ -344,13 +704,22 @@ class PanelLabel:
 
     def get_location(self) -> tuple[centimetres, centimetres]:
         """Get position on figure in cm."""
+        if self.ax.group is not None:
+            return tuple(self.ax.group.to_figure_cm(self.text.get_position()))
         figfrac = self.text.get_position()
         return locations.fraction_to_cm(self.ax.get_figure(), figfrac)
 
+    def get_size(self) -> tuple[centimetres, centimetres]:
+        """Get width and height of the label in cm (measurements are cached)."""
+        return extents.text_size_cm(self.text)
+
     def set_location(self, x: float = None, y: float = None) -> None:
         """Set position of label on figure in cm directly."""
         currentpos = self.get_location()
         tempxy = (currentpos[0] if x is None else x, currentpos[1] if y is None else y)
+        if self.ax.group is not None:
+            self.text.set_position(tuple(self.ax.group.from_figure_cm(tempxy)))
+            return
         convertedfrac = locations.cm_to_fraction(self.ax.get_figure(), tempxy)
         setfrac = (convertedfrac[0], convertedfrac[1])
         self.text.set_position(setfrac)
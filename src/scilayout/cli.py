@@ -0,0 +1,140 @@
+"""Command line interface for scilayout.
+
+Usage ::
+
+    scilayout render figures/*.py specs/*.json -o build/figures -f pdf -f png -j 8
+    scilayout watch figures/ -o build/figures
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from . import render
+
+
+def _expand_sources(paths: list[str]) -> list[Path]:
+    """Expand directories into the figure scripts they contain."""
+    sources = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            sources.extend(sorted(path.glob(f"*{render.SCRIPT_SUFFIX}")))
+        else:
+            sources.append(path)
+    return sources
+
+
+def _export_kwargs(args: argparse.Namespace) -> dict:
+    """Collect the savefigure settings given on the command line."""
+    kwargs = {"dpi": args.dpi}
+    if args.bbox is not None:
+        kwargs["bbox"] = None if args.bbox == "none" else args.bbox
+    return kwargs
+
+
+def _add_export_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments shared by commands that export figures."""
+    parser.add_argument(
+        "sources",
+        nargs="+",
+        help="figure scripts (.py), layout specifications (.json) or directories of scripts",
+    )
+    parser.add_argument(
+        "-o", "--outdir", default=".", help="directory to write figures to",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        action="append",
+        help="output format, may be given more than once (default pdf)",
+    )
+    parser.add_argument("--dpi", type=float, default=300.0, help="output dpi")
+    parser.add_argument(
+        "--bbox", default=None, help='bounding box, "tight" (default) or "none"',
+    )
+
+
+def _report(result: render.RenderResult) -> None:
+    """Print the outcome of rendering a source."""
+    status = "ok" if result.ok else "FAILED"
+    print(f"{status:>6} {result.seconds:7.2f}s  {result.source}")
+    if not result.ok:
+        print(result.error, file=sys.stderr)
+
+
+def _render_command(args: argparse.Namespace) -> int:
+    """Render figure sources and report timings."""
+    sources = _expand_sources(args.sources)
+    formats = args.formats or ["pdf"]
+    start = time.perf_counter()
+    failed = []
+    for result in render.render_many(
+        sources,
+        args.outdir,
+        formats,
+        workers=args.jobs,
+        fork=args.fork,
+        **_export_kwargs(args),
+    ):
+        _report(result)
+        if not result.ok:
+            failed.append(result)
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Rendered {len(sources) - len(failed)}/{len(sources)} sources "
+        f"in {elapsed:.2f}s",
+    )
+    return 1 if failed else 0
+
+
+def _watch_command(args: argparse.Namespace) -> int:
+    """Re-render figure sources as their inputs change."""
+    watcher = render.Watcher(
+        _expand_sources(args.sources),
+        args.outdir,
+        args.formats or ["pdf"],
+        **_export_kwargs(args),
+    )
+    print(f"Watching {len(watcher.sources)} sources, press Ctrl+C to stop")
+    try:
+        watcher.run(interval=args.interval, callback=_report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the scilayout command line interface."""
+    parser = argparse.ArgumentParser(prog="scilayout")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render_parser = subparsers.add_parser(
+        "render", help="render figure scripts and layout specifications",
+    )
+    _add_export_arguments(render_parser)
+    render_parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="number of worker processes",
+    )
+    render_parser.add_argument(
+        "--fork",
+        action="store_true",
+        help="warm up once and fork workers from the warm process",
+    )
+    render_parser.set_defaults(func=_render_command)
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="re-render figures whenever their inputs change",
+    )
+    _add_export_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--interval", type=float, default=0.5, help="seconds between checks",
+    )
+    watch_parser.set_defaults(func=_watch_command)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,322 @@
+"""Plot datasets with far more points than a panel has pixels.
+
+A panel a few cm wide is only a few hundred pixels across at print resolution, so
+drawing 10^7 points mostly draws over the same pixels again and again. The artists here
+keep a reference to the full dataset (which can be a memory-mapped array, e.g. from
+`numpy.load(path, mmap_mode="r")`) and at draw time reduce it to the panel's resolution
+at the dpi being drawn, from its physical size:
+
+- `DenseLine` keeps the minimum and maximum y value in each pixel column, so the
+  drawn line covers the same pixels as the full line.
+- `DensityImage` bins scatter data into a 2D histogram with one bin per pixel, coloured
+  by the number of points.
+
+Both are recomputed only when the axes limits or the panel's pixel size change, and the
+data is processed in chunks so that memory use does not grow with the dataset.
+Use them through `PanelAxes.plot_dense` and `PanelAxes.scatter_dense`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.backend_bases import RendererBase
+    from matplotlib.transforms import Transform
+
+CHUNK_SIZE = 2**22
+"""Number of points processed at once."""
+
+
+def _chunks(n: int) -> range:
+    """Start indices of the chunks of an array of length n."""
+    return range(0, n, CHUNK_SIZE)
+
+
+def _pixels(length: float, renderer: RendererBase) -> int:
+    """Number of pixels across a length in display units at the dpi being drawn.
+
+    Vector backends draw in points but place images at the export dpi, which the
+    image magnification accounts for.
+    """
+    return max(round(length * renderer.get_image_magnification()), 1)
+
+
+def data_range(values: np.ndarray) -> tuple[float, float]:
+    """Find the minimum and maximum of an array, ignoring NaNs, one chunk at a time.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Data, may be memory-mapped.
+
+    Returns
+    -------
+    tuple[float, float]
+        The minimum and maximum.
+
+    """
+    low, high = np.inf, -np.inf
+    for start in _chunks(len(values)):
+        chunk = np.asarray(values[start:start + CHUNK_SIZE], dtype=float)
+        if np.isnan(chunk).all():
+            continue
+        low = min(low, np.nanmin(chunk))
+        high = max(high, np.nanmax(chunk))
+    return low, high
+
+
+def _is_sorted(values: np.ndarray) -> bool:
+    """Check that an array is in ascending order, one chunk at a time."""
+    for start in _chunks(len(values)):
+        # Overlap chunks by one element to check the boundary between them
+        chunk = np.asarray(values[max(start - 1, 0):start + CHUNK_SIZE])
+        if np.any(chunk[1:] < chunk[:-1]):
+            return False
+    return True
+
+
+def decimate_minmax(
+    x: np.ndarray,
+    y: np.ndarray,
+    xlim: tuple[float, float],
+    n_columns: int,
+    scale: Transform | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a line to the minimum and maximum y value in each pixel column.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        x values in ascending order, may be memory-mapped.
+    y : np.ndarray
+        y values, may be memory-mapped.
+    xlim : tuple[float, float]
+        The x range that is visible.
+    n_columns : int
+        Number of pixel columns the x range is drawn across.
+    scale : Transform | None
+        The axis scale transform (e.g. for a log axis), columns are spaced evenly after it.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The decimated x and y values. Each column with data gives two points at its
+        centre, and the nearest points outside the x range are kept so that the line
+        continues off the edges of the panel.
+
+    """
+    transform = (lambda values: values) if scale is None else scale.transform
+    low, high = sorted(xlim)
+    start = np.searchsorted(x, low, side="left")
+    stop = np.searchsorted(x, high, side="right")
+    t_low, t_high = transform(np.array([low, high], dtype=float))
+    width = (t_high - t_low) / n_columns
+
+    y_min = np.full(n_columns, np.inf)
+    y_max = np.full(n_columns, -np.inf)
+    for chunk_start in range(start, stop, CHUNK_SIZE):
+        chunk_stop = min(chunk_start + CHUNK_SIZE, stop)
+        x_chunk = transform(np.asarray(x[chunk_start:chunk_stop], dtype=float))
+        y_chunk = np.asarray(y[chunk_start:chunk_stop], dtype=float)
+        valid = ~np.isnan(y_chunk)
+        columns = ((x_chunk[valid] - t_low) / width).astype(np.intp)
+        np.clip(columns, 0, n_columns - 1, out=columns)
+        y_chunk = y_chunk[valid]
+        if len(columns) == 0:
+            continue
+        # x is sorted, so each column is a contiguous run of points
+        run_starts = np.flatnonzero(np.diff(columns, prepend=-1))
+        runs = columns[run_starts]
+        y_min[runs] = np.minimum(y_min[runs], np.minimum.reduceat(y_chunk, run_starts))
+        y_max[runs] = np.maximum(y_max[runs], np.maximum.reduceat(y_chunk, run_starts))
+
+    filled = np.flatnonzero(np.isfinite(y_min))
+    centres = t_low + (filled + 0.5) * width
+    if scale is not None:
+        centres = scale.inverted().transform(centres)
+    x_out = np.repeat(centres, 2)
+    y_out = np.column_stack([y_min[filled], y_max[filled]]).ravel()
+
+    # Keep the neighbouring points so the line runs to the edges of the panel
+    before = slice(max(start - 1, 0), start)
+    after = slice(stop, stop + 1)
+    x_out = np.concatenate([x[before], x_out, x[after]], dtype=float)
+    y_out = np.concatenate([y[before], y_out, y[after]], dtype=float)
+    return np.asarray(x_out), np.asarray(y_out)
+
+
+def bin_counts(
+    x: np.ndarray,
+    y: np.ndarray,
+    extent: tuple[float, float, float, float],
+    shape: tuple[int, int],
+    scales: tuple[Transform | None, Transform | None] = (None, None),
+) -> np.ndarray:
+    """Count the points in each bin of a regular 2D grid.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        x values, may be memory-mapped.
+    y : np.ndarray
+        y values, may be memory-mapped.
+    extent : tuple[float, float, float, float]
+        The grid's (left, right, bottom, top) in data coordinates.
+    shape : tuple[int, int]
+        Number of (rows, columns) of bins.
+    scales : tuple[Transform | None, Transform | None]
+        The x and y axis scale transforms (e.g. for log axes), bins are spaced evenly
+        after them.
+
+    Returns
+    -------
+    np.ndarray
+        Counts of shape `shape`, the first row at the bottom.
+
+    """
+    x_transform, y_transform = (
+        (lambda values: values) if scale is None else scale.transform
+        for scale in scales
+    )
+    n_rows, n_cols = shape
+    left, right = x_transform(np.array(extent[:2], dtype=float))
+    bottom, top = y_transform(np.array(extent[2:], dtype=float))
+    counts = np.zeros(n_rows * n_cols, dtype=np.int64)
+    for start in _chunks(len(x)):
+        x_chunk = x_transform(np.asarray(x[start:start + CHUNK_SIZE], dtype=float))
+        y_chunk = y_transform(np.asarray(y[start:start + CHUNK_SIZE], dtype=float))
+        columns = np.floor((x_chunk - left) * (n_cols / (right - left)))
+        rows = np.floor((y_chunk - bottom) * (n_rows / (top - bottom)))
+        inside = (columns >= 0) & (columns < n_cols) & (rows >= 0) & (rows < n_rows)
+        index = rows[inside].astype(np.intp) * n_cols + columns[inside].astype(np.intp)
+        counts += np.bincount(index, minlength=n_rows * n_cols)
+    return counts.reshape(shape)
+
+
+class DenseLine(Line2D):
+    """A line that is decimated to the pixel columns of its axes when drawn."""
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, **kwargs: Any) -> None:
+        """Create the line, add it to axes with `Axes.add_line`.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            x values in ascending order, may be memory-mapped.
+        y : np.ndarray
+            y values of the same length, may be memory-mapped.
+        kwargs : dict
+            Keyword arguments for matplotlib.lines.Line2D.
+
+        """
+        if len(x) != len(y):
+            msg = "x and y must have the same length"
+            raise ValueError(msg)
+        if not _is_sorted(x):
+            msg = "x must be in ascending order"
+            raise ValueError(msg)
+        self.full_x = x
+        self.full_y = y
+        self._resolution = None
+        # Start with the extremes of the data so that the axes limits fit all of it
+        y_low, y_high = data_range(y)
+        super().__init__(
+            [x[0], x[0], x[-1], x[-1]] if len(x) else [],
+            [y_low, y_high, y_low, y_high] if len(x) else [],
+            **kwargs,
+        )
+
+    def _decimate(self, n_columns: int) -> None:
+        """Reduce the data to the current x limits and number of pixel columns."""
+        ax = self.axes
+        xlim = tuple(ax.viewLim.intervalx)
+        resolution = (xlim, n_columns, ax.get_xscale())
+        if resolution == self._resolution or len(self.full_x) == 0:
+            return
+        self._resolution = resolution
+        scale = None if ax.get_xscale() == "linear" else ax.xaxis.get_transform()
+        self.set_data(decimate_minmax(self.full_x, self.full_y, xlim, n_columns, scale))
+
+    def draw(self, renderer: RendererBase) -> None:
+        """Decimate to the panel's width in pixels at the dpi being drawn, then draw."""
+        if self.axes is not None:
+            self._decimate(_pixels(self.axes.bbox.width, renderer))
+        super().draw(renderer)
+
+
+class DensityImage(AxesImage):
+    """An image of the number of scatter points in each pixel of its axes."""
+
+    def __init__(
+        self,
+        ax: Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        pixels_per_bin: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        """Create the image, add it to the axes with `Axes.add_image`.
+
+        Parameters
+        ----------
+        ax : Axes
+            Axes the image will be drawn in.
+        x : np.ndarray
+            x values, may be memory-mapped.
+        y : np.ndarray
+            y values of the same length, may be memory-mapped.
+        pixels_per_bin : int
+            Width and height of each bin in pixels.
+        kwargs : dict
+            Keyword arguments for matplotlib.image.AxesImage (e.g. cmap, norm).
+
+        """
+        if len(x) != len(y):
+            msg = "x and y must have the same length"
+            raise ValueError(msg)
+        kwargs.setdefault("interpolation", "nearest")
+        # Drawn over the whole axes, so that it never changes the axes limits
+        super().__init__(
+            ax, origin="lower", extent=(0, 1, 0, 1), transform=ax.transAxes, **kwargs,
+        )
+        self.full_x = x
+        self.full_y = y
+        self.pixels_per_bin = pixels_per_bin
+        self._autoscale_norm = self.norm.vmin is None and self.norm.vmax is None
+        self._resolution = None
+        self.set_data(np.ma.masked_all((1, 1)))
+
+    def _bin(self, shape: tuple[int, int]) -> None:
+        """Count the points at the current limits and number of pixels."""
+        ax = self.axes
+        extent = (*ax.viewLim.intervalx, *ax.viewLim.intervaly)
+        resolution = (extent, shape, ax.get_xscale(), ax.get_yscale())
+        if resolution == self._resolution:
+            return
+        self._resolution = resolution
+        scales = [
+            None if axis.get_scale() == "linear" else axis.get_transform()
+            for axis in (ax.xaxis, ax.yaxis)
+        ]
+        counts = bin_counts(self.full_x, self.full_y, extent, shape, scales)
+        self.set_data(np.ma.masked_equal(counts, 0))
+        if self._autoscale_norm:
+            self.norm.vmin = self.norm.vmax = None
+            self.autoscale_None()
+
+    def draw(self, renderer: RendererBase) -> None:
+        """Bin to the panel's size in pixels at the dpi being drawn, then draw."""
+        bbox = self.axes.bbox
+        self._bin(
+            (
+                _pixels(bbox.height / self.pixels_per_bin, renderer),
+                _pixels(bbox.width / self.pixels_per_bin, renderer),
+            ),
+        )
+        super().draw(renderer)
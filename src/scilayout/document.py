@@ -0,0 +1,136 @@
+"""Export many figures as the pages of a single PDF document.
+
+Saving each figure of a supplement to its own PDF embeds a subset of the same fonts in
+every file. `export_document` writes all figures into one PDF instead, so each font is
+embedded once for the whole document. Pages are written to the file as they are made
+and each figure is closed once its page is written, so memory use does not grow with
+the number of pages.
+
+Example usage:
+
+```python
+import scilayout
+
+def make_page(n):
+    fig = scilayout.Figure()
+    ...
+    return fig
+
+scilayout.export_document((make_page(n) for n in range(200)), "supplement.pdf")
+```
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from . import base, render
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from .classes import SciFigure
+
+
+def _build(source: Any) -> list[SciFigure]:
+    """Build the figures of a page source in a worker process."""
+    figures, _ = render._build_figures(source, {})
+    # Unpickling a figure made through pyplot registers it with pyplot again, so it
+    # does not need to stay open here
+    plt.close("all")
+    return figures
+
+
+def _built_in_order(
+    sources: Iterable[Any],
+    workers: int,
+) -> Iterator[SciFigure]:
+    """Build page sources in worker processes, yielding figures in source order.
+
+    Only a few pages more than there are workers are in flight at once, so that built
+    figures do not pile up waiting to be written.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=render.warm_up,
+    ) as executor:
+        window = 2 * workers
+        pending = deque()
+        for source in sources:
+            pending.append(executor.submit(_build, source))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _figures(sources: Iterable[Any]) -> Iterator[Figure]:
+    """Yield figures, calling any functions that build one."""
+    for source in sources:
+        yield source if isinstance(source, Figure) else source()
+
+
+def export_document(
+    figures: Iterable[SciFigure | Callable[[], SciFigure] | str | Path | dict],
+    path: str | Path,
+    workers: int | None = None,
+    dpi: float = 300.0,
+    bbox: str = "tight",
+    **export_kwargs: Any,
+) -> int:
+    """Export figures as the pages of one PDF, in order.
+
+    Pages are saved with the same settings as `scilayout.base.savefigure` (deterministic
+    metadata, tight bounding box, dense artists rasterized), and each figure is closed
+    once its page has been written.
+
+    Parameters
+    ----------
+    figures : Iterable
+        Figures, or functions that return a figure. A generator keeps only the figure
+        being written in memory. With `workers`, picklable functions, figure scripts or
+        layout specifications (see `scilayout.render`) that are built in worker
+        processes.
+    path : str | Path
+        The PDF file to write.
+    workers : int | None
+        Build the pages in this many worker processes, sending each finished figure back
+        to be written. By default the pages are built in the current process.
+    dpi : float
+        Dots per inch of rasterized content, default 300.
+    bbox : str
+        Bounding box of each page, default 'tight'.
+    export_kwargs : dict
+        Other keyword arguments for `scilayout.base.savefigure`.
+
+    Returns
+    -------
+    int
+        Number of pages written.
+
+    """
+    path = Path(path)
+    if workers is None:
+        pages = _figures(figures)
+    else:
+        pages = _built_in_order(figures, workers)
+    save = partial(
+        base.savefigure, dpi=dpi, bbox=bbox, format="pdf", **export_kwargs,
+    )
+
+    n_pages = 0
+    with PdfPages(path, metadata=base.DETERMINISTIC_METADATA[".pdf"]) as pdf:
+        for fig in pages:
+            save(fig, pdf)
+            plt.close(fig)
+            n_pages += 1
+    return n_pages
@@ -0,0 +1,129 @@
+"""Cached measurement of text sizes.
+
+Figures reuse the same few strings (scale bar units, panel letters) at the same font
+sizes many times, and measuring text means laying it out with the font. The size of a
+text depends only on the string, the font properties, the rotation, the line spacing
+and the dpi, so measurements are kept in a least-recently-used cache keyed on those.
+
+Example usage:
+
+```python
+width, height = text_size(scalebar.text)  # pixels at the figure dpi
+```
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.text import Text
+
+from .locations import inch_to_cm
+
+CACHE_SIZE = 4096
+"""Number of text measurements kept."""
+
+
+def _font_key(fontproperties: FontProperties) -> tuple:
+    """An immutable copy of font properties, to use as part of a cache key."""
+    return (
+        tuple(fontproperties.get_family()),
+        fontproperties.get_style(),
+        fontproperties.get_variant(),
+        fontproperties.get_weight(),
+        fontproperties.get_stretch(),
+        fontproperties.get_size_in_points(),
+        fontproperties.get_file(),
+        fontproperties.get_math_fontfamily(),
+    )
+
+
+@lru_cache(maxsize=None)
+def _measuring_figure(dpi: float) -> tuple[Figure, RendererAgg]:
+    """A figure and renderer at the dpi, only used to lay out text."""
+    return Figure(dpi=dpi), RendererAgg(1, 1, dpi)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _measure(
+    string: str,
+    font: tuple,
+    dpi: float,
+    rotation: float,
+    linespacing: float,
+    usetex: bool,
+) -> tuple[float, float]:
+    """Lay out a text and return its width and height in pixels."""
+    family, style, variant, weight, stretch, size, file, math_fontfamily = font
+    fontproperties = FontProperties(
+        family=list(family),
+        style=style,
+        variant=variant,
+        weight=weight,
+        stretch=stretch,
+        size=size,
+        fname=file,
+        math_fontfamily=math_fontfamily,
+    )
+    figure, renderer = _measuring_figure(dpi)
+    text = Text(
+        0,
+        0,
+        string,
+        fontproperties=fontproperties,
+        rotation=rotation,
+        linespacing=linespacing,
+        usetex=usetex,
+    )
+    text.set_figure(figure)
+    bbox = text.get_window_extent(renderer)
+    return bbox.width, bbox.height
+
+
+def text_size(text: Text, dpi: float | None = None) -> tuple[float, float]:
+    """Measure the size of a text's bounding box, using the cache.
+
+    :param text: Text to measure
+    :type text: matplotlib.text.Text
+    :param dpi: Dots per inch to measure at, defaults to the dpi of the text's figure
+    :type dpi: float, optional
+    :return: Width and height in pixels (display units)
+    :rtype: tuple[float, float]
+    """
+    if dpi is None:
+        dpi = text.get_figure().dpi
+    return _measure(
+        text.get_text(),
+        _font_key(text.get_fontproperties()),
+        dpi,
+        text.get_rotation(),
+        text.get_linespacing(),
+        text.get_usetex(),
+    )
+
+
+def text_size_cm(text: Text) -> tuple[float, float]:
+    """Measure the size of a text's bounding box in cm, using the cache.
+
+    :param text: Text to measure
+    :type text: matplotlib.text.Text
+    :return: Width and height in cm
+    :rtype: tuple[float, float]
+    """
+    dpi = text.get_figure().dpi
+    width, height = text_size(text, dpi)
+    return inch_to_cm(width / dpi), inch_to_cm(height / dpi)
+
+
+def cache_info() -> tuple:
+    """Hits, misses and size of the text measurement cache."""
+    return _measure.cache_info()
+
+
+def clear_cache() -> None:
+    """Empty the text measurement cache, e.g. after installing fonts."""
+    _measure.cache_clear()
+
@@ -1,13 +1,22 @@
 """Grid overlay for matplotlib figures."""
 
+from __future__ import annotations
+
+import math
 from typing import TYPE_CHECKING
 
 import numpy as np
+from matplotlib.artist import Artist
 from matplotlib.axes import Axes
+from matplotlib.markers import MarkerStyle
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D, IdentityTransform
 
 from . import locations
 
 if TYPE_CHECKING:
+    from matplotlib.backend_bases import RendererBase
+    from matplotlib.figure import Figure
 
     from .classes import SciFigure
 
@@ -26,7 +35,7 @@ class GuideGridClass:
 
     def __init__(
         self,
-        figure: "SciFigure",
+        figure: SciFigure,
         major_interval: float = 5,
         minor_interval: float = 1,
         half_spacer: bool = True,
@@ -177,3 +186,103 @@ class GuideGridClass:
             self.redraw()
         self.ax.set_visible(True)
         self.figure.canvas.draw()
+
+
+class CMOverlay(Artist):
+    """Markers every cm (and half cm) across a figure, to view the cm size of items.
+
+    A single artist that places its markers in cm through the figure's cm transform,
+    so resizing the figure only changes the transform. The marker positions are only
+    regenerated when the figure's width or height in cm crosses a whole cm.
+
+    The overlay is only for viewing the figure while laying it out, it is not drawn
+    when the figure is saved.
+    """
+
+    # (spacing, offset, marker, size in points, linewidth) of each set of markers
+    MARKERS = (
+        (1, 0, "+", math.sqrt(5), 1.0),
+        (1, 0.5, "x", math.sqrt(5), 0.3),
+        (5, 0, "+", 6.0, 2.0),
+    )
+
+    def __init__(
+        self,
+        figure: Figure,
+        width_cm: float | None = None,
+        height_cm: float | None = None,
+        color: str = "k",
+        alpha: float = 0.3,
+    ) -> None:
+        """Create the overlay, add it with `Figure.add_artist`.
+
+        Parameters
+        ----------
+        figure : matplotlib.figure.Figure | scilayout.classes.SciFigure
+            Figure to overlay.
+        width_cm : float | None (optional)
+            Width to cover in cm, defaults to the width of the figure when drawn
+        height_cm : float | None (optional)
+            Height to cover in cm, defaults to the height of the figure when drawn
+        color : str (optional)
+            Colour of the markers, defaults to black
+        alpha : float (optional)
+            Transparency of the markers, defaults to 0.3
+
+        """
+        super().__init__()
+        self.set_figure(figure)
+        self.set_transform(locations.CMTransform(figure) + figure.transFigure)
+        self.set_zorder(10_000)  # above everything else
+        self.set_in_layout(False)
+        self.set_alpha(alpha)
+        self.width_cm = width_cm
+        self.height_cm = height_cm
+        self.color = color
+        self._covered = None  # whole cm covered by the marker positions
+        self._positions = []
+
+    def _update_positions(self) -> None:
+        """Generate the marker positions if the whole cm size has changed."""
+        width_cm, height_cm = locations.inch_to_cm(self.get_figure().get_size_inches())
+        width_cm = width_cm if self.width_cm is None else self.width_cm
+        height_cm = height_cm if self.height_cm is None else self.height_cm
+        # Rounded so that floating point noise in the cm size does not add a marker
+        covered = (math.floor(round(width_cm, 6)), math.floor(round(height_cm, 6)))
+        if covered == self._covered:
+            return
+        self._covered = covered
+        self._positions = []
+        for spacing, offset, *_ in self.MARKERS:
+            x, y = np.meshgrid(
+                np.arange(0, covered[0] + 1, spacing) + offset,
+                np.arange(0, covered[1] + 1, spacing) + offset,
+            )
+            self._positions.append(np.column_stack([x.ravel(), y.ravel()]))
+
+    def draw(self, renderer: RendererBase) -> None:
+        """Draw the markers, unless the figure is being saved."""
+        figure = self.get_figure()
+        if not self.get_visible() or figure.canvas.is_saving():
+            return
+        self._update_positions()
+        transform = self.get_transform()
+        gc = renderer.new_gc()
+        gc.set_foreground(self.color)
+        gc.set_alpha(self.get_alpha())
+        for (*_, marker, size, linewidth), positions in zip(
+            self.MARKERS, self._positions,
+        ):
+            style = MarkerStyle(marker)
+            gc.set_linewidth(linewidth)
+            renderer.draw_markers(
+                gc,
+                style.get_path(),
+                style.get_transform() + Affine2D().scale(
+                    renderer.points_to_pixels(size),
+                ),
+                Path(transform.transform(positions)),
+                IdentityTransform(),
+            )
+        gc.restore()
+        self.stale = False
@@ -0,0 +1,270 @@
+"""Groups of panels laid out in their own cm frame, moved and scaled as one.
+
+A `PanelGroup` has a local cm frame (origin at its top left, y down, like the figure)
+placed in the frame of its parent, the figure or another group, by an offset and a
+scale. Panels, panel labels and text added to the group are positioned in the local
+frame through the group's transform, so moving or scaling the group is a single update
+of that transform, and matplotlib places the children from it when the figure is drawn.
+Scale bars are drawn in data coordinates and follow their panels.
+
+Example usage:
+
+```python
+block = fig.add_group(origin=(1, 1))
+for row in range(3):
+    for col in range(3):
+        block.add_panel((col * 2.1, row * 2.1, col * 2.1 + 2, row * 2.1 + 2))
+cbar = block.add_panel((6.5, 0, 6.8, 6.2))
+block.add_text(0, -0.3, "a", fontweight="bold")
+
+block.set_origin(8, 1)  # move everything in the block
+block.set_scale(0.8)
+```
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from matplotlib.transforms import Affine2D, Bbox, IdentityTransform, Transform
+
+from . import locations, scalebars
+
+if TYPE_CHECKING:
+    from matplotlib.backend_bases import RendererBase
+    from matplotlib.text import Text
+
+    from .classes import PanelAxes, SciFigure
+    from .types import BoundCM, ExtentCM
+
+
+class PanelGroup:
+    """Panels and text positioned in a cm frame that moves and scales as one.
+
+    Create with `SciFigure.add_group` or `PanelGroup.add_group` for nested groups.
+    """
+
+    figure: SciFigure
+    parent: SciFigure | PanelGroup
+    transGroup: Transform
+    """Local cm to figure cm, the composition of the group's placement with those of
+    the groups it is nested in."""
+    transCM: Transform
+    """Local cm to figure fraction, for artists positioned in the group."""
+
+    def __init__(
+        self,
+        parent: SciFigure | PanelGroup,
+        origin: tuple[float, float] = (0.0, 0.0),
+        scale: float = 1.0,
+    ) -> None:
+        """Create an empty group.
+
+        Parameters
+        ----------
+        parent : SciFigure | PanelGroup
+            Figure or group the group is placed in.
+        origin : tuple[float, float]
+            Location (cm) of the group's top left corner in the parent's frame.
+        scale : float
+            Size of a local cm in the parent's frame.
+
+        """
+        self.parent = parent
+        if isinstance(parent, PanelGroup):
+            self.figure = parent.figure
+            parent_transform = parent.transGroup
+        else:
+            self.figure = parent
+            parent_transform = IdentityTransform()
+        self._placement = Affine2D()
+        self.transGroup = self._placement + parent_transform
+        self.transCM = self.transGroup + self.figure.transCM
+        self.panels: list[PanelAxes] = []
+        self.groups: list[PanelGroup] = []
+        self.texts: list[Text] = []
+        self.scalebars: list[scalebars.ScaleBarGroup] = []
+        self._origin = (0.0, 0.0)
+        self._scale = 1.0
+        self._set_placement(origin, scale)
+
+    def __repr__(self) -> str:
+        """Number of panels and groups."""
+        return (
+            f"<PanelGroup with {len(self.panels)} panels and {len(self.groups)} groups>"
+        )
+
+    # --- Coordinates ---
+    def to_figure_cm(self, values: Any) -> np.ndarray:
+        """Convert local cm to figure cm.
+
+        Parameters
+        ----------
+        values : array_like
+            Points (x, y) or extents (x0, y0, x1, y1), or arrays of them, in local cm.
+
+        Returns
+        -------
+        np.ndarray
+            The same shape, in cm from the top left corner of the figure.
+
+        """
+        values = np.asarray(values, dtype=float)
+        points = self.transGroup.transform(values.reshape(-1, 2))
+        return points.reshape(values.shape)
+
+    def from_figure_cm(self, values: Any) -> np.ndarray:
+        """Convert figure cm to local cm (the inverse of `to_figure_cm`)."""
+        values = np.asarray(values, dtype=float)
+        points = self.transGroup.inverted().transform(values.reshape(-1, 2))
+        return points.reshape(values.shape)
+
+    # --- Placement ---
+    def get_origin(self) -> tuple[float, float]:
+        """Location (cm) of the group's top left corner in the parent's frame."""
+        return self._origin
+
+    def get_scale(self) -> float:
+        """Size of a local cm in the parent's frame."""
+        return self._scale
+
+    def set_origin(self, x: float, y: float) -> None:
+        """Move the group's top left corner to (x, y) cm in the parent's frame."""
+        self._set_placement((x, y), self._scale)
+
+    def translate(self, dx: float, dy: float) -> None:
+        """Move the group by (dx, dy) cm in the parent's frame, right and down."""
+        x, y = self._origin
+        self._set_placement((x + dx, y + dy), self._scale)
+
+    def set_scale(self, scale: float) -> None:
+        """Scale the group about its top left corner.
+
+        Panels and distances in the group are scaled, text keeps its font size.
+        """
+        self._set_placement(self._origin, scale)
+
+    def _set_placement(self, origin: tuple[float, float], scale: float) -> None:
+        """Place the local frame in the parent's, and update the panel registry."""
+        if scale <= 0:
+            msg = "Scale must be positive"
+            raise ValueError(msg)
+        self._origin = (float(origin[0]), float(origin[1]))
+        self._scale = float(scale)
+        # Invalidates the transforms of this group and of the groups nested in it
+        self._placement.clear().scale(self._scale).translate(*self._origin)
+        self._update_registry()
+
+    def _update_registry(self) -> None:
+        """Recompute the figure cm extents of the panels in the group and nested groups.
+
+        One vectorized conversion per group, the panels themselves are placed from the
+        transform when the figure is drawn.
+        """
+        registry = self.figure.panels
+        if self.panels:
+            local = np.array([ax._local_location for ax in self.panels])
+            rows = [registry.index(ax) for ax in self.panels]
+            registry._set_rows(rows, self.to_figure_cm(local))
+        for group in self.groups:
+            group._update_registry()
+
+    # --- Children ---
+    def add_panel(
+        self,
+        location: BoundCM | ExtentCM,
+        panellabel: str | None = None,
+        method: str = "bbox",
+        **kwargs: Any,
+    ) -> PanelAxes:
+        """Add a panel positioned in the group's frame.
+
+        Parameters
+        ----------
+        location : BoundCM | ExtentCM | tuple[float, float, float, float]
+            Location of the panel in local cm, as for `SciFigure.add_panel`.
+        panellabel : str | None
+            Letter to initialise the panel with.
+        method : str
+            "bbox" (default) or "size", as for `SciFigure.add_panel`.
+        kwargs : dict
+            Key word arguments to pass to PanelAxes initialisation.
+
+        Returns
+        -------
+        PanelAxes
+            The panel, whose `set_location` is then also in local cm.
+
+        """
+        ax = self.figure.add_panel(
+            location, panellabel=panellabel, method=method, group=self, **kwargs,
+        )
+        self.panels.append(ax)
+        return ax
+
+    def add_group(
+        self,
+        origin: tuple[float, float] = (0.0, 0.0),
+        scale: float = 1.0,
+    ) -> PanelGroup:
+        """Add a group nested in this one, placed in this group's frame."""
+        group = PanelGroup(self, origin=origin, scale=scale)
+        self.groups.append(group)
+        return group
+
+    def add_text(self, x: float, y: float, s: str, **kwargs: Any) -> Text:
+        """Add text at (x, y) local cm, e.g. a label for the whole group.
+
+        Keyword arguments are passed to `matplotlib.figure.Figure.text`.
+        """
+        transform = self.transCM + self.figure.transFigure
+        text = self.figure.text(x, y, s, transform=transform, **kwargs)
+        self.texts.append(text)
+        return text
+
+    def add_scalebars(self, length: float, **kwargs: Any) -> scalebars.ScaleBarGroup:
+        """Add the same scalebar to every panel in the group and nested groups.
+
+        Keyword arguments are passed to `scilayout.scalebars.add_scalebars`.
+        """
+        bars = scalebars.add_scalebars(self.get_panels(), length, **kwargs)
+        self.scalebars.append(bars)
+        return bars
+
+    def get_panels(self, nested: bool = True) -> list[PanelAxes]:
+        """The panels of the group, and by default those of nested groups."""
+        panels = list(self.panels)
+        if nested:
+            for group in self.groups:
+                panels.extend(group.get_panels())
+        return panels
+
+    def get_extent(self) -> tuple[float, float, float, float]:
+        """Extent (x0, y0, x1, y1) in figure cm of the panels in the group."""
+        extents = np.array([ax.get_location() for ax in self.get_panels()])
+        if not len(extents):
+            msg = "The group has no panels"
+            raise ValueError(msg)
+        return (*extents[:, :2].min(axis=0), *extents[:, 2:].max(axis=0))
+
+    def remove(self) -> None:
+        """Remove the group and everything in it from the figure."""
+        for group in list(self.groups):
+            group.remove()
+        for bars in self.scalebars:
+            bars.remove()
+        for text in self.texts:
+            text.remove()
+        for ax in list(self.panels):
+            ax.remove()
+        self.panels, self.texts, self.scalebars = [], [], []
+        self.parent.groups.remove(self)
+
+    # --- Placing panels when drawing ---
+    def _locate(self, ax: PanelAxes, renderer: RendererBase | None) -> Bbox:
+        """Axes locator: the position of a panel from its local location."""
+        location = self.to_figure_cm(ax._local_location)
+        return Bbox.from_bounds(
+            *locations.locationcm_to_position(self.figure, location),
+        )
@@ -88,6 +88,17 @@ def fraction_to_cm(fig, xy) -> tuple[centimetres, centimetres]:
     return xy[0] * figsize[0], figsize[1] - (figsize[1] * xy[1])
 
 
+def _fraction_size_inches(fig: matplotlib.figure.Figure) -> tuple[inches, inches]:
+    """Size of the figure that figure fractions refer to.
+
+    While a figure is saved with bbox_inches="tight" it reports the size of the cropped
+    box, but figure fractions still refer to the whole figure, so the size is measured
+    through transFigure instead.
+    """
+    (x0, y0), (x1, y1) = fig.transFigure.transform([(0, 0), (1, 1)])
+    return (x1 - x0) / fig.dpi, (y1 - y0) / fig.dpi
+
+
 # --- Classes ---
 class CMTransform(Transform):
     """A transformation class to convert coordinates from centimeters to figure
@@ -106,9 +117,9 @@ class CMTransform(Transform):
         super().__init__()
         self.fig = fig
 
-    def transform(self, values):
+    def transform_non_affine(self, values):
         inch_coords = np.array(values) / 2.54
-        figwidth, figheight = self.fig.get_size_inches()
+        figwidth, figheight = _fraction_size_inches(self.fig)
         x, y = inch_coords.T
         return np.array([x / figwidth, 1 - (y / figheight)]).T  # flip y
 
@@ -125,9 +136,9 @@ class InvertedCMTransform(Transform):
         super().__init__(*args, **kwargs)
         self.fig = fig
 
-    def transform(self, values):
+    def transform_non_affine(self, values):
         # Convert figure coordinates to inches
-        figwidth, figheight = self.fig.get_size_inches()
+        figwidth, figheight = _fraction_size_inches(self.fig)
         x, y = np.array(values).T
         inch_coords = np.array(
             [x * figwidth, (1 - y) * figheight],
@@ -0,0 +1,151 @@
+"""Render the same layout for many datasets, one output file per dataset.
+
+The layout is built once, then for each dataset a plotting function updates the data
+artists of the same figure (e.g. with `set_data` or `set_array`) before it is exported.
+Datasets are taken from an iterator one at a time, so memory use stays the same however
+many there are.
+
+Example usage:
+
+```python
+def layout():
+    fig = scilayout.Figure()
+    fig.set_size_cm(12, 6)
+    fig.add_panel((1, 1, 5.5, 5), panellabel="a")
+    fig.add_panel((7, 1, 11.5, 5), panellabel="b")
+    return fig
+
+def plot(fig, subject, artists):
+    ax_a, ax_b = fig.get_axes()
+    if artists is None:  # first dataset, create the artists
+        return ax_a.plot(subject.time, subject.trace)[0], ax_b.imshow(subject.image)
+    line, image = artists
+    line.set_data(subject.time, subject.trace)
+    image.set_array(subject.image)
+    return artists
+
+small_multiples(layout, load_subjects(), plot, "figures/subject_{index:04d}.png")
+```
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from . import base, render
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .classes import SciFigure
+
+    PlotFunction = Callable[[SciFigure, Any, Any], Any]
+
+
+class _Multiple:
+    """A figure with its layout built and the artists of the last dataset plotted."""
+
+    def __init__(self, layout: Callable[[], SciFigure], plot_fn: PlotFunction) -> None:
+        self.fig = layout()
+        self.plot_fn = plot_fn
+        self.artists = None
+
+    def export(self, data: Any, path: Path, export_kwargs: dict[str, Any]) -> Path:
+        """Plot a dataset into the figure and export it."""
+        self.artists = self.plot_fn(self.fig, data, self.artists)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        base.savefigure(self.fig, path, **export_kwargs)
+        return path
+
+
+# The warm figure of a worker process
+_worker_multiple: _Multiple | None = None
+
+
+def _init_worker(layout: Callable[[], SciFigure], plot_fn: PlotFunction) -> None:
+    """Warm up a worker process and build its figure."""
+    global _worker_multiple
+    render.warm_up()
+    _worker_multiple = _Multiple(layout, plot_fn)
+
+
+def _export_in_worker(data: Any, path: Path, export_kwargs: dict[str, Any]) -> Path:
+    """Plot and export a dataset with the worker's figure."""
+    return _worker_multiple.export(data, path, export_kwargs)
+
+
+def small_multiples(
+    layout: Callable[[], SciFigure],
+    data_iter: Iterable[Any],
+    plot_fn: PlotFunction,
+    out_pattern: str,
+    workers: int | None = None,
+    **export_kwargs: Any,
+) -> int:
+    """Export a figure for every dataset, reusing one figure with the same layout.
+
+    Parameters
+    ----------
+    layout : Callable[[], SciFigure]
+        Builds the figure with its panels, labels and anything else that is the same
+        for every dataset.
+    data_iter : Iterable
+        The datasets, e.g. a generator that loads them one at a time.
+    plot_fn : Callable[[SciFigure, Any, Any], Any]
+        Called as `plot_fn(fig, data, artists)` for each dataset and returns the data
+        artists. `artists` is None the first time, when the function creates them, and
+        afterwards whatever it returned last, for it to update with the new data.
+    out_pattern : str
+        Output path, formatted with the dataset's position, e.g.
+        "subject_{index:03d}.pdf" or "subject_{}.pdf". The suffix sets the file format.
+    workers : int | None
+        Export in this many worker processes, each with its own figure. `layout` and
+        `plot_fn` must then be picklable (defined at the top level of a module) and so
+        must the datasets. By default everything happens in the current process.
+    export_kwargs : dict
+        Keyword arguments for `scilayout.base.savefigure`.
+
+    Returns
+    -------
+    int
+        Number of figures exported.
+
+    """
+    paths = (
+        (data, Path(out_pattern.format(index, index=index)))
+        for index, data in enumerate(data_iter)
+    )
+    n_exported = 0
+    if workers is None:
+        multiple = _Multiple(layout, plot_fn)
+        try:
+            for data, path in paths:
+                multiple.export(data, path, export_kwargs)
+                n_exported += 1
+        finally:
+            multiple.fig.close()
+        return n_exported
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(layout, plot_fn),
+    ) as executor:
+        # Only a few datasets per worker are loaded at once
+        pending = deque()
+        for data, path in paths:
+            pending.append(
+                executor.submit(_export_in_worker, data, path, export_kwargs),
+            )
+            if len(pending) >= 2 * workers:
+                pending.popleft().result()
+                n_exported += 1
+        while pending:
+            pending.popleft().result()
+            n_exported += 1
+    return n_exported
@@ -0,0 +1,414 @@
+"""Registry of the panels of a figure, with their cm extents in one array.
+
+`SciFigure.panels` records every `PanelAxes` of the figure, without the guide grid and
+overlay axes that `fig.get_axes()` also returns, and keeps their extents
+(x0, y0, x1, y1, in cm from the top left corner) as the rows of an (N, 4) array. The
+array follows `PanelAxes.set_location`, removed panels and changes of the figure size,
+so questions about the layout are answered with numpy instead of a loop over axes:
+
+```python
+extents = fig.panels.extents
+left_column = fig.panels[extents[:, 0] < 5]
+below = fig.panels[fig.panels.in_region((0, 10, 30, 30))]
+
+fig.panels.translate(0, 1.5, panels=extents[:, 1] > 10)  # make room for a title
+fig.panels.align("top", panels=left_column)
+ax = fig.panels.panel_at(4.2, 7.5)
+```
+
+Moves change the extents of all the selected panels at once and then place each panel
+(and its label) from the new rows.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+
+from . import locations
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .classes import PanelAxes, SciFigure
+    from .types import ExtentCM
+
+    PanelSelection = Union[np.ndarray, Iterable[Union[PanelAxes, int]], None]
+
+_EDGES = ("left", "right", "top", "bottom", "hcentre", "vcentre")
+
+
+class PanelRegistry:
+    """The panels of a figure and their extents in cm.
+
+    Indexing with an integer gives a panel, indexing with a boolean mask or an array of
+    integers gives a list of panels, in the order of the rows of `extents`. Rows keep
+    their order except that removing a panel moves the last row into its place.
+    """
+
+    def __init__(self, fig: SciFigure) -> None:
+        """Create an empty registry for a figure."""
+        self._fig = fig
+        self._axes: list[PanelAxes] = []
+        self._rows: dict[PanelAxes, int] = {}
+        self._extents = np.empty((8, 4))
+        self._added = np.empty(8, dtype=np.int64)
+        self._n_added = 0
+        # Figure size (cm) the extents are for, they are rescaled when it changes
+        self._size_cm: tuple[float, float] | None = None
+        self._index: _BucketGrid | None = None
+        # Zorders of the rows, built with the index, see `_zorder_changed`
+        self._zorders: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        """Number of panels."""
+        return len(self._axes)
+
+    def __iter__(self) -> Iterator[PanelAxes]:
+        """Iterate over the panels in row order."""
+        return iter(list(self._axes))
+
+    def __contains__(self, ax: object) -> bool:
+        """Whether an axes is a panel of the figure."""
+        return ax in self._rows
+
+    def __getitem__(self, key: int | np.ndarray | slice) -> PanelAxes | list[PanelAxes]:
+        """A panel by row, or a list of panels by mask, rows or slice."""
+        if isinstance(key, (int, np.integer)):
+            return self._axes[key]
+        return [self._axes[row] for row in self._select(key)]
+
+    def __repr__(self) -> str:
+        """Number of panels."""
+        return f"<PanelRegistry with {len(self)} panels>"
+
+    @property
+    def extents(self) -> np.ndarray:
+        """Extents (x0, y0, x1, y1) in cm of the panels, one row each (read only)."""
+        extents = self._current().view()
+        extents.flags.writeable = False
+        return extents
+
+    def index(self, ax: PanelAxes) -> int:
+        """Row of a panel in `extents`."""
+        try:
+            return self._rows[ax]
+        except KeyError:
+            msg = "The axes is not a panel of this figure"
+            raise ValueError(msg) from None
+
+    # --- Queries ---
+    def in_region(
+        self,
+        region: ExtentCM | tuple[float, float, float, float],
+        within: bool = False,
+    ) -> np.ndarray:
+        """Mask of the panels that overlap a region, or lie within it.
+
+        Parameters
+        ----------
+        region : ExtentCM | tuple[float, float, float, float]
+            Region (x0, y0, x1, y1) in cm from the top left corner.
+        within : bool
+            Only panels entirely inside the region, instead of those that overlap it.
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask with an element for each row of `extents`.
+
+        """
+        x0, y0, x1, y1 = region
+        extents = self._current()
+        if within:
+            return (
+                (extents[:, 0] >= x0)
+                & (extents[:, 1] >= y0)
+                & (extents[:, 2] <= x1)
+                & (extents[:, 3] <= y1)
+            )
+        return (
+            (extents[:, 0] < x1)
+            & (extents[:, 2] > x0)
+            & (extents[:, 1] < y1)
+            & (extents[:, 3] > y0)
+        )
+
+    def panel_at(self, x: float, y: float) -> PanelAxes | None:
+        """The panel at a point, the one drawn on top where panels overlap.
+
+        Parameters
+        ----------
+        x : float
+            Distance from the left of the figure (cm).
+        y : float
+            Distance from the top of the figure (cm).
+
+        Returns
+        -------
+        PanelAxes | None
+            The panel, or None if there is none at the point.
+
+        """
+        row = self.rows_at(np.array([[x, y]]))[0]
+        return None if row < 0 else self._axes[row]
+
+    def rows_at(self, points: np.ndarray) -> np.ndarray:
+        """Rows of the panels at many points, -1 where there is no panel.
+
+        Points are looked up in a grid of buckets, each listing the panels that overlap
+        it, so that only the few panels near a point are tested.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            (x, y) in cm from the top left corner, of shape (n, 2).
+
+        Returns
+        -------
+        np.ndarray
+            Row in `extents` of the panel drawn on top at each point.
+
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        extents = self._current()
+        if self._index is None:
+            self._index = _BucketGrid(extents)
+        if self._zorders is None:
+            self._zorders = np.array([ax.get_zorder() for ax in self._axes])
+        # Axes are drawn in order of zorder, then in the order they were added
+        zorders = self._zorders
+        added = self._added[: len(self)]
+
+        hits = np.full(len(points), -1)
+        for n, (rows, (x, y)) in enumerate(zip(self._index.candidates(points), points)):
+            if not len(rows):
+                continue
+            inside = rows[
+                (extents[rows, 0] <= x)
+                & (x <= extents[rows, 2])
+                & (extents[rows, 1] <= y)
+                & (y <= extents[rows, 3])
+            ]
+            if len(inside):
+                hits[n] = inside[np.lexsort((added[inside], zorders[inside]))[-1]]
+        return hits
+
+    # --- Moves ---
+    def translate(self, dx: float, dy: float, panels: PanelSelection = None) -> None:
+        """Move panels.
+
+        Parameters
+        ----------
+        dx : float
+            Distance (cm) to move right.
+        dy : float
+            Distance (cm) to move down.
+        panels : np.ndarray | Iterable[PanelAxes | int] | None
+            The panels to move, as a mask, rows or panels. All panels by default.
+
+        """
+        rows = self._select(panels)
+        self._current()[rows] += (dx, dy, dx, dy)
+        self._apply(rows)
+
+    def scale(
+        self,
+        factor: float | tuple[float, float],
+        origin: tuple[float, float] = (0.0, 0.0),
+        panels: PanelSelection = None,
+    ) -> None:
+        """Scale the extents of panels about a point, e.g. to fit a smaller figure.
+
+        Parameters
+        ----------
+        factor : float | tuple[float, float]
+            Scale factor, or horizontal and vertical scale factors.
+        origin : tuple[float, float]
+            The point (cm) that stays in place, the top left corner by default.
+        panels : np.ndarray | Iterable[PanelAxes | int] | None
+            The panels to scale, as a mask, rows or panels. All panels by default.
+
+        """
+        sx, sy = (factor, factor) if np.isscalar(factor) else factor
+        if sx <= 0 or sy <= 0:
+            msg = "Scale factors must be positive"
+            raise ValueError(msg)
+        rows = self._select(panels)
+        origin = np.tile(origin, 2)
+        extents = self._current()
+        extents[rows] = origin + (extents[rows] - origin) * (sx, sy, sx, sy)
+        self._apply(rows)
+
+    def align(
+        self,
+        edge: str,
+        panels: PanelSelection = None,
+        value: float | None = None,
+    ) -> None:
+        """Line up an edge or the centres of panels, keeping their sizes.
+
+        Parameters
+        ----------
+        edge : str
+            'left', 'right', 'top', 'bottom', 'hcentre' (horizontal centres) or
+            'vcentre' (vertical centres).
+        panels : np.ndarray | Iterable[PanelAxes | int] | None
+            The panels to align, as a mask, rows or panels. All panels by default.
+        value : float | None
+            Where to put the edge (cm). By default the outermost edge of the panels, or
+            the mean of their centres.
+
+        """
+        if edge not in _EDGES:
+            msg = f"Edge must be one of {', '.join(_EDGES)}"
+            raise ValueError(msg)
+        rows = self._select(panels)
+        if not len(rows):
+            return
+        extents = self._current()
+        selected = extents[rows]
+        axis = 0 if edge in ("left", "right", "hcentre") else 1
+        low, high = selected[:, axis], selected[:, axis + 2]
+        if edge in ("left", "top"):
+            current = low
+            target = low.min() if value is None else value
+        elif edge in ("right", "bottom"):
+            current = high
+            target = high.max() if value is None else value
+        else:
+            current = (low + high) / 2
+            target = current.mean() if value is None else value
+        shift = target - current
+        extents[rows, axis] += shift
+        extents[rows, axis + 2] += shift
+        self._apply(rows)
+
+    # --- Keeping the registry in sync, called by the figure and its panels ---
+    def _current(self) -> np.ndarray:
+        """The rows in use, rescaled if the figure size changed since last time."""
+        extents = self._extents[: len(self)]
+        size_cm = tuple(locations.inch_to_cm(self._fig.get_size_inches()))
+        if self._size_cm is not None and size_cm != self._size_cm:
+            # Panels keep their figure fraction when the figure is resized, except
+            # those in groups, which keep their location in cm
+            extents *= np.tile(size_cm, 2) / np.tile(self._size_cm, 2)
+            for row, ax in enumerate(self._axes):
+                if ax.group is not None:
+                    extents[row] = ax.group.to_figure_cm(ax._local_location)
+            self._index = self._zorders = None
+        self._size_cm = size_cm
+        return extents
+
+    def _set(self, ax: PanelAxes, extent: tuple[float, float, float, float]) -> None:
+        """Record the extent of a panel, adding it if it is new."""
+        self._current()
+        row = self._rows.get(ax)
+        if row is None:
+            row = len(self._axes)
+            if row == len(self._extents):
+                self._extents = np.concatenate([self._extents, self._extents])
+                self._added = np.concatenate([self._added, self._added])
+            self._axes.append(ax)
+            self._rows[ax] = row
+            self._added[row] = self._n_added
+            self._n_added += 1
+        self._extents[row] = extent
+        self._index = self._zorders = None
+
+    def _set_rows(self, rows: list[int], extents: np.ndarray) -> None:
+        """Record new extents of panels that were moved by other means."""
+        self._current()[rows] = extents
+        self._index = self._zorders = None
+
+    def _remove(self, ax: PanelAxes) -> None:
+        """Forget a panel, moving the last row into its place."""
+        row = self._rows.pop(ax, None)
+        if row is None:
+            return
+        last = len(self._axes) - 1
+        if row != last:
+            moved = self._axes[last]
+            self._axes[row] = moved
+            self._rows[moved] = row
+            self._extents[row] = self._extents[last]
+            self._added[row] = self._added[last]
+        self._axes.pop()
+        self._index = self._zorders = None
+
+    def _zorder_changed(self) -> None:
+        """Look up the zorders of the panels again on the next hit test."""
+        self._zorders = None
+
+    def _clear(self) -> None:
+        """Forget all panels."""
+        self._axes.clear()
+        self._rows.clear()
+        self._index = self._zorders = None
+
+    def _select(self, panels: PanelSelection | slice) -> np.ndarray:
+        """Rows of a selection of panels."""
+        if panels is None:
+            return np.arange(len(self))
+        if isinstance(panels, slice):
+            return np.arange(len(self))[panels]
+        if isinstance(panels, np.ndarray) and panels.dtype == bool:
+            if panels.shape != (len(self),):
+                msg = f"Mask must have one element per panel ({len(self)})"
+                raise ValueError(msg)
+            return np.flatnonzero(panels)
+        return np.array(
+            [
+                panel if isinstance(panel, (int, np.integer)) else self.index(panel)
+                for panel in panels
+            ],
+            dtype=int,
+        )
+
+    def _apply(self, rows: np.ndarray) -> None:
+        """Place panels at the extents in their rows."""
+        self._index = self._zorders = None
+        width, height = self._size_cm
+        x0, y0, x1, y1 = self._extents[rows].T
+        if np.any(x0 > x1) or np.any(y0 > y1):
+            msg = "x0 must be less than x1 and y0 must be less than y1"
+            raise ValueError(msg)
+        positions = np.column_stack(
+            [x0 / width, 1 - y1 / height, (x1 - x0) / width, (y1 - y0) / height],
+        )
+        for row, position in zip(rows, positions):
+            self._axes[row]._place(position, self._extents[row])
+
+
+class _BucketGrid:
+    """Panels sorted into a grid of square buckets, for looking up points.
+
+    The bucket size is the median panel size, so a bucket overlaps few panels
+    whatever the number of panels.
+    """
+
+    def __init__(self, extents: np.ndarray) -> None:
+        sizes = np.concatenate(
+            [extents[:, 2] - extents[:, 0], extents[:, 3] - extents[:, 1]],
+        )
+        self.size = float(np.median(sizes)) if len(sizes) else 1.0
+        if not math.isfinite(self.size) or self.size <= 0:
+            self.size = 1.0
+        buckets = defaultdict(list)
+        cells = np.floor(extents / self.size).astype(int)
+        for row, (i0, j0, i1, j1) in enumerate(cells):
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    buckets[i, j].append(row)
+        self.buckets = {
+            cell: np.array(rows, dtype=int) for cell, rows in buckets.items()
+        }
+
+    def candidates(self, points: np.ndarray) -> Iterator[np.ndarray]:
+        """Rows of the panels that may contain each point."""
+        empty = np.empty(0, dtype=int)
+        for i, j in np.floor(points / self.size).astype(int):
+            yield self.buckets.get((i, j), empty)
@@ -0,0 +1,128 @@
+"""Reuse laid out figures instead of building the same layout over and over.
+
+Example usage:
+
+```python
+pool = FigurePool(maxsize=4)
+
+def two_panels():
+    fig = scilayout.figure()
+    fig.add_panel((1, 1, 5, 5), panellabel="a")
+    fig.add_panel((7, 1, 11, 5), panellabel="b")
+    return fig
+
+for n, data in enumerate(datasets):
+    with pool.figure("two_panels", two_panels) as fig:
+        ax_a, ax_b = fig.get_axes()
+        ax_a.plot(data.x, data.y)
+        fig.export(f"figure_{n}.png")
+```
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from .classes import PanelAxes
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Iterator
+
+    from .classes import SciFigure
+
+
+class FigurePool:
+    """A least-recently-used cache of idle figures, keyed by layout.
+
+    A figure that is released back to the pool has its plotted data removed with
+    `PanelAxes.clear_data`, keeping the panels, panel labels, axis labels, ticks and
+    grid, so the next user of the same layout only has to plot.
+    """
+
+    def __init__(self, maxsize: int = 8) -> None:
+        """Create an empty pool.
+
+        Parameters
+        ----------
+        maxsize : int
+            Number of layouts to keep idle figures for. When exceeded, the figures of the
+            least recently used layout are closed.
+
+        """
+        self.maxsize = maxsize
+        self._idle: OrderedDict[Hashable, list[SciFigure]] = OrderedDict()
+        self._borrowed: dict[int, Hashable] = {}
+
+    def __len__(self) -> int:
+        """Number of idle figures in the pool."""
+        return sum(len(figures) for figures in self._idle.values())
+
+    def acquire(self, key: Hashable, layout: Callable[[], SciFigure]) -> SciFigure:
+        """Take a figure with the given layout from the pool.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the layout, figures are only reused for the same key.
+        layout : Callable[[], SciFigure]
+            Builds a new figure with the layout if there is no idle one.
+
+        Returns
+        -------
+        SciFigure
+            A figure with the layout and no plotted data, give it back with `release`.
+
+        """
+        figures = self._idle.get(key)
+        if figures:
+            fig = figures.pop()
+            self._idle.move_to_end(key)
+        else:
+            fig = layout()
+        self._borrowed[id(fig)] = key
+        return fig
+
+    def release(self, fig: SciFigure) -> None:
+        """Clear the data from a figure and return it to the pool.
+
+        Parameters
+        ----------
+        fig : SciFigure
+            A figure taken from the pool with `acquire`.
+
+        """
+        key = self._borrowed.pop(id(fig))
+        for ax in fig.get_axes():
+            if isinstance(ax, PanelAxes):
+                ax.clear_data()
+        for legend in list(fig.legends):
+            legend.remove()
+
+        self._idle.setdefault(key, []).append(fig)
+        self._idle.move_to_end(key)
+        while len(self._idle) > self.maxsize:
+            _, evicted = self._idle.popitem(last=False)
+            for old_fig in evicted:
+                old_fig.close()
+
+    @contextmanager
+    def figure(
+        self,
+        key: Hashable,
+        layout: Callable[[], SciFigure],
+    ) -> Iterator[SciFigure]:
+        """Borrow a figure for the duration of a with block (see `acquire`)."""
+        fig = self.acquire(key, layout)
+        try:
+            yield fig
+        finally:
+            self.release(fig)
+
+    def clear(self) -> None:
+        """Close all idle figures."""
+        for figures in self._idle.values():
+            for fig in figures:
+                fig.close()
+        self._idle.clear()
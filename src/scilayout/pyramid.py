@@ -0,0 +1,273 @@
+"""Export a figure at several resolutions from a single render.
+
+Saving the same figure at 72, 150, 300 and 600 dpi with `savefigure` draws it four
+times. `export_pyramid` draws it once, at the highest dpi with the same settings as
+`savefigure`, and makes the other resolutions by area-averaging (box) downsampling of
+those pixels, which is what a render at the lower dpi approximates anyway. Sizes can
+differ from a render at the lower dpi by a pixel or two where text extents or the tight
+bounding box round differently. The images are resized and written in a pool of
+threads, as Pillow releases the GIL while resizing and compressing.
+
+Optionally the highest resolution is also cut into a Deep Zoom tile pyramid (a `.dzi`
+descriptor and a `_files` directory of tiles), the format read by web viewers such as
+OpenSeadragon, so that large poster figures can be panned and zoomed in a browser.
+
+Example usage:
+
+```python
+fig.export_pyramid("figure_{dpi}dpi.png", dpis=(72, 150, 300, 600), thumbnail=256)
+```
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+from . import base
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from matplotlib.figure import Figure
+
+DEEPZOOM_TILE_SIZE = 254
+"""Default width and height of Deep Zoom tiles, without their overlap."""
+
+_DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="png" \
+Overlap="{overlap}" TileSize="{tile_size}">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+"""
+
+
+def render_png(
+    fig: Figure,
+    dpi: float,
+    bbox: str | None = "tight",
+    transparent: bool = True,
+) -> tuple[bytes, Image.Image]:
+    """Render a figure once with `savefigure` as png, and decode it for resizing.
+
+    Parameters
+    ----------
+    fig : Figure
+        Figure to render.
+    dpi : float
+        Dots per inch.
+    bbox : str | None
+        'tight' to crop the whitespace around the figure (default), None to keep the
+        whole figure.
+    transparent : bool
+        Make the figure and panel backgrounds transparent.
+
+    Returns
+    -------
+    tuple[bytes, PIL.Image.Image]
+        The png file and its RGBA image.
+
+    """
+    buffer = BytesIO()
+    base.savefigure(
+        fig, buffer, dpi=dpi, bbox=bbox, format="png", transparent_png=transparent,
+    )
+    with Image.open(buffer) as image:
+        return buffer.getvalue(), image.convert("RGBA")
+
+
+def downsample(image: Image.Image, scale: float) -> Image.Image:
+    """Shrink an image by averaging the pixels covered by each new pixel.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        Image to shrink.
+    scale : float
+        New size as a fraction of the current size, at most 1.
+
+    Returns
+    -------
+    PIL.Image.Image
+        The downsampled image, at least one pixel across.
+
+    """
+    size = (
+        max(round(image.width * scale), 1),
+        max(round(image.height * scale), 1),
+    )
+    if size == image.size:
+        return image
+    return image.resize(size, Image.Resampling.BOX)
+
+
+def _save_png(image: Image.Image, path: Path, dpi: float) -> Path:
+    """Write a png with the dpi recorded and no other metadata."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, format="png", dpi=(dpi, dpi))
+    return path
+
+
+def _deepzoom_levels(image: Image.Image) -> Iterator[tuple[int, Image.Image]]:
+    """Halve an image down to 1 pixel, yielding (level, image) from the largest."""
+    level = math.ceil(math.log2(max(image.size)))
+    yield level, image
+    while level > 0:
+        level -= 1
+        image = image.resize(
+            (math.ceil(image.width / 2), math.ceil(image.height / 2)),
+            Image.Resampling.BOX,
+        )
+        yield level, image
+
+
+def _tiles(
+    image: Image.Image,
+    tile_size: int,
+    overlap: int,
+) -> Iterator[tuple[int, int, Image.Image]]:
+    """Cut an image into overlapping tiles, yielding (column, row, tile)."""
+    for column in range(math.ceil(image.width / tile_size)):
+        for row in range(math.ceil(image.height / tile_size)):
+            x = column * tile_size
+            y = row * tile_size
+            yield column, row, image.crop(
+                (
+                    max(x - overlap, 0),
+                    max(y - overlap, 0),
+                    min(x + tile_size + overlap, image.width),
+                    min(y + tile_size + overlap, image.height),
+                ),
+            )
+
+
+def write_deepzoom(
+    image: Image.Image,
+    path: str | Path,
+    tile_size: int = DEEPZOOM_TILE_SIZE,
+    overlap: int = 1,
+    workers: int | None = None,
+) -> int:
+    """Write an image as a Deep Zoom tile pyramid of png tiles.
+
+    Parameters
+    ----------
+    image : PIL.Image.Image
+        The full resolution image.
+    path : str | Path
+        The `.dzi` descriptor to write. Tiles are written to `<name>_files/<level>/`
+        next to it, named `<column>_<row>.png`.
+    tile_size : int
+        Width and height of the tiles, without their overlap.
+    overlap : int
+        Pixels shared with each neighbouring tile.
+    workers : int | None
+        Number of threads writing tiles.
+
+    Returns
+    -------
+    int
+        Number of tiles written.
+
+    """
+    path = Path(path)
+    tile_dir = path.with_name(f"{path.stem}_files")
+    n_tiles = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for level, level_image in _deepzoom_levels(image):
+            level_dir = tile_dir / str(level)
+            level_dir.mkdir(parents=True, exist_ok=True)
+            for column, row, tile in _tiles(level_image, tile_size, overlap):
+                futures.append(
+                    executor.submit(tile.save, level_dir / f"{column}_{row}.png"),
+                )
+        for future in futures:
+            future.result()
+            n_tiles += 1
+    path.write_text(
+        _DZI_TEMPLATE.format(
+            overlap=overlap,
+            tile_size=tile_size,
+            width=image.width,
+            height=image.height,
+        ),
+    )
+    return n_tiles
+
+
+def export_pyramid(
+    fig: Figure,
+    path_pattern: str,
+    dpis: Iterable[float] = (72, 150, 300, 600),
+    thumbnail: int | None = None,
+    deepzoom: str | Path | None = None,
+    tile_size: int = DEEPZOOM_TILE_SIZE,
+    bbox: str | None = "tight",
+    transparent: bool = True,
+    workers: int | None = None,
+) -> list[Path]:
+    """Export a figure as png at several dpi, rendering it only once.
+
+    Parameters
+    ----------
+    fig : Figure
+        Figure to export.
+    path_pattern : str
+        Output path formatted with the dpi, e.g. "figure_{dpi}dpi.png".
+    dpis : Iterable[float]
+        Resolutions to export. The figure is rendered at the highest of them.
+    thumbnail : int | None
+        Also export a thumbnail this many pixels across its longest side, to the path
+        formatted with dpi="thumbnail".
+    deepzoom : str | Path | None
+        Also write a Deep Zoom tile pyramid of the highest resolution to this `.dzi`
+        path (see `write_deepzoom`).
+    tile_size : int
+        Width and height of the Deep Zoom tiles.
+    bbox : str | None
+        'tight' to crop the whitespace around the figure (default), None to keep the
+        whole figure.
+    transparent : bool
+        Make the figure and panel backgrounds transparent, as `savefigure` does for png.
+    workers : int | None
+        Number of threads resizing and writing images.
+
+    Returns
+    -------
+    list[Path]
+        The exported paths, highest resolution first, then the thumbnail.
+
+    """
+    dpis = sorted(set(dpis), reverse=True)
+    if not dpis:
+        msg = "At least one dpi is needed"
+        raise ValueError(msg)
+    png, full = render_png(fig, dpis[0], bbox=bbox, transparent=transparent)
+
+    def export(dpi: float) -> Path:
+        path = Path(path_pattern.format(dpi=f"{dpi:g}"))
+        if dpi == dpis[0]:
+            # The render itself, identical to what savefigure writes
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(png)
+            return path
+        return _save_png(downsample(full, dpi / dpis[0]), path, dpi)
+
+    def export_thumbnail() -> Path:
+        image = downsample(full, min(thumbnail / max(full.size), 1))
+        path = Path(path_pattern.format(dpi="thumbnail"))
+        return _save_png(image, path, dpis[0] * image.width / full.width)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(export, dpi) for dpi in dpis]
+        if thumbnail is not None:
+            futures.append(executor.submit(export_thumbnail))
+        if deepzoom is not None:
+            write_deepzoom(full, deepzoom, tile_size=tile_size, workers=workers)
+        return [future.result() for future in futures]
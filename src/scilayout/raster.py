@@ -0,0 +1,242 @@
+"""Keep a rendered figure in memory and redraw only the panels that change.
+
+Redrawing a whole figure to update one panel of a dashboard wastes most of the work.
+`PanelRaster` renders the figure once, remembers the pixel extent of each panel
+(including its tick labels and panel label) and on `update` redraws only the region
+covered by the changed panels, drawing whatever else overlaps that region on top of
+the figure background.
+
+Example usage:
+
+```python
+raster = PanelRaster(fig, dpi=100)
+pixels = raster.render()  # (height, width, 4) array of the whole figure
+
+line.set_ydata(new_data)
+pixels = raster.update(ax)  # only the region of ax is redrawn
+```
+
+A change to the layout (figure size, panel locations, panels added or removed), the
+figure's face colour or `scilayout.style.params` is detected on `update` and causes a
+full render instead.
+
+Updated regions match a full render, except that the odd antialiased edge pixel can be
+off by a level or two from floating point rounding of the shifted coordinates.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import numpy as np
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.transforms import Bbox, BboxBase
+
+from . import style
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from matplotlib.artist import Artist
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+_PAD = 8
+"""Pixels drawn around each region but not copied, so that strokes cut at the edge of
+the region renderer are drawn the same as in a full render."""
+
+
+@contextmanager
+def _shifted(fig: Figure, x0: int, y0: int) -> Iterator[None]:
+    """Temporarily move the figure so that display pixel (x0, y0) is at the origin.
+
+    Like the bounding box adjustment matplotlib uses for bbox_inches="tight", but the
+    figure keeps its size so that everything relative to it is laid out unchanged.
+    The shift is relative to where the figure currently is, so it also applies on top
+    of that adjustment.
+
+    There is no public way to move the box that transFigure maps to, so this is the one
+    place that sets it directly.
+    """
+    original_bbox = fig.bbox
+    original_boxout = getattr(fig.transFigure, "_boxout", None)
+    if not isinstance(original_boxout, BboxBase):
+        msg = "Cannot shift the figure, this matplotlib version has no transFigure box"
+        raise RuntimeError(msg)
+    fig.bbox = Bbox.from_bounds(
+        original_bbox.x0 - x0, original_bbox.y0 - y0, *original_bbox.size,
+    )
+    if original_boxout is original_bbox:
+        fig.transFigure._boxout = fig.bbox
+    else:
+        fig.transFigure._boxout = Bbox.from_bounds(
+            original_boxout.x0 - x0, original_boxout.y0 - y0, *original_boxout.size,
+        )
+    fig.transFigure.invalidate()
+    try:
+        yield
+    finally:
+        fig.bbox = original_bbox
+        fig.transFigure._boxout = original_boxout
+        fig.transFigure.invalidate()
+
+
+class PanelRaster:
+    """An RGBA raster of a figure that can be updated one panel at a time."""
+
+    def __init__(self, fig: Figure, dpi: float = 100.0) -> None:
+        """Set up the raster, nothing is rendered until `render` or `update`.
+
+        Parameters
+        ----------
+        fig : Figure
+            Figure to render, usually a `SciFigure`.
+        dpi : float
+            Dots per inch of the raster.
+
+        """
+        self.fig = fig
+        self.dpi = dpi
+        self.image: np.ndarray | None = None
+        """The rendered figure, shape (height, width, 4), rows from the top."""
+        self._extents: dict[Artist, Bbox] = {}
+        self._signature = None
+
+    def invalidate(self) -> None:
+        """Discard the raster, so that the next `update` renders the whole figure."""
+        self.image = None
+        self._extents = {}
+        self._signature = None
+
+    def render(self) -> np.ndarray:
+        """Render the whole figure.
+
+        Returns
+        -------
+        np.ndarray
+            The raster, shape (height, width, 4).
+
+        """
+        with self._at_dpi():
+            width, height = (int(v) for v in self.fig.bbox.size)
+            self.image = np.zeros((height, width, 4), dtype=np.uint8)
+            renderer = RendererAgg(1, 1, self.fig.dpi)
+            artists = self._draw_artists(renderer)
+            self._draw_region(0, 0, width, height, artists)
+            self._extents = {
+                artist: artist.get_tightbbox(renderer) for artist in artists
+            }
+        self._signature = self._layout_signature()
+        return self.image
+
+    def update(self, *panels: Axes) -> np.ndarray:
+        """Redraw the regions of the given panels.
+
+        The region redrawn for a panel covers both where it was last drawn and where it
+        is now, so content that shrinks or moves within the panel is cleared.
+
+        Parameters
+        ----------
+        panels : Axes
+            The panels (or any other artists directly on the figure) that changed.
+
+        Returns
+        -------
+        np.ndarray
+            The raster, shape (height, width, 4).
+
+        """
+        if self.image is None or self._signature != self._layout_signature():
+            return self.render()
+
+        with self._at_dpi():
+            renderer = RendererAgg(1, 1, self.fig.dpi)
+            dirty = []
+            for panel in panels:
+                extent = panel.get_tightbbox(renderer)
+                previous = self._extents.get(panel)
+                self._extents[panel] = extent
+                boxes = [box for box in (previous, extent) if box is not None]
+                if boxes:
+                    dirty.append(Bbox.union(boxes))
+
+            height, width = self.image.shape[:2]
+            artists = self._draw_artists(renderer)
+            for box in dirty:
+                x0 = max(int(np.floor(box.x0)) - 1, 0)
+                y0 = max(int(np.floor(box.y0)) - 1, 0)
+                x1 = min(int(np.ceil(box.x1)) + 1, width)
+                y1 = min(int(np.ceil(box.y1)) + 1, height)
+                if x1 <= x0 or y1 <= y0:
+                    continue
+                region = Bbox.from_extents(x0, y0, x1, y1)
+                overlapping = [
+                    artist for artist in artists
+                    if self._extents.get(artist) is not None
+                    and self._extents[artist].overlaps(region)
+                ]
+                self._draw_region(x0, y0, x1, y1, overlapping)
+        return self.image
+
+    def _draw_artists(self, renderer: RendererAgg) -> list[Artist]:
+        """Artists drawn by the figure, in drawing order (see Figure.draw)."""
+        fig = self.fig
+        for ax in fig.axes:
+            locator = ax.get_axes_locator()
+            ax.apply_aspect(locator(ax, renderer) if locator else None)
+        return sorted(
+            (
+                artist for artist in fig.get_children()
+                if artist is not fig.patch and not artist.get_animated()
+            ),
+            key=lambda artist: artist.get_zorder(),
+        )
+
+    def _draw_region(
+        self,
+        x0: int,
+        y0: int,
+        x1: int,
+        y1: int,
+        artists: list[Artist],
+    ) -> None:
+        """Draw the artists over the figure background into a region of the raster.
+
+        Coordinates are display pixels with the origin at the bottom left.
+        """
+        height, width = self.image.shape[:2]
+        # Draw a padded region, clipped to the figure like a full render is
+        rx0, ry0 = max(x0 - _PAD, 0), max(y0 - _PAD, 0)
+        rx1, ry1 = min(x1 + _PAD, width), min(y1 + _PAD, height)
+        renderer = RendererAgg(rx1 - rx0, ry1 - ry0, self.fig.dpi)
+        with _shifted(self.fig, rx0, ry0):
+            self.fig.patch.draw(renderer)
+            for artist in artists:
+                artist.draw(renderer)
+        pixels = np.asarray(renderer.buffer_rgba())
+        self.image[height - y1:height - y0, x0:x1] = pixels[
+            ry1 - y1:ry1 - y0, x0 - rx0:x1 - rx0
+        ]
+
+    @contextmanager
+    def _at_dpi(self) -> Iterator[None]:
+        """Temporarily set the figure to the dpi of the raster."""
+        original_dpi = self.fig.dpi
+        self.fig.dpi = self.dpi
+        try:
+            yield
+        finally:
+            self.fig.dpi = original_dpi
+
+    def _layout_signature(self) -> tuple:
+        """Everything that, when changed, makes the cached raster unusable."""
+        fig = self.fig
+        return (
+            tuple(fig.get_size_inches()),
+            self.dpi,
+            tuple(fig.get_facecolor()),
+            tuple(map(id, fig.get_children())),
+            tuple(tuple(ax.get_position().bounds) for ax in fig.axes),
+            dict(style.params),
+        )
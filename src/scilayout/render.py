@@ -0,0 +1,561 @@
+"""Headless batch rendering of figure scripts and layout specifications.
+
+Figure sources are either Python scripts, which are run and whose open figures are
+exported, or JSON layout specifications of the form ::
+
+    {
+        "size": [18, 12],
+        "style": "journal.json",
+        "panels": [
+            {"location": [1, 1, 5, 5], "method": "size", "label": "a"}
+        ],
+        "plot": "mymodule:draw",
+        "export": {"dpi": 600}
+    }
+
+where every entry except "panels" is optional. Relative paths are resolved against the
+directory of the specification, "plot" names a function that is called with the built
+figure, and "export" holds keyword arguments for `scilayout.base.savefigure`.
+
+Rendering many sources happens in a pool of worker processes that import matplotlib
+and scilayout once, so start-up costs are paid per worker rather than per figure.
+
+While a source renders, the files it reads (the script, local modules, style sheets
+given to `scilayout.style.use` and data files) are recorded as its dependencies, which
+`Watcher` uses to re-render only the sources affected by a change.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import multiprocessing
+import os
+import runpy
+import site
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from matplotlib import font_manager
+
+from . import base, classes, style
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+SPEC_SUFFIX = ".json"
+SCRIPT_SUFFIX = ".py"
+_IGNORED_SUFFIXES = {".pyc", ".ttf", ".otf", ".ttc", ".afm", ".pfb"}
+
+
+@dataclass
+class RenderResult:
+    """Outcome of rendering a single figure source."""
+
+    source: Path
+    """The figure script or layout specification."""
+    outputs: list[Path] = field(default_factory=list)
+    """Files exported for the source."""
+    written: list[Path] = field(default_factory=list)
+    """Exported files whose contents changed (unchanged files are left untouched)."""
+    dependencies: list[Path] = field(default_factory=list)
+    """Files read while rendering, including the source itself."""
+    seconds: float = 0.0
+    """Wall time taken to build and export the figure(s)."""
+    error: str | None = None
+    """Formatted traceback if rendering failed."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the source rendered without error."""
+        return self.error is None
+
+
+def warm_up() -> None:
+    """Import and initialise everything a render needs.
+
+    Selects the headless Agg backend, loads the font cache and draws a small figure so
+    that text and image output machinery is initialised before the first real figure.
+    """
+    mpl.use("Agg")
+    font_manager.findfont(font_manager.FontProperties())
+    fig = plt.figure(FigureClass=classes.SciFigure)
+    fig.set_size_cm(2, 2)
+    fig.add_panel((0.5, 0.5, 1.5, 1.5), panellabel="a")
+    fig.savefig(BytesIO(), format="png")
+    plt.close(fig)
+
+
+# --- Dependency tracking ---
+# Files opened while a source renders are collected through an audit hook. Hooks cannot
+# be removed once added, so a single hook is installed and only records while a render
+# is in progress. Modules imported from their cached bytecode never open the source
+# file, so the sources of newly imported modules are added as well.
+_recording: set[str] | None = None
+_hook_installed = False
+
+
+def _audit_hook(event: str, args: tuple) -> None:
+    """Record files opened for reading during a render."""
+    if _recording is None:
+        return
+    if event == "open":
+        path, mode, flags = args
+        if not isinstance(path, (str, bytes, os.PathLike)):
+            return
+        if mode is None:
+            if flags & (os.O_WRONLY | os.O_RDWR):
+                return
+        elif any(char in mode for char in "wax+"):
+            return
+        _recording.add(os.fsdecode(path))
+    elif event == "scilayout.style.load":
+        _recording.add(args[0])
+
+
+def _ignored_directories() -> tuple[str, ...]:
+    """Directories whose files are not dependencies of a figure (installed packages)."""
+    directories = {sys.prefix, sys.base_prefix, sys.exec_prefix, mpl.get_cachedir()}
+    directories.update(site.getsitepackages())
+    directories.add(site.getusersitepackages())
+    return tuple(os.path.join(os.path.abspath(d), "") for d in directories)
+
+
+@contextmanager
+def _record_dependencies(dependencies: set[str], outdir: Path) -> Iterator[None]:
+    """Collect the files read within the context into dependencies."""
+    global _recording, _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_audit_hook)
+        _hook_installed = True
+
+    _recording = set()
+    preexisting = set(sys.modules)
+    try:
+        yield
+    finally:
+        opened, _recording = _recording, None
+        for name in set(sys.modules) - preexisting:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file is not None:
+                opened.add(module_file)
+        ignored = (*_ignored_directories(), os.path.join(os.path.abspath(outdir), ""))
+        for path in map(os.path.abspath, opened):
+            if (
+                not path.startswith(ignored)
+                and os.path.splitext(path)[1] not in _IGNORED_SUFFIXES
+                and os.path.isfile(path)
+            ):
+                dependencies.add(path)
+
+
+def _forget_modules(dependencies: set[str], preexisting: set[str]) -> None:
+    """Unload modules imported from dependencies so that edits to them are picked up."""
+    for name in set(sys.modules) - preexisting:
+        module_file = getattr(sys.modules[name], "__file__", None)
+        if module_file is not None and os.path.abspath(module_file) in dependencies:
+            del sys.modules[name]
+
+
+def _write_if_changed(
+    fig: classes.SciFigure,
+    path: Path,
+    **export_kwargs: Any,
+) -> bool:
+    """Export a figure, replacing the existing file only if the contents differ.
+
+    Returns whether the file was written.
+    """
+    buffer = BytesIO()
+    base.savefigure(fig, buffer, format=path.suffix, **export_kwargs)
+    data = buffer.getbuffer()
+    if path.exists() and path.read_bytes() == data:
+        return False
+    # Replace the file in one step so viewers never see a partly written figure
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(data)
+    temporary.replace(path)
+    return True
+
+
+def load_spec(path: str | Path) -> dict[str, Any]:
+    """Read a layout specification from a JSON file."""
+    with Path(path).open() as f:
+        return json.load(f)
+
+
+def _resolve_function(reference: str) -> Any:
+    """Import a function given as "module:function"."""
+    module_name, _, function_name = reference.partition(":")
+    if not function_name:
+        msg = f'Plot function must be given as "module:function", not "{reference}"'
+        raise ValueError(msg)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def build_figure(
+    spec: dict[str, Any],
+    root: str | Path | None = None,
+) -> classes.SciFigure:
+    """Build a figure from a layout specification.
+
+    Parameters
+    ----------
+    spec : dict
+        Layout specification (see module documentation).
+    root : str | Path | None
+        Directory that relative paths in the specification are resolved against,
+        defaults to the current working directory.
+
+    Returns
+    -------
+    SciFigure
+        The laid out (and plotted, if the specification names a plot function) figure.
+
+    """
+    root = Path.cwd() if root is None else Path(root)
+    if "style" in spec:
+        layers = spec["style"] if isinstance(spec["style"], list) else [spec["style"]]
+        style.use(
+            [root / layer if isinstance(layer, str) else layer for layer in layers],
+        )
+
+    fig = plt.figure(FigureClass=classes.SciFigure)
+    if "size" in spec:
+        fig.set_size_cm(*spec["size"])
+    for panel in spec.get("panels", []):
+        fig.add_panel(
+            panel["location"],
+            panellabel=panel.get("label"),
+            method=panel.get("method", "bbox"),
+        )
+
+    if "plot" in spec:
+        sys.path.insert(0, str(root))
+        try:
+            _resolve_function(spec["plot"])(fig)
+        finally:
+            sys.path.remove(str(root))
+    return fig
+
+
+def _build_figures(
+    source: str | Path | dict[str, Any] | Callable[[], classes.SciFigure],
+    export_kwargs: dict[str, Any],
+) -> tuple[list[classes.SciFigure], dict[str, Any]]:
+    """Build the figures of a figure source.
+
+    The source is a script or layout specification file, a layout specification
+    dictionary or a function that returns a figure. Returns the figures and the export
+    settings updated with those of the specification.
+    """
+    if callable(source):
+        return [source()], export_kwargs
+    if isinstance(source, dict):
+        build_figure(source)
+        export_kwargs = {**export_kwargs, **source.get("export", {})}
+    else:
+        source = Path(source)
+        if source.suffix == SPEC_SUFFIX:
+            spec = load_spec(source)
+            export_kwargs = {**export_kwargs, **spec.get("export", {})}
+            build_figure(spec, root=source.parent)
+        elif source.suffix == SCRIPT_SUFFIX:
+            sys.path.insert(0, str(source.parent))
+            try:
+                runpy.run_path(str(source), run_name="__main__")
+            finally:
+                sys.path.remove(str(source.parent))
+        else:
+            msg = f"Cannot render {source}, expected a {SCRIPT_SUFFIX} or {SPEC_SUFFIX} file"
+            raise ValueError(msg)
+    return [plt.figure(num) for num in plt.get_fignums()], export_kwargs
+
+
+def _output_paths(
+    source: Path,
+    figures: list[classes.SciFigure],
+    outdir: Path,
+    formats: Iterable[str],
+) -> Iterator[tuple[classes.SciFigure, Path]]:
+    """Name the output files of the figures made by a source."""
+    for n, fig in enumerate(figures):
+        if fig.get_label():
+            name = fig.get_label()
+        elif len(figures) > 1:
+            name = f"{source.stem}-{n + 1}"
+        else:
+            name = source.stem
+        for fmt in formats:
+            yield fig, outdir / f"{name}.{fmt.lstrip('.')}"
+
+
+def render(
+    source: str | Path,
+    outdir: str | Path,
+    formats: Iterable[str] = ("pdf",),
+    **export_kwargs: Any,
+) -> RenderResult:
+    """Render a figure script or layout specification and export its figures.
+
+    The rcParams and scilayout style are restored afterwards and all figures closed, so
+    one process can render many sources in turn.
+
+    Parameters
+    ----------
+    source : str | Path
+        Python script or JSON layout specification.
+    outdir : str | Path
+        Directory to write the exported figures to.
+    formats : Iterable[str]
+        File formats (suffixes) to export each figure as.
+    export_kwargs : dict
+        Keyword arguments for `scilayout.base.savefigure`, a specification's own
+        "export" settings take precedence.
+
+    Returns
+    -------
+    RenderResult
+        The files written and time taken, or the error raised.
+
+    """
+    source = Path(source)
+    outdir = Path(outdir)
+    result = RenderResult(source)
+    start = time.perf_counter()
+    plt.close("all")
+    style.reset()
+    preexisting_modules = set(sys.modules)
+    dependencies = set()
+    with _record_dependencies(dependencies, outdir):
+        try:
+            with mpl.rc_context(), warnings.catch_warnings():
+                # plt.show() in a script is a no-op on the Agg backend
+                warnings.filterwarnings("ignore", message=".*non-interactive.*")
+                figures, export_kwargs = _build_figures(source, export_kwargs)
+                outdir.mkdir(parents=True, exist_ok=True)
+                for fig, path in _output_paths(source, figures, outdir, formats):
+                    if _write_if_changed(fig, path, **export_kwargs):
+                        result.written.append(path)
+                    result.outputs.append(path)
+        except Exception:
+            result.error = traceback.format_exc()
+        finally:
+            plt.close("all")
+            style.reset()
+    dependencies.add(os.path.abspath(source))
+    _forget_modules(dependencies, preexisting_modules)
+    result.dependencies = sorted(map(Path, dependencies))
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def render_bytes(
+    source: str | Path | dict[str, Any] | Callable[[], classes.SciFigure],
+    format: str = "png",
+    **export_kwargs: Any,
+) -> bytes:
+    """Build a single figure and export it to bytes.
+
+    Parameters
+    ----------
+    source : str | Path | dict | Callable[[], SciFigure]
+        Script or layout specification file, layout specification dictionary, or a
+        function that returns the figure.
+    format : str
+        File format to export.
+    export_kwargs : dict
+        Keyword arguments for `scilayout.base.savefigure`.
+
+    Returns
+    -------
+    bytes
+        The exported figure.
+
+    """
+    plt.close("all")
+    style.reset()
+    try:
+        with mpl.rc_context(), warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message=".*non-interactive.*")
+            figures, export_kwargs = _build_figures(source, export_kwargs)
+            if len(figures) != 1:
+                msg = f"Expected the source to make one figure, it made {len(figures)}"
+                raise ValueError(msg)
+            return bytes(figures[0].export_bytes(format, **export_kwargs))
+    finally:
+        plt.close("all")
+        style.reset()
+
+
+def render_many(
+    sources: Iterable[str | Path],
+    outdir: str | Path,
+    formats: Iterable[str] = ("pdf",),
+    workers: int | None = None,
+    fork: bool = False,
+    **export_kwargs: Any,
+) -> Iterator[RenderResult]:
+    """Render many figure sources in a pool of warm worker processes.
+
+    Parameters
+    ----------
+    sources : Iterable[str | Path]
+        Python scripts and/or JSON layout specifications.
+    outdir : str | Path
+        Directory to write the exported figures to.
+    formats : Iterable[str]
+        File formats (suffixes) to export each figure as.
+    workers : int | None
+        Number of worker processes, defaults to the number of CPUs.
+        With 1 worker the sources are rendered in the current process.
+    fork : bool
+        Warm up the current process and fork the workers from it, rather than
+        starting fresh workers that each warm up on their own. Only available on
+        platforms that support forking.
+    export_kwargs : dict
+        Keyword arguments for `scilayout.base.savefigure`.
+
+    Yields
+    ------
+    RenderResult
+        Results in the order that the renders finish.
+
+    """
+    sources = [Path(source) for source in sources]
+    formats = tuple(formats)
+    if workers == 1:
+        warm_up()
+        for source in sources:
+            yield render(source, outdir, formats, **export_kwargs)
+        return
+
+    if fork:
+        warm_up()
+        context = multiprocessing.get_context("fork")
+        initializer = None
+    else:
+        context = multiprocessing.get_context("spawn")
+        initializer = warm_up
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=initializer,
+    ) as executor:
+        futures = [
+            executor.submit(render, source, outdir, formats, **export_kwargs)
+            for source in sources
+        ]
+        # Report each figure as soon as it is done
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class Watcher:
+    """Re-render figure sources whenever the files they depend on change.
+
+    Sources are rendered in the current process, so imports and fonts stay loaded
+    between renders. Call `poll` to render the sources that are out of date, or `run`
+    to keep polling until interrupted.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[str | Path],
+        outdir: str | Path,
+        formats: Iterable[str] = ("pdf",),
+        **export_kwargs: Any,
+    ) -> None:
+        """Watch figure sources and render their figures to outdir.
+
+        Parameters
+        ----------
+        sources : Iterable[str | Path]
+            Python scripts and/or JSON layout specifications.
+        outdir : str | Path
+            Directory to write the exported figures to.
+        formats : Iterable[str]
+            File formats (suffixes) to export each figure as.
+        export_kwargs : dict
+            Keyword arguments for `scilayout.base.savefigure`.
+
+        """
+        self.sources = [Path(source) for source in sources]
+        self.outdir = Path(outdir)
+        self.formats = tuple(formats)
+        self.export_kwargs = export_kwargs
+        self.snapshots: dict[Path, dict[Path, int | None]] = {}
+        """Modification times of each source's dependencies when it was last rendered."""
+
+    @staticmethod
+    def _mtime(path: Path) -> int | None:
+        """Modification time of a file, or None if it does not exist."""
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def outdated(self) -> list[Path]:
+        """Find the sources that have never been rendered or whose dependencies changed."""
+        mtimes = {}
+        outdated = []
+        for source in self.sources:
+            snapshot = self.snapshots.get(source)
+            if snapshot is None:
+                outdated.append(source)
+                continue
+            for path, mtime in snapshot.items():
+                if path not in mtimes:
+                    mtimes[path] = self._mtime(path)
+                if mtimes[path] != mtime:
+                    outdated.append(source)
+                    break
+        return outdated
+
+    def poll(self) -> list[RenderResult]:
+        """Render the outdated sources.
+
+        Returns
+        -------
+        list[RenderResult]
+            Results of the sources that were rendered.
+
+        """
+        results = []
+        for source in self.outdated():
+            result = render(source, self.outdir, self.formats, **self.export_kwargs)
+            self.snapshots[source] = {
+                path: self._mtime(path) for path in result.dependencies
+            }
+            results.append(result)
+        return results
+
+    def run(
+        self,
+        interval: float = 0.5,
+        callback: Callable[[RenderResult], None] | None = None,
+    ) -> None:
+        """Poll for changes until interrupted.
+
+        Parameters
+        ----------
+        interval : float
+            Seconds to wait between checks for changes.
+        callback : Callable[[RenderResult], None] | None
+            Called with the result of every render.
+
+        """
+        warm_up()
+        while True:
+            for result in self.poll():
+                if callback is not None:
+                    callback(result)
+            time.sleep(interval)
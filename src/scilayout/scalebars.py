@@ -1,8 +1,11 @@
 """Movable scalebars for matplotlib plots."""
 
 import numpy as np
+from matplotlib import transforms
+from matplotlib.lines import Line2D
+from matplotlib.text import Text
 
-from . import style
+from . import extents, style
 
 
 class ScaleBar:
@@ -156,21 +159,17 @@ class ScaleBar:
 
         x_locs, y_locs = self._find_x_y(x, y, coordSystem)
 
-        # Calculate text width in display coordinates
-        renderer = self.ax.get_figure().canvas.get_renderer()
-        text_bbox = self.text.get_window_extent(renderer)
+        # Calculate text width in display coordinates (cached, the text rarely changes)
+        text_width, text_height = extents.text_size(self.text)
         inv_transform = self.ax.transData.inverted()
         text_width_data = (
-            inv_transform.transform((text_bbox.width, 0))[0]
+            inv_transform.transform((text_width, 0))[0]
             - inv_transform.transform((0, 0))[0]
         )
         text_height_data = (
-            inv_transform.transform((0, text_bbox.height))[1]
+            inv_transform.transform((0, text_height))[1]
             - inv_transform.transform((0, 0))[1]
         )
-
-        # Find line bbox
-        line_bbox = self.line.get_window_extent(renderer)
         # TODO: make the line width change the padding
 
         # Convert text width to data coordinates
@@ -300,3 +299,246 @@ class LinkedScaleBar:
     def move(self, x, y, coordSystem=None):
         self.x_scalebar.move(x, y, coordSystem)
         self.y_scalebar.move(x, y, coordSystem)
+
+
+_CORNERS = ("lower right", "lower left", "upper right", "upper left")
+
+
+def _scalebar_geometry(
+    locations, xlims, ylims, length, position_cm, corner, orientation,
+):
+    """Find the data coordinates of scalebars on many panels at once
+
+    :param locations: Panel locations (x0, y0, x1, y1) in cm from the top left, (N, 4)
+    :type locations: numpy.ndarray
+    :param xlims: x limits of each panel, shape (N, 2)
+    :type xlims: numpy.ndarray
+    :param ylims: y limits of each panel, shape (N, 2)
+    :type ylims: numpy.ndarray
+    :param length: Length of the scalebar in data units
+    :type length: float
+    :param position_cm: Distance (x, y) in cm from the corner to the end of the scalebar
+    :type position_cm: tuple
+    :param corner: Corner of the panel to measure from, e.g. 'lower right'
+    :type corner: str
+    :param orientation: 'h' for horizontal or 'v' for vertical
+    :type orientation: str
+    :return: x and y coordinates of the scalebar ends, each of shape (N, 2),
+        and the centre of each scalebar, shape (N, 2)
+    :rtype: tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+    x0, y0, x1, y1 = locations.T
+    dx, dy = position_cm
+    vertical_side, horizontal_side = corner.split()
+
+    # Data units per cm, negative for inverted axes
+    x_per_cm = (xlims[:, 1] - xlims[:, 0]) / (x1 - x0)
+    y_per_cm = (ylims[:, 1] - ylims[:, 0]) / (y1 - y0)
+
+    # Anchor in cm from the top left of the figure, then in data coordinates
+    anchor_x = x1 - dx if horizontal_side == "right" else x0 + dx
+    anchor_y = y1 - dy if vertical_side == "lower" else y0 + dy
+    anchor_x = xlims[:, 0] + (anchor_x - x0) * x_per_cm
+    anchor_y = ylims[:, 1] - (anchor_y - y0) * y_per_cm
+
+    # The scalebar runs from the anchor towards the middle of the panel
+    if orientation == "h":
+        step = length * np.sign(x_per_cm)
+        step = -step if horizontal_side == "right" else step
+        xs = np.column_stack([anchor_x, anchor_x + step])
+        ys = np.column_stack([anchor_y, anchor_y])
+    else:
+        step = length * np.sign(y_per_cm)
+        step = -step if vertical_side == "upper" else step
+        xs = np.column_stack([anchor_x, anchor_x])
+        ys = np.column_stack([anchor_y, anchor_y + step])
+    centres = np.column_stack([xs.mean(axis=1), ys.mean(axis=1)])
+    return xs, ys, centres
+
+
+class ScaleBarGroup:
+    """The same scalebar on many panels, moved and styled together
+
+    Create with add_scalebars(). The scalebars are positioned using each panel's
+    limits at the time they are placed, call update() after changing the limits.
+    """
+
+    def __init__(
+        self, axes, lines, texts, length, position_cm, corner, orientation, text_pad_cm,
+    ):
+        self.axes = list(axes)
+        self.lines = lines
+        self.texts = texts
+        self.length = length
+        self.position_cm = position_cm
+        self.corner = corner
+        self.orientation = orientation
+        self.text_pad_cm = text_pad_cm
+
+    def __len__(self):
+        return len(self.axes)
+
+    def move(self, position_cm=None, corner=None):
+        """Move all the scalebars to a new position
+
+        :param position_cm: Distance (x, y) in cm from the corner to the scalebar end
+        :type position_cm: tuple, optional
+        :param corner: Corner of the panel to measure from, e.g. 'lower right'
+        :type corner: str, optional
+        """
+        if corner is not None and corner not in _CORNERS:
+            raise ValueError(f"Unknown corner: {corner}, must be one of {_CORNERS}")
+        self.position_cm = self.position_cm if position_cm is None else position_cm
+        self.corner = self.corner if corner is None else corner
+        self.update()
+
+    def update(self):
+        """Reposition the scalebars from the current panel locations and limits"""
+        if not self.axes:
+            return
+        locations = np.array([ax.get_location() for ax in self.axes], dtype=float)
+        xlims = np.array([ax.get_xlim() for ax in self.axes], dtype=float)
+        ylims = np.array([ax.get_ylim() for ax in self.axes], dtype=float)
+        xs, ys, centres = _scalebar_geometry(
+            locations,
+            xlims,
+            ylims,
+            self.length,
+            self.position_cm,
+            self.corner,
+            self.orientation,
+        )
+        vertical_side, horizontal_side = self.corner.split()
+        pad = self.text_pad_cm / 2.54 * 72  # points
+        if self.orientation == "h":
+            offset = (0, -pad) if vertical_side == "lower" else (0, pad)
+            va = "top" if vertical_side == "lower" else "bottom"
+            alignment = dict(ha="center", va=va)
+        else:
+            offset = (pad, 0) if horizontal_side == "right" else (-pad, 0)
+            ha = "left" if horizontal_side == "right" else "right"
+            alignment = dict(ha=ha, va="center")
+
+        for n, ax in enumerate(self.axes):
+            self.lines[n].set_data(xs[n], ys[n])
+            text = self.texts[n]
+            text.set_position(centres[n])
+            text.set_transform(
+                transforms.offset_copy(
+                    ax.transData, ax.get_figure(), *offset, units="points",
+                ),
+            )
+            text.set(**alignment)
+
+    def set_style(self, linewidth=None, color=None, fontsize=None):
+        """Restyle all the scalebars
+
+        :param linewidth: Line width of the scalebars
+        :type linewidth: float, optional
+        :param color: Colour of the scalebars and their text
+        :type color: str, optional
+        :param fontsize: Font size of the text
+        :type fontsize: float, optional
+        """
+        for line, text in zip(self.lines, self.texts):
+            if linewidth is not None:
+                line.set_linewidth(linewidth)
+            if color is not None:
+                line.set_color(color)
+                text.set_color(color)
+            if fontsize is not None:
+                text.set_fontsize(fontsize)
+
+    def set_text(self, textstring):
+        """Set the text shown on all the scalebars
+
+        :param textstring: Text to display, e.g. '50 µm'
+        :type textstring: str
+        """
+        for text in self.texts:
+            text.set_text(textstring)
+
+    def remove(self):
+        """Remove all the scalebars from their panels"""
+        for line, text in zip(self.lines, self.texts):
+            line.remove()
+            text.remove()
+        self.axes, self.lines, self.texts = [], [], []
+
+
+def add_scalebars(
+    axes_list,
+    length,
+    position_cm=(0.2, 0.2),
+    corner="lower right",
+    unit=None,
+    orientation="h",
+    textstring=None,
+    lw=None,
+    fontsize=None,
+    color="k",
+    text_pad_cm=0.05,
+):
+    """Add the same scalebar to many panels at once
+
+    All positions are computed together from the panels' locations and limits, and no
+    drawing is done, so this is fast for montages of many panels.
+
+    :param axes_list: Panels to add scalebars to
+    :type axes_list: list[scilayout.classes.PanelAxes]
+    :param length: Length of the scalebar in data units
+    :type length: float
+    :param position_cm: Distance (x, y) in cm from the corner of the panel to the end of
+        the scalebar, default (0.2, 0.2)
+    :type position_cm: tuple, optional
+    :param corner: Corner of the panel, 'lower right' (default), 'lower left',
+        'upper right' or 'upper left'
+    :type corner: str, optional
+    :param unit: Unit of the scalebar, optional
+    :type unit: str, optional
+    :param orientation: 'h' for horizontal (default), 'v' for vertical
+    :type orientation: str, optional
+    :param textstring: Text to display on the scalebar. Defaults to the length and unit
+    :type textstring: str, optional
+    :param lw: Linewidth of the scalebars, default style.params['scalebars.linewidth']
+    :type lw: float, optional
+    :param fontsize: Font size of the text, default style.params['scalebars.fontsize']
+    :type fontsize: float, optional
+    :param color: Colour of the scalebars and text, default black
+    :type color: str, optional
+    :param text_pad_cm: Gap between the scalebar and its text in cm
+    :type text_pad_cm: float, optional
+    :return: Handle to move, restyle or remove all the scalebars
+    :rtype: ScaleBarGroup
+    """
+    orientation = "h" if orientation in ["horizontal", "h"] else "v"
+    if corner not in _CORNERS:
+        raise ValueError(f"Unknown corner: {corner}, must be one of {_CORNERS}")
+    lw = style.params["scalebars.linewidth"] if lw is None else lw
+    fontsize = style.params["scalebars.fontsize"] if fontsize is None else fontsize
+    if textstring is None:
+        textstring = f"{length}" if unit is None else f"{length} {unit}"
+
+    lines, texts = [], []
+    for ax in axes_list:
+        # Added as plain artists so that the data limits of the panel are not changed
+        line = Line2D([], [], lw=lw, color=color, clip_on=False, label="_nolegend_")
+        ax.add_artist(line)
+        text = Text(
+            0,
+            0,
+            textstring,
+            size=fontsize,
+            color=color,
+            rotation=0 if orientation == "h" else 90,
+            clip_on=False,
+        )
+        ax.add_artist(text)
+        lines.append(line)
+        texts.append(text)
+
+    group = ScaleBarGroup(
+        axes_list, lines, texts, length, position_cm, corner, orientation, text_pad_cm,
+    )
+    group.update()
+    return group
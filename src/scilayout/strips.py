@@ -0,0 +1,565 @@
+"""Render png and tiff exports in horizontal strips, with bounded memory use.
+
+Agg renders a whole figure into one RGBA buffer, so an A0 poster (84 x 119 cm) at
+600 dpi needs over 2 GB for the buffer alone. Here the figure is drawn one strip of
+rows at a time, by shifting the figure-to-display transform under a renderer that is
+only as tall as the strip, and each strip is passed on to an encoder that writes the
+file incrementally. Memory use is proportional to the strip height, not the figure
+height.
+
+The pixels are those of a render of the whole figure:
+
+- Each strip is drawn with an inch of padding above and below, so that strokes, joins
+  and markers crossing the edge of a strip are drawn as in a full render. The padding
+  starts on a multiple of the hatch pattern's height, which Agg lines up with the top
+  of the buffer.
+- Lines are clipped to the whole figure and simplified (matplotlib merges vertices
+  closer than a fraction of a pixel) as a full render would, before being drawn into
+  the strip, as simplification depends on the whole path.
+
+Text, images, markers, fills and hatches come out identical. The antialiased edges of
+long strokes can differ from a full render by one level of 255 in a few pixels, as
+their coordinates are rounded to Agg's subpixel grid from a shifted origin.
+
+Use it through `scilayout.base.savefigure(fig, "poster.png", strip_height=512)`, which
+selects this module as the backend for the export.
+
+The png encoder here also has profiles that trade time for file size, selected with
+`savefigure(..., png_profile=...)` for a whole figure or with strips: 'fast' and
+'small' compress at the lowest and highest zlib levels, and 'parallel' compresses
+pieces of the image on a pool of threads, which zlib allows as it releases the GIL.
+See `benchmarks/png_encoding.py` for how they compare.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.transforms import Affine2D, IdentityTransform
+
+from .raster import _shifted
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from matplotlib.backend_bases import GraphicsContextBase
+    from matplotlib.figure import Figure
+    from matplotlib.path import Path as MplPath
+
+STRIP_HEIGHT = 512
+"""Default number of rows rendered at once."""
+
+_PAD_INCHES = 1.0
+"""Drawn above and below each strip but not kept. Agg clips strokes to its buffer, which
+changes how the joins near the clipped end are drawn, so the edges of the buffer are
+kept well away from the rows of the strip."""
+
+_INCHES_PER_METRE = 39.37007874015748
+
+
+class _StripRenderer(RendererAgg):
+    """An Agg renderer for the rows from `top` of a figure `full_height` rows high."""
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        dpi: float,
+        top: int,
+        full_height: int,
+    ) -> None:
+        super().__init__(width, height, dpi)
+        self.top = top
+        self.full_height = full_height
+
+    def draw_path(
+        self,
+        gc: GraphicsContextBase,
+        path: MplPath,
+        transform: Affine2D,
+        rgbFace: Any = None,
+    ) -> None:
+        """Draw a path, clipping and simplifying strokes as in a full render."""
+        if rgbFace is not None or gc.get_hatch_path() is not None:
+            # Agg neither clips nor simplifies filled and hatched paths
+            super().draw_path(gc, path, transform, rgbFace)
+            return
+
+        # To rows of the whole figure, as Agg transforms paths in a full render
+        to_rows = transform + Affine2D().scale(1, -1).translate(
+            0, self.height + self.top,
+        )
+        stroke_width = (
+            self.points_to_pixels(gc.get_linewidth()) if gc.get_rgb()[3] else 0.0
+        )
+        cleaned = path.cleaned(
+            transform=to_rows,
+            remove_nans=True,
+            clip=(0, 0, self.width, self.full_height),
+            simplify=path.should_simplify,
+            curves=True,
+            stroke_width=stroke_width,
+            snap=gc.get_snap(),
+        )
+        cleaned.should_simplify = False
+        # Back to the display coordinates of the strip, already snapped
+        cleaned.vertices[:, 1] = (self.height + self.top) - cleaned.vertices[:, 1]
+        snap = gc.get_snap()
+        gc.set_snap(False)
+        try:
+            super().draw_path(gc, cleaned, IdentityTransform(), rgbFace)
+        finally:
+            gc.set_snap(snap)
+
+
+def render_strips(
+    fig: Figure,
+    strip_height: int = STRIP_HEIGHT,
+) -> Iterator[np.ndarray]:
+    """Render a figure one strip at a time, at its current dpi.
+
+    Parameters
+    ----------
+    fig : Figure
+        Figure to render.
+    strip_height : int
+        Number of rows in each strip.
+
+    Yields
+    ------
+    np.ndarray
+        RGBA pixels of shape (rows, width, 4), from the top of the figure down. An
+        array is only valid until the next one is requested.
+
+    """
+    width, height = (int(size) for size in fig.bbox.max)
+    pad = math.ceil(_PAD_INCHES * fig.dpi)
+    # Agg repeats hatch patterns every int(dpi) rows from the top of the buffer
+    hatch_period = max(int(fig.dpi), 1)
+    for top in range(0, height, strip_height):
+        bottom = min(top + strip_height, height)
+        padded_top = max(top - pad, 0) // hatch_period * hatch_period
+        padded_bottom = min(bottom + pad, height)
+        renderer = _StripRenderer(
+            width, padded_bottom - padded_top, fig.dpi, padded_top, height,
+        )
+        # Move the figure up so that its row padded_bottom is at the strip's bottom
+        with _shifted(fig, 0, height - padded_bottom):
+            fig.draw(renderer)
+        yield np.asarray(renderer.buffer_rgba())[top - padded_top:bottom - padded_top]
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """A png chunk with its length and checksum."""
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)))
+    )
+
+
+def _filter_up(rows: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Filter rows of bytes with the png "up" filter (the difference to the row above).
+
+    Suits figures with large areas of flat colour, and is quick to compute.
+    """
+    filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    np.subtract(rows, np.concatenate([previous, rows[:-1]]), out=filtered[:, 1:])
+    return filtered
+
+
+def _filter_adaptive(rows: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Filter each row of RGBA bytes with the png filter that suits it best.
+
+    All five filters are applied and for each row the one with the smallest sum of
+    absolute (signed) differences is kept, the heuristic libpng uses.
+    """
+    up = np.concatenate([previous, rows[:-1]])
+    left = np.zeros_like(rows)
+    left[:, 4:] = rows[:, :-4]
+    up_left = np.zeros_like(rows)
+    up_left[:, 4:] = up[:, :-4]
+
+    # The Paeth predictor: whichever of left, up and up left is closest to
+    # left + up - up left
+    from_up = left - up_left.astype(np.int16)
+    from_left = up - up_left.astype(np.int16)
+    from_up_left = from_up + from_left
+    np.abs(from_up, out=from_up)
+    np.abs(from_left, out=from_left)
+    np.abs(from_up_left, out=from_up_left)
+    paeth = up_left.copy()
+    np.copyto(paeth, up, where=from_up <= from_up_left)
+    np.copyto(
+        paeth, left, where=(from_left <= from_up) & (from_left <= from_up_left),
+    )
+    average = (left >> 1) + (up >> 1) + (left & up & 1)
+
+    filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 0
+    filtered[:, 1:] = rows
+    # The absolute value of a byte read as signed, without converting it
+    best_cost = np.minimum(rows, -rows).sum(axis=1, dtype=np.uint32)
+    for filter_type, predicted in enumerate((left, up, average, paeth), start=1):
+        residual = rows - predicted
+        cost = np.minimum(residual, -residual).sum(axis=1, dtype=np.uint32)
+        better = cost < best_cost
+        best_cost[better] = cost[better]
+        filtered[better, 0] = filter_type
+        filtered[better, 1:] = residual[better]
+    return filtered
+
+
+PNG_PROFILES = {
+    "fast": (1, zlib.Z_DEFAULT_STRATEGY, _filter_up),
+    "small": (9, zlib.Z_FILTERED, _filter_adaptive),
+    "parallel": (6, zlib.Z_FILTERED, _filter_adaptive),
+}
+"""zlib compression level and strategy, and row filter of each png encoding profile.
+
+Choosing the filter of each row takes longer than compressing at the lowest level, so
+the fast profile filters every row with "up", which suits large areas of flat colour.
+"""
+
+_PARALLEL_ROWS = 128
+"""Rows compressed together in one task of the parallel profile."""
+
+
+def _adler32_combine(adler1: int, adler2: int, length2: int) -> int:
+    """The Adler-32 checksum of two pieces of data from their checksums.
+
+    As zlib's adler32_combine, which Python's zlib module does not expose.
+    """
+    base = 65521
+    remainder = length2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = remainder * sum1 % base
+    sum1 = (sum1 + (adler2 & 0xFFFF) + base - 1) % base
+    sum2 = (sum2 + (adler1 >> 16) + (adler2 >> 16) + base - remainder) % base
+    return sum2 << 16 | sum1
+
+
+def _zlib_header(level: int) -> bytes:
+    """The two byte header of a zlib stream with a 32 kB window."""
+    method = 0x78
+    flags = (0 if level < 2 else 1 if level < 6 else 2 if level == 6 else 3) << 6
+    flags += 31 - (method << 8 | flags) % 31
+    return bytes((method, flags))
+
+
+def _deflate_piece(
+    rows: np.ndarray,
+    previous: np.ndarray,
+    profile: str,
+    last: bool,
+) -> tuple[bytes, int, int]:
+    """Filter and compress rows as one piece of a zlib stream made of pieces.
+
+    Each piece is a raw deflate stream ended with a sync flush, which leaves it byte
+    aligned, so that pieces compressed separately can be concatenated. The last piece
+    is ended properly.
+
+    Returns the compressed bytes, and the Adler-32 checksum and length of the data.
+    """
+    level, strategy, filter_rows = PNG_PROFILES[profile]
+    data = filter_rows(rows, previous).tobytes()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15, 8, strategy)
+    compressed = compressor.compress(data) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH,
+    )
+    return compressed, zlib.adler32(data), len(data)
+
+
+def _compressed_parallel(
+    strips: Iterator[np.ndarray],
+    width: int,
+    height: int,
+    profile: str,
+    workers: int | None,
+) -> Iterator[bytes]:
+    """Filter and compress strips in pieces on a pool of threads, in order.
+
+    zlib and numpy release the GIL, so the pieces are filtered and compressed at the
+    same time, and a few more are queued than there are threads.
+    """
+    yield _zlib_header(PNG_PROFILES[profile][0])
+    adler = zlib.adler32(b"")
+    previous = np.zeros((1, width * 4), dtype=np.uint8)
+    start = 0
+    window = 2 * (workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for strip in strips:
+            rows = strip.reshape(len(strip), width * 4)
+            for first in range(0, len(rows), _PARALLEL_ROWS):
+                # Copied, as the strip is only valid until the next one is rendered
+                piece = rows[first:first + _PARALLEL_ROWS].copy()
+                start += len(piece)
+                pending.append(
+                    executor.submit(
+                        _deflate_piece, piece, previous, profile, start == height,
+                    ),
+                )
+                previous = piece[-1:]
+                while len(pending) >= window:
+                    compressed, piece_adler, length = pending.popleft().result()
+                    adler = _adler32_combine(adler, piece_adler, length)
+                    yield compressed
+        while pending:
+            compressed, piece_adler, length = pending.popleft().result()
+            adler = _adler32_combine(adler, piece_adler, length)
+            yield compressed
+    yield struct.pack(">I", adler)
+
+
+def _compressed(
+    strips: Iterator[np.ndarray],
+    width: int,
+    profile: str,
+) -> Iterator[bytes]:
+    """Filter and compress strips as one zlib stream."""
+    level, strategy, filter_rows = PNG_PROFILES[profile]
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 8, strategy)
+    previous = np.zeros((1, width * 4), dtype=np.uint8)
+    for strip in strips:
+        rows = strip.reshape(len(strip), width * 4)
+        yield compressor.compress(filter_rows(rows, previous).tobytes())
+        previous = rows[-1:].copy()
+    yield compressor.flush()
+
+
+def write_png(
+    file: BinaryIO,
+    strips: Iterator[np.ndarray],
+    width: int,
+    height: int,
+    dpi: float,
+    metadata: dict[str, str | None] | None = None,
+    profile: str = "parallel",
+    workers: int | None = None,
+) -> None:
+    """Encode RGBA strips as a png, writing each strip once it is compressed.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        File to write to.
+    strips : Iterator[np.ndarray]
+        RGBA pixels of shape (rows, width, 4), from the top down.
+    width : int
+        Width of the image in pixels.
+    height : int
+        Height of the image in pixels.
+    dpi : float
+        Dots per inch recorded in the file.
+    metadata : dict[str, str | None] | None
+        Text entries, entries that are None are left out.
+    profile : str
+        How to compress the pixels:
+
+        - 'fast': the "up" filter and the lowest zlib level, for larger files in a
+          fraction of the time.
+        - 'small': the best filter for each row and the highest zlib level, for the
+          smallest files.
+        - 'parallel': the best filter for each row and the default zlib level, with
+          pieces of the image filtered and compressed on a pool of threads and joined
+          into one zlib stream.
+    workers : int | None
+        Number of threads for the 'parallel' profile.
+
+    Raises
+    ------
+    ValueError
+        If the profile is not one of `PNG_PROFILES`.
+
+    """
+    if profile not in PNG_PROFILES:
+        msg = f"Unknown png profile {profile!r}, use one of {', '.join(PNG_PROFILES)}"
+        raise ValueError(msg)
+
+    file.write(b"\x89PNG\r\n\x1a\n")
+    # 8 bits per channel, colour type 6 (RGBA), no interlacing
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    file.write(_png_chunk(b"IHDR", header))
+    pixels_per_metre = round(dpi * _INCHES_PER_METRE)
+    file.write(_png_chunk(b"pHYs", struct.pack(">IIB", *[pixels_per_metre] * 2, 1)))
+    for key, value in (metadata or {}).items():
+        if value is not None:
+            file.write(_png_chunk(b"tEXt", f"{key}\0{value}".encode("latin-1")))
+
+    if profile == "parallel":
+        compressed = _compressed_parallel(strips, width, height, profile, workers)
+    else:
+        compressed = _compressed(strips, width, profile)
+    for data in compressed:
+        if data:
+            file.write(_png_chunk(b"IDAT", data))
+    file.write(_png_chunk(b"IEND", b""))
+
+
+# tiff tag types
+_SHORT = 3
+_LONG = 4
+_RATIONAL = 5
+
+
+def write_tiff(
+    file: BinaryIO,
+    strips: Iterator[np.ndarray],
+    width: int,
+    height: int,
+    dpi: float,
+    compress_level: int = 6,
+) -> None:
+    """Encode RGBA strips as a deflate-compressed tiff, one tiff strip per strip.
+
+    The strips are written as they come and the image directory, which lists where
+    they are, after them. The file must be seekable, to fill in the offset of the
+    directory at the start.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        File to write to.
+    strips : Iterator[np.ndarray]
+        RGBA pixels of shape (rows, width, 4), from the top down, all with the same
+        number of rows except the last.
+    width : int
+        Width of the image in pixels.
+    height : int
+        Height of the image in pixels.
+    dpi : float
+        Dots per inch recorded in the file.
+    compress_level : int
+        zlib compression level.
+
+    """
+    start = file.tell()
+    file.write(b"II*\0\0\0\0\0")  # little endian, directory offset filled in below
+    offsets = []
+    byte_counts = []
+    rows_per_strip = height
+    for strip in strips:
+        if not offsets:
+            rows_per_strip = len(strip)
+        data = zlib.compress(np.ascontiguousarray(strip).tobytes(), compress_level)
+        offsets.append(file.tell() - start)
+        byte_counts.append(len(data))
+        file.write(data)
+    if (file.tell() - start) % 2:
+        file.write(b"\0")  # the directory starts on a word boundary
+
+    # Values that do not fit in the 4 bytes of a directory entry follow the directory
+    entries = [
+        (256, _LONG, [width]),  # ImageWidth
+        (257, _LONG, [height]),  # ImageLength
+        (258, _SHORT, [8, 8, 8, 8]),  # BitsPerSample
+        (259, _SHORT, [8]),  # Compression: deflate
+        (262, _SHORT, [2]),  # PhotometricInterpretation: RGB
+        (273, _LONG, offsets),  # StripOffsets
+        (277, _SHORT, [4]),  # SamplesPerPixel
+        (278, _LONG, [rows_per_strip]),  # RowsPerStrip
+        (279, _LONG, byte_counts),  # StripByteCounts
+        (282, _RATIONAL, [round(dpi * 1000), 1000]),  # XResolution
+        (283, _RATIONAL, [round(dpi * 1000), 1000]),  # YResolution
+        (284, _SHORT, [1]),  # PlanarConfiguration: interleaved
+        (296, _SHORT, [2]),  # ResolutionUnit: inch
+        (338, _SHORT, [2]),  # ExtraSamples: unassociated alpha
+    ]
+    directory_offset = file.tell() - start
+    overflow_offset = directory_offset + 2 + 12 * len(entries) + 4
+    directory = [struct.pack("<H", len(entries))]
+    overflow = []
+    for tag, tag_type, values in entries:
+        count = len(values) // 2 if tag_type == _RATIONAL else len(values)
+        value_bytes = struct.pack(
+            f"<{len(values)}{'H' if tag_type == _SHORT else 'I'}", *values,
+        )
+        if len(value_bytes) <= 4:
+            field = value_bytes.ljust(4, b"\0")
+        else:
+            field = struct.pack("<I", overflow_offset)
+            overflow.append(value_bytes)
+            overflow_offset += len(value_bytes)
+        directory.append(struct.pack("<HHI", tag, tag_type, count) + field)
+    directory.append(struct.pack("<I", 0))  # no further directories
+    file.write(b"".join(directory + overflow))
+
+    end = file.tell()
+    file.seek(start + 4)
+    file.write(struct.pack("<I", directory_offset))
+    file.seek(end)
+
+
+@contextmanager
+def _opened(filename_or_obj: str | Path | BinaryIO) -> Iterator[BinaryIO]:
+    """Open a path for binary writing, or pass through an already open file."""
+    if hasattr(filename_or_obj, "write"):
+        yield filename_or_obj
+    else:
+        with open(filename_or_obj, "wb") as file:
+            yield file
+
+
+class FigureCanvasStrips(FigureCanvasAgg):
+    """An Agg canvas that saves png and tiff files by rendering strips.
+
+    Selected for a single export with
+    `fig.savefig(path, backend="module://scilayout.strips", strip_height=512)`. A
+    `strip_height` of None renders the whole figure at once, e.g. to only use one of
+    the png encoding profiles.
+    """
+
+    def get_renderer(self) -> RendererAgg:
+        """A renderer for measuring, without the buffer of the whole figure."""
+        if self._lastKey != self.figure.dpi:
+            self.renderer = RendererAgg(1, 1, self.figure.dpi)
+            self._lastKey = self.figure.dpi
+        return self.renderer
+
+    def print_png(
+        self,
+        filename_or_obj: str | Path | BinaryIO,
+        *,
+        metadata: dict[str, str | None] | None = None,
+        strip_height: int | None = STRIP_HEIGHT,
+        png_profile: str = "parallel",
+        **kwargs: Any,
+    ) -> None:
+        """Write a png, rendering the figure in strips."""
+        width, height = self.get_width_height(physical=True)
+        strips = render_strips(self.figure, strip_height or height)
+        with _opened(filename_or_obj) as file:
+            write_png(
+                file, strips, width, height, self.figure.dpi, metadata, png_profile,
+            )
+
+    def print_tiff(
+        self,
+        filename_or_obj: str | Path | BinaryIO,
+        *,
+        strip_height: int | None = STRIP_HEIGHT,
+        **kwargs: Any,
+    ) -> None:
+        """Write a tiff, rendering the figure in strips."""
+        width, height = self.get_width_height(physical=True)
+        strips = render_strips(self.figure, strip_height or height)
+        with _opened(filename_or_obj) as file:
+            write_tiff(file, strips, width, height, self.figure.dpi)
+
+    print_tif = print_tiff
+
+
+FigureCanvas = FigureCanvasStrips
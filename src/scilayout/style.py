@@ -3,10 +3,24 @@
 
 ```scilayout.params['panellabel.font'] = 'sans-serif'```
 
+Parameters are global by default. Inside a style.context() block they are private to
+the current thread (or asyncio task), so threads can build figures with different
+styles at the same time:
 
+```
+with scilayout.style.context('journal.json'):
+    fig = scilayout.Figure()
+```
 """
 
+import contextvars
 import json
+import os
+import sys
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from importlib import resources
+from types import MappingProxyType
 
 # --- Handle styling of scilayout elements
 # This dictionary defines the default styles used across scilayout.
@@ -32,6 +46,13 @@ defaultstyles = {
     'stats.linecolor': 'black',
     'stats.linewidth': 1,
     'stats.drop_amount': 0.025,
+    'stats.fontsize': 8,
+    # distance between stacked brackets of stats.compare, in axis proportion
+    'stats.step': 0.08,
+    # base.py
+    # Artists in pdf and svg exports with more vertices and markers than this are
+    # rasterized at the export dpi, None keeps everything as vectors
+    'export.rasterize_threshold': 100_000,
 }
 
 class StyleDictionary(dict):
@@ -54,55 +75,201 @@ class StyleDictionary(dict):
     def __getattr__(self, key):
         return self[key]
 
-params = StyleDictionary()
+
+# The parameters in effect for the current thread or asyncio task. Outside of a
+# context() block this is the global dictionary shared by everything.
+_global_params = StyleDictionary()
+_current_params = contextvars.ContextVar(
+    'scilayout_style_params', default=_global_params,
+)
+
+
+class ParamsProxy(MutableMapping):
+    """The parameters in effect for the current thread or task (see context())
+
+    Behaves like the StyleDictionary it stands in for, so existing code can keep using
+    style.params.
+    """
+
+    def _resolve(self):
+        return _current_params.get()
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+    def __setitem__(self, name, value):
+        self._resolve()[name] = value
+
+    def __delitem__(self, name):
+        del self._resolve()[name]
+
+    def __iter__(self):
+        return iter(self._resolve())
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __getattr__(self, key):
+        return getattr(self._resolve(), key)
+
+    def __repr__(self):
+        return repr(self._resolve())
+
+    def copy(self):
+        return self._resolve().copy()
+
+
+params = ParamsProxy()
 
 # --- Config file handling ---
 
+# Parsed style sheets keyed on the file path. Each entry holds the modification time the
+# sheet was parsed at, so an edited file is re-read but an unchanged one is only parsed once.
+_config_cache = {}
+
+
+def resource(package, name):
+    """Locate a style sheet shipped inside an importable package
+
+    The returned object can be passed to use() or compose() like a file path.
+
+    :param package: Name of the package containing the style sheet (e.g. 'mypackage.styles')
+    :type package: str
+    :param name: File name of the style sheet within the package
+    :type name: str
+    :return: The style sheet resource
+    :rtype: importlib.resources.abc.Traversable
+    """
+    return resources.files(package).joinpath(name)
+
+
 def _load_config(filepath):
     """Load a configuration file to set parameters
-    :param filepath: Path to the json configuration file
-    :type filepath: str
-    :return: Dictionary of parameters
-    :rtype: dict
+
+    Parsed files are cached on their path and modification time.
+
+    :param filepath: Path to the json configuration file, or a package resource
+    :type filepath: str, pathlib.Path or importlib.resources.abc.Traversable
+    :return: Dictionary of parameters (read-only)
+    :rtype: types.MappingProxyType
     """
     # Why JSON and not the same format as matplotlib? Because their implementation is too complicated to replicate here.
     # Fight me.
-    with open(filepath, 'r') as f:
-        config = json.load(f)
+    if isinstance(filepath, (str, os.PathLike)):
+        key = os.path.abspath(filepath)
+        mtime = os.stat(key).st_mtime_ns
+    else:
+        # A resource inside a package (possibly a zip archive) without a modification time
+        key = str(filepath)
+        mtime = None
+
+    # Let dependency tracking (e.g. scilayout watch) see style sheets even when cached
+    sys.audit('scilayout.style.load', key)
+    cached = _config_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    if mtime is None:
+        config = json.loads(filepath.read_text())
+    else:
+        with open(key, 'r') as f:
+            config = json.load(f)
+    config = MappingProxyType(config)
+    _config_cache[key] = (mtime, config)
+    return config
+
+
+def compose(*sources):
+    """Compose several style sheets into a single set of parameters
+
+    Sources are layered in order, so later sources override earlier ones
+    (e.g. compose(base, journal, {'panellabel.fontsize': 10})).
+
+    :param sources: Style sheet paths, package resources or dictionaries of parameters
+    :type sources: str, pathlib.Path, importlib.resources.abc.Traversable or dict
+    :return: Dictionary of parameters
+    :rtype: dict
+    """
+    config = {}
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)) or not hasattr(source, 'keys'):
+            source = _load_config(source)
+        config.update(source)
     return config
 
+
+def _apply(params, config):
+    """Set parameters from a dictionary, only touching keys whose value changes
+
+    :param params: The dictionary to set the parameters in
+    :type params: dict or ParamsProxy
+    :param config: Parameters to set, keys not in params are ignored
+    :type config: dict
+    :return: Keys whose values were changed
+    :rtype: list
+    """
+    if isinstance(params, ParamsProxy):
+        params = params._resolve()
+    changed = {
+        key: value for key, value in config.items()
+        if key in params and params[key] != value
+    }
+    # Keys are already known to exist, so skip the per-key validation of __setitem__
+    dict.update(params, changed)
+    return list(changed)
+
+
 def use(filepath, params=params, allow_only_valid_keys=True):
     """Use a configuration file to set parameters
 
-    :param filepath: Path to the configuration file
-    :type filepath: str
+    Several style sheets can be layered by passing a list, e.g.
+    use([base, journal, {'panellabel.fontsize': 10}]), where later layers take precedence.
+
+    :param filepath: Path to the configuration file, a package resource (see resource()),
+        a dictionary of parameters, or a list of these to compose as layers
+    :type filepath: str, pathlib.Path, importlib.resources.abc.Traversable, dict or list
     :param params: The dictionary to set the parameters in
     :type params: dict, optional
     :param allow_only_valid_keys: Whether to allow only keys that are already in the dictionary
     :type allow_only_valid_keys: bool, optional
     """
-    config = _load_config(filepath)
-    
+    layers = filepath if isinstance(filepath, (list, tuple)) else [filepath]
+    config = compose(*layers)
+
     if allow_only_valid_keys:
-        config_keys = config.keys()
-        valid_keys = params.keys()
-        failing_keys = []
-        for key in config_keys:
-            if key not in valid_keys:
-                failing_keys.append(key)
+        failing_keys = sorted(config.keys() - params.keys())
         if len(failing_keys) > 0:
             # This error will occur if your configuration file has other options
             # If you're patching in something fresh, you might want to consider setting up some default values using params._setitem() first.
             # For example, if you're adding a new parameter called 'newparam', you could do:
             # params._setitem('newparam', 'defaultvalue')
             raise ValueError(f"Invalid keys in configuration file: {failing_keys}")
-    
-    for key in config:
-        if key in params:
-            # If allow_only_valid_keys is False, this would allow you to have other non-scilayout parameters in the config file 
-            params[key] = config[key]
+
+    # If allow_only_valid_keys is False, this would allow you to have other non-scilayout parameters in the config file
+    _apply(params, config)
 
 def reset():
     """Reset the parameters to the default values"""
-    for key in params.keys():
-        params[key] = defaultstyles[key]
\ No newline at end of file
+    _apply(params, defaultstyles)
+
+
+@contextmanager
+def context(filepath=None):
+    """Use private parameters for the current thread or asyncio task within a block
+
+    The parameters start as a copy of those currently in effect, with filepath applied
+    on top, and changes made inside the block (including by use() and reset()) are not
+    seen by other threads or tasks, or after the block.
+
+    :param filepath: Style sheet(s) to apply, anything use() accepts, optional
+    :type filepath: str, pathlib.Path, importlib.resources.abc.Traversable, dict or list
+    """
+    local = StyleDictionary()
+    dict.update(local, _current_params.get())
+    token = _current_params.set(local)
+    try:
+        if filepath is not None:
+            use(filepath)
+        yield local
+    finally:
+        _current_params.reset(token)
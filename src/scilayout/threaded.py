@@ -0,0 +1,106 @@
+"""Build and export figures from a pool of threads in the current process.
+
+Threads avoid what process pools cost: nothing is pickled, no interpreter is started
+and matplotlib's fonts and caches are shared. Figures must be created with
+`scilayout.Figure`, which are not managed by pyplot, because pyplot's figure registry is
+not meant to be used from several threads.
+
+Each job runs in a copy of the caller's style context, and a job that builds its figure
+inside `scilayout.style.context` uses its own style without affecting the others, so
+figures with different journal styles can be made at the same time.
+
+Matplotlib draws one figure at a time in a process, so drawing itself does not run in
+parallel. What overlaps with it is building figures, compressing the output (zlib and
+Pillow run without the GIL) and writing files, which is most of the time spent on
+large png and pdf exports.
+
+Example usage:
+
+```python
+def make_figure(subject):
+    with scilayout.style.context(subject.journal_style):
+        fig = scilayout.Figure()
+        ...
+    return fig
+
+jobs = ((partial(make_figure, s), f"figures/{s.name}.png") for s in subjects)
+export_threaded(jobs, workers=8)
+```
+"""
+
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from matplotlib.figure import Figure
+
+from . import base
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .classes import SciFigure
+
+
+def _export(
+    source: SciFigure | Callable[[], SciFigure],
+    path: Path,
+    export_kwargs: dict[str, Any],
+) -> Path:
+    """Build a figure if needed and export it."""
+    fig = source if isinstance(source, Figure) else source()
+    if fig.canvas.manager is not None:
+        msg = (
+            "Figures managed by pyplot cannot be exported from threads, "
+            "create them with scilayout.Figure()"
+        )
+        raise ValueError(msg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    base.savefigure(fig, path, **export_kwargs)
+    return path
+
+
+def export_threaded(
+    jobs: Iterable[tuple[SciFigure | Callable[[], SciFigure], str | Path]],
+    workers: int | None = None,
+    **export_kwargs: Any,
+) -> list[Path]:
+    """Export figures from a pool of threads.
+
+    Parameters
+    ----------
+    jobs : Iterable[tuple]
+        Pairs of a figure, or a function that builds one, and the path to export it to.
+        Functions are called in the worker threads.
+    workers : int | None
+        Number of threads, defaults to that of `concurrent.futures.ThreadPoolExecutor`.
+    export_kwargs : dict
+        Keyword arguments for `scilayout.base.savefigure`.
+
+    Returns
+    -------
+    list[Path]
+        The exported paths, in the order of the jobs.
+
+    Raises
+    ------
+    ValueError
+        If a figure is managed by pyplot.
+
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            # Each job gets its own copy so that style changes stay within the job
+            executor.submit(
+                contextvars.copy_context().run,
+                _export,
+                source,
+                Path(path),
+                export_kwargs,
+            )
+            for source, path in jobs
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from scilayout import aio, figure
+
+SPEC = {"size": [6, 4], "panels": [{"location": [1, 1, 5, 3], "label": "a"}]}
+
+
+def slow_figure():
+    time.sleep(2)
+    return figure()
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = aio.RenderService(workers=1, max_pending=2)
+    yield service
+    service.close(wait=False)
+
+
+def test_render(service):
+    data = asyncio.run(service.render(SPEC, "png", dpi=100))
+    assert data.startswith(b"\x89PNG")
+    assert service.pending == 0
+
+
+def test_concurrent_renders(service):
+    async def render_many():
+        return await asyncio.gather(*(service.render(SPEC, "svg") for _ in range(4)))
+
+    results = asyncio.run(render_many())
+    assert len(results) == 4
+    assert len(set(results)) == 1
+
+
+def test_errors_are_raised(service):
+    with pytest.raises(ValueError, match="expected a"):
+        asyncio.run(service.render("figure.txt"))
+
+
+def test_timeout(service):
+    async def render_slow():
+        await service.render(slow_figure, timeout=0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(render_slow())
+
+    # The worker keeps the slot until the render is done, although the loop has closed
+    deadline = time.monotonic() + 30
+    while service.pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert service.pending == 0
+
+    async def render_many():
+        renders = (service.render(SPEC, "svg") for _ in range(service.max_pending))
+        return await asyncio.gather(*renders)
+
+    assert len(asyncio.run(render_many())) == service.max_pending
+    assert service.pending == 0
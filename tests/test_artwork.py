@@ -0,0 +1,251 @@
+"""Tests for vector artwork imported from svg and pdf files."""
+
+import os
+import zlib
+
+import numpy as np
+import pytest
+from matplotlib.path import Path
+
+import scilayout
+from scilayout import artwork
+
+# The fixture has a text element, which is not drawn
+pytestmark = pytest.mark.filterwarnings("ignore:.*text and image elements:UserWarning")
+
+SVG = """<svg xmlns="http://www.w3.org/2000/svg"
+     xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="20cm" height="10cm" viewBox="0 0 200 100">
+  <style>.box { fill: #ff0000; stroke: none }</style>
+  <defs>
+    <linearGradient id="shade">
+      <stop offset="0" stop-color="black"/><stop offset="1" stop-color="white"/>
+    </linearGradient>
+    <circle id="dot" r="5"/>
+  </defs>
+  <rect class="box" x="10" y="10" width="50" height="30"/>
+  <g transform="translate(100, 0) scale(2)" stroke="blue" stroke-width="2" fill="none">
+    <path d="M0,0 L10,10 a5 5 0 00 10 0z" stroke-dasharray="2 1"/>
+    <rect x="1" y="20" width="10" height="10" rx="2" fill="url(#shade)"/>
+  </g>
+  <use xlink:href="#dot" x="150" y="80" fill="green" opacity="0.5"/>
+  <text x="0" y="90">outline me</text>
+  <polygon points="0,100 20,80 40,100" style="fill: rgb(0, 0, 255)"/>
+</svg>
+"""
+
+
+def pdf(content, resources=b""):
+    """A one page pdf of a 200 x 100 pt page with a compressed content stream."""
+    stream = zlib.compress(content)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 /MediaBox [0 0 200 100] >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 4 0 R /Resources << "
+        + resources
+        + b" >> >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+        + stream
+        + b"\nendstream",
+        b"<< /Type /ExtGState /ca 0.5 /CA 0.25 >>",
+        b"<< /Type /XObject /Subtype /Form /BBox [0 0 10 10] /Length 14 >>\nstream\n"
+        b"0 0 10 10 re f\nendstream",
+    ]
+    data = b"%PDF-1.4\n"
+    for number, body in enumerate(objects, 1):
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    return data + b"trailer\n<< /Root 1 0 R /Size 7 >>\n%%EOF\n"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    artwork.clear_cache()
+
+
+@pytest.fixture
+def svg_file(tmp_path):
+    path = tmp_path / "schematic.svg"
+    path.write_text(SVG)
+    return path
+
+
+def bounds(art):
+    return [tuple(np.round(path.get_extents().bounds, 6)) for path in art.paths()]
+
+
+def test_svg(svg_file):
+    with pytest.warns(UserWarning, match="1 text and image elements are not drawn"):
+        art = artwork.load_artwork(svg_file)
+    assert art.size == (200, 100)  # in viewBox units
+    assert len(art) == 5
+    assert art.skipped == 1
+    assert bounds(art) == [
+        (10, 10, 50, 30),
+        (100, 0, 40, 30),  # the arc bulges down to y = 15 before scaling
+        (102, 40, 20, 20),
+        (145, 75, 10, 10),
+        (0, 80, 40, 20),
+    ]
+    np.testing.assert_allclose(
+        art.facecolors,
+        [
+            (1, 0, 0, 1),
+            (0, 0, 0, 0),
+            (0.5, 0.5, 0.5, 1),  # the mean of the gradient
+            (0, 0.5, 0, 0.5),
+            (0, 0, 1, 1),
+        ],
+        atol=0.01,
+    )
+    np.testing.assert_allclose(art.edgecolors[1:3], [(0, 0, 1, 1)] * 2)
+    np.testing.assert_allclose(art.linewidths, [0, 4, 4, 0, 0])  # scaled by 2
+    assert art.dashes[1] == (0, (1, 0.5))  # in stroke widths
+    assert art.dashes[2] == (0, None)
+
+
+def test_svg_path_data():
+    vertices, codes = artwork._svg_path("M1 1h2v2H1zm5 0l1-1 1 1Q9 0 10 1t2 0")
+    np.testing.assert_allclose(
+        vertices,
+        [(1, 1), (3, 1), (3, 3), (1, 3), (1, 1), (6, 1), (7, 0), (8, 1), (9, 0),
+         (10, 1), (11, 2), (12, 1)],
+    )
+    assert list(codes) == [
+        Path.MOVETO, *[Path.LINETO] * 3, Path.CLOSEPOLY, Path.MOVETO, Path.LINETO,
+        Path.LINETO, *[Path.CURVE3] * 4,
+    ]
+    # A half circle of radius 1 with compact flags, counterclockwise with y down
+    vertices, _ = artwork._svg_path("M0,0a1,1 0 10 2,0")
+    path = Path(vertices, [Path.MOVETO, *[Path.CURVE4] * (len(vertices) - 1)])
+    np.testing.assert_allclose(path.get_extents().bounds, (0, 0, 2, 1), atol=1e-9)
+    with pytest.raises(ValueError, match="Invalid svg path data"):
+        artwork._svg_path("M0 0 L1")
+
+
+def test_pdf(tmp_path):
+    content = (
+        b"q 1 0 0 RG 4 w [2 1] 0 d 10 10 m 60 10 l 60 40 l S Q\n"
+        b"q /GS0 gs 0 0 1 rg 1 0 0 1 100 50 cm 0 0 20 10 re f Q\n"
+        b"q 2 0 0 2 150 0 cm /Fm0 Do Q\n"
+        b"BT /F1 12 Tf (text) Tj ET\n"
+    )
+    resources = b"/ExtGState << /GS0 5 0 R >> /XObject << /Fm0 6 0 R >>"
+    path = tmp_path / "schematic.pdf"
+    path.write_bytes(pdf(content, resources))
+    art = artwork.load_artwork(path)
+    assert art.size == (200, 100)
+    assert art.skipped == 1
+    # y down from the top of the page
+    assert bounds(art) == [(10, 60, 50, 30), (100, 40, 20, 10), (150, 80, 20, 20)]
+    np.testing.assert_allclose(
+        art.edgecolors, [(1, 0, 0, 1), (0, 0, 0, 0), (0, 0, 0, 0)],
+    )
+    np.testing.assert_allclose(art.facecolors[1:], [(0, 0, 1, 0.5), (0, 0, 0, 1)])
+    assert art.linewidths[0] == 4
+    assert art.dashes[0] == (0, (0.5, 0.25))
+
+
+@pytest.mark.parametrize("suffix", ["svg", "pdf"])
+def test_matplotlib_export(tmp_path, suffix):
+    source = scilayout.Figure()
+    source.set_size_cm(8, 4)
+    ax = source.add_panel((1, 1, 7, 3))
+    ax.plot([0, 1, 2], [0, 1, 0], "o-")
+    ax.fill_between([0, 2], 0, 0.5, alpha=0.3)
+    path = tmp_path / f"plot.{suffix}"
+    source.savefig(path)
+    art = artwork.load_artwork(path)
+    assert art.size == pytest.approx((8 / 2.54 * 72, 4 / 2.54 * 72))  # points
+    assert np.isclose(art.facecolors[:, 3], 0.3).any()
+
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 10)
+    placed = fig.add_artwork(path, (1, 2, 5, 8))
+    # Fitted to the width, at the top left
+    expected = (fig.transCM + fig.transFigure).transform([(1, 2), (5, 4)])
+    extent = placed.get_window_extent()
+    assert extent.x0 >= expected[0, 0] - 1e-6
+    assert extent.x1 <= expected[1, 0] + 1e-6
+    assert extent.y1 <= expected[0, 1] + 1e-6
+    assert extent.y0 >= expected[1, 1] - 1e-6
+    assert bytes(fig.export_bytes("png")).startswith(b"\x89PNG")
+
+
+def test_parsed_once(svg_file, tmp_path, monkeypatch):
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 10)
+    placed = fig.add_artwork(svg_file, (1, 1, 9, 5))
+    copy = tmp_path / "copy.svg"
+    copy.write_bytes(svg_file.read_bytes())
+    assert fig.add_artwork(copy, (1, 6, 9, 9)).artwork is placed.artwork
+
+    def parse(data, name):
+        raise AssertionError("the artwork was parsed again")
+
+    monkeypatch.setattr(artwork, "parse_artwork", parse)
+    fig.export_bytes("png")
+    fig.export_bytes("pdf")
+    assert artwork.load_artwork(svg_file) is placed.artwork
+    assert artwork.cache_info() == (2, 1, 1)
+    monkeypatch.undo()
+
+    # A changed file is parsed again, and the old content forgotten when unused
+    svg_file.write_text(SVG.replace("#ff0000", "#00ff00"))
+    stat = os.stat(svg_file)
+    os.utime(svg_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    changed = artwork.load_artwork(svg_file)
+    assert changed.digest != placed.artwork.digest
+    np.testing.assert_allclose(changed.facecolors[0], (0, 1, 0, 1))
+    assert artwork.cache_info()[2] == 2  # the copy still has the old content
+
+
+def test_cache_size(svg_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(artwork, "CACHE_SIZE", 2)
+    paths = []
+    for color in ("#00ff00", "#0000ff", "#ffff00"):
+        path = tmp_path / f"{color[1:]}.svg"
+        path.write_text(SVG.replace("#ff0000", color))
+        paths.append(path)
+    first = artwork.load_artwork(paths[0])
+    for path in paths[1:]:
+        artwork.load_artwork(path)
+    assert artwork.cache_info() == (0, 3, 2)
+    # The least recently used artwork was dropped and is parsed again
+    assert artwork.load_artwork(paths[2]) is not None
+    assert artwork.cache_info()[:2] == (1, 3)
+    again = artwork.load_artwork(paths[0])
+    assert again is not first
+    assert again.digest == first.digest
+    assert artwork.cache_info() == (1, 4, 2)
+
+
+def test_panel_artwork(svg_file):
+    fig = scilayout.Figure()
+    fig.set_size_cm(12, 8)
+    ax = fig.add_panel((1, 1, 5, 5))
+    placed = ax.add_vector_artwork(svg_file)
+    assert placed in ax.collections
+    assert placed.get_location() == pytest.approx((1, 1, 5, 5))
+    fig.canvas.draw()
+    widths = placed.get_linewidths().copy()
+    # Follows the panel, stroke widths are scaled with the artwork
+    ax.set_location((1, 1, 9, 5))
+    fig.canvas.draw()
+    np.testing.assert_allclose(placed.get_linewidths(), 2 * widths)
+    extent = placed.get_window_extent()
+    corner = (fig.transCM + fig.transFigure).transform([(1, 1)])[0]
+    assert extent.x0 == pytest.approx(corner[0])
+    assert extent.y1 == pytest.approx(corner[1])
+    assert extent.height == pytest.approx(4 / 2.54 * fig.dpi)  # fitted to the height
+    with pytest.raises(ValueError, match="set the location of the panel"):
+        placed.set_location((0, 0, 1, 1))
+
+
+def test_invalid(svg_file, tmp_path):
+    fig = scilayout.Figure()
+    with pytest.raises(ValueError, match="x0 must be less than x1"):
+        fig.add_artwork(svg_file, (4, 1, 1, 5))
+    path = tmp_path / "notes.txt"
+    path.write_text("not artwork")
+    with pytest.raises(ValueError, match="is not an svg or pdf file"):
+        fig.add_artwork(path, (1, 1, 4, 5))
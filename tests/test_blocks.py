@@ -0,0 +1,180 @@
+"""Tests for sub-figures embedded as pre-rendered blocks."""
+
+import re
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import scilayout
+from scilayout import artwork, blocks
+
+DPI = 300
+
+
+@pytest.fixture
+def source():
+    """A standalone 6 x 4 cm figure of images, lines, markers and a scatter plot."""
+    fig = scilayout.Figure()
+    fig.set_size_cm(6, 4)
+    rng = np.random.default_rng(0)
+    ax = fig.add_panel((0.5, 0.5, 2.8, 3.5))
+    ax.imshow(rng.random((8, 8)), interpolation="none")
+    ax.set_axis_off()
+    ax = fig.add_panel((3.3, 0.5, 5.8, 3.5))
+    ax.imshow(rng.random((60, 60)), cmap="magma")
+    ax.plot(rng.random(20) * 60, "o--", color="w", lw=2)
+    ax.scatter(rng.random(50) * 60, rng.random(50) * 60, c=rng.random(50), s=20)
+    ax.set_axis_off()
+    return fig
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    blocks.clear_cache()
+
+
+def render(fig, dpi=DPI):
+    return np.asarray(fig.export_bytes("rgba", dpi=dpi)).astype(int)
+
+
+def assert_similar(image, expected):
+    """Images match, except for antialiased edges and resampling."""
+    assert image.shape == expected.shape
+    difference = np.abs(image - expected)
+    assert difference.mean() < 1
+    assert np.count_nonzero(difference > 40) < 5e-3 * difference.size
+
+
+def test_raster_matches_source(source):
+    fig = scilayout.Figure()
+    fig.set_size_cm(14, 6)
+    fig.add_subfigure_block(source, (1, 1, 4, 5))  # fitted at half size
+
+    # At twice the capture dpi, so that images are copied without resampling
+    expected = render(source, DPI)
+    offset = round(2 * DPI / 2.54)
+    height, width = expected.shape[:2]
+    region = render(fig, 2 * DPI)[offset : offset + height, offset : offset + width]
+    assert_similar(region, expected)
+
+
+def test_source_is_not_redrawn(source, monkeypatch):
+    title = source.axes[1].set_title("Inset title")
+    fig = scilayout.Figure()
+    fig.set_size_cm(14, 6)
+    block = fig.add_subfigure_block(source, (1, 1, 7, 5))
+    block.set_gid("inset")
+
+    def draw(renderer):
+        raise AssertionError("the source figure was drawn")
+
+    monkeypatch.setattr(source, "draw", draw)
+    fig.export_bytes("png")
+    fig.export_bytes("png")
+    hits, misses, size = blocks.cache_info()
+    assert (misses, size) == (1, 1)  # rendered once, then copied
+    assert hits == 3  # tight bounding boxes draw each export twice
+
+    svg = bytes(fig.export_bytes("svg")).decode()
+    group = re.search(r'<g id="inset">.*', svg, re.DOTALL).group()
+    assert title.get_text() in group
+    assert bytes(fig.export_bytes("pdf")).startswith(b"%PDF")
+    assert blocks.cache_info()[2] == 1  # vector output does not rasterize
+
+
+def test_raster_mode(source):
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 6)
+    fig.add_subfigure_block(source, (1, 1, 7, 5), mode="raster")
+    svg = bytes(fig.export_bytes("svg", dpi=150)).decode()
+    assert svg.count("<image") == 1
+    assert blocks.cache_info()[2] == 1
+    with pytest.raises(ValueError, match="Mode must be one of"):
+        fig.add_subfigure_block(source, (1, 1, 7, 5), mode="vector")
+
+
+def test_content_hash(source):
+    fig = scilayout.Figure()
+    block = fig.add_subfigure_block(source, (1, 1, 7, 5))
+    digest = block.digest
+    assert fig.add_subfigure_block(source, (0, 0, 3, 2)).digest == digest
+    block.refresh()
+    assert block.digest == digest
+
+    source.axes[0].plot([0, 7], [0, 7], color="r")
+    block.refresh()
+    assert block.digest != digest
+
+
+def test_image_file(source, tmp_path):
+    path = tmp_path / "source.png"
+    source.export(path, dpi=DPI, transparent_png=False)
+    fig = scilayout.Figure()
+    fig.set_size_cm(14, 6)
+    block = fig.add_subfigure_block(path, (1, 1, 7, 5))
+
+    exported = np.asarray(Image.open(path).convert("RGBA"))
+    extent = block.get_window_extent()
+    # Fitted to the aspect ratio of the cropped export
+    assert extent.width / extent.height == pytest.approx(
+        exported.shape[1] / exported.shape[0],
+    )
+    image = render(fig, fig.dpi)
+    top = image.shape[0] - extent.y1
+    region = image[
+        round(top) : round(top + extent.height), round(extent.x0) : round(extent.x1)
+    ]
+    resized = Image.fromarray(exported).resize(region.shape[1::-1])
+    assert np.abs(region - np.asarray(resized)).mean() < 8
+
+    # A changed file is read again
+    digest = block.digest
+    source.export(path, dpi=DPI / 2, transparent_png=False)
+    fig.export_bytes("png")
+    assert block.digest != digest
+
+
+def test_location(source, tmp_path):
+    fig = scilayout.Figure()
+    fig.set_size_cm(14, 6)
+    block = fig.add_subfigure_block(source, (1, 1, 3, 4), method="size")
+    assert block.get_location() == (1, 1, 4, 5)
+    extent = block.get_window_extent()
+    assert extent.width / extent.height == pytest.approx(1.5)
+    assert extent.width == pytest.approx(3 / 2.54 * fig.dpi)  # fitted to the width
+
+    with pytest.raises(ValueError, match="x0 must be less than x1"):
+        block.set_location((4, 1, 1, 5))
+    path = tmp_path / "notes.txt"
+    path.write_text("not an image")
+    with pytest.raises(ValueError, match="not a raster image"):
+        fig.add_subfigure_block(path, (1, 1, 4, 5))
+
+
+@pytest.mark.parametrize("suffix", ["svg", "pdf"])
+def test_vector_file(tmp_path, suffix):
+    source = scilayout.Figure()
+    source.set_size_cm(6, 4)
+    ax = source.add_panel((0.5, 0.5, 5.5, 3.5))
+    ax.plot([0, 1, 2], [0, 1, 0], color="tab:red", lw=4)
+    ax.fill_between([0, 2], 0, 0.5, color="tab:blue", alpha=0.5)
+    ax.set_axis_off()
+    path = tmp_path / f"source.{suffix}"
+    source.savefig(path)
+
+    fig = scilayout.Figure()
+    fig.set_size_cm(14, 6)
+    block = fig.add_subfigure_block(path, (1, 1, 13, 5))
+    assert block.digest == artwork.load_artwork(path).digest
+    extent = block.get_window_extent()
+    assert extent.width / extent.height == pytest.approx(1.5)
+    svg = bytes(fig.export_bytes("svg")).decode()
+    assert "<image" not in svg  # replayed as paths
+
+    # Drawn like the source at the same size
+    expected = render(source, 150)
+    offset = round(150 / 2.54)
+    height, width = expected.shape[:2]
+    region = render(fig, 150)[offset : offset + height, offset : offset + width]
+    assert np.abs(region - expected).mean() < 2
@@ -0,0 +1,132 @@
+"""Tests for plotting large datasets with decimation and binning."""
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout import dense
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 10, 100_000)
+    y = np.sin(x) + rng.normal(scale=0.1, size=len(x))
+    return x, y
+
+
+@pytest.fixture(params=[dense.CHUNK_SIZE, 1000])
+def chunk_size(request, monkeypatch):
+    """Run with the default chunks and with many small chunks."""
+    monkeypatch.setattr(dense, "CHUNK_SIZE", request.param)
+    return request.param
+
+
+def test_decimate_minmax(signal, chunk_size):
+    x, y = signal
+    n_columns = 100
+    x_out, y_out = dense.decimate_minmax(x, y, (0, 10), n_columns)
+    assert len(x_out) == 2 * n_columns
+    columns = np.minimum((x / 10 * n_columns).astype(int), n_columns - 1)
+    expected_min = [y[columns == c].min() for c in range(n_columns)]
+    expected_max = [y[columns == c].max() for c in range(n_columns)]
+    np.testing.assert_array_equal(y_out[0::2], expected_min)
+    np.testing.assert_array_equal(y_out[1::2], expected_max)
+    np.testing.assert_allclose(x_out[0::2], (np.arange(n_columns) + 0.5) / 10)
+
+
+def test_decimate_minmax_keeps_neighbours(signal):
+    x, y = signal
+    x_out, y_out = dense.decimate_minmax(x, y, (2, 3), 10)
+    # One point either side of the limits, so the line runs off the panel
+    assert x_out[0] < 2 < x_out[1]
+    assert x_out[-2] < 3 < x_out[-1]
+    assert y_out[0] == y[np.searchsorted(x, 2) - 1]
+    assert len(x_out) == 2 * 10 + 2
+
+
+def test_bin_counts(signal, chunk_size):
+    x, y = signal
+    counts = dense.bin_counts(x, y, (0, 10, -1.5, 1.5), (30, 40))
+    expected, _, _ = np.histogram2d(y, x, bins=(30, 40), range=((-1.5, 1.5), (0, 10)))
+    # Points on the right and top edges are outside the bins rather than in the last
+    assert np.abs(counts - expected).sum() <= 2
+    assert counts.shape == (30, 40)
+
+
+def test_plot_dense(signal, tmp_path):
+    x, y = signal
+    np.save(tmp_path / "x.npy", x)
+    np.save(tmp_path / "y.npy", y)
+    x = np.load(tmp_path / "x.npy", mmap_mode="r")
+    y = np.load(tmp_path / "y.npy", mmap_mode="r")
+
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    ax = fig.add_panel((1, 1, 5.5, 4))  # 4.5 cm wide
+    line = ax.plot_dense(x, y)
+    assert ax.get_xlim()[0] <= 0
+    assert ax.get_xlim()[1] >= 10
+    assert ax.get_ylim()[0] <= y.min()
+    assert ax.get_ylim()[1] >= y.max()
+
+    ax.set_xlim(0, 10)
+    fig.export_bytes("png", dpi=254)  # 10 px per mm
+    assert len(line.get_xdata()) == 2 * 450
+
+    # Recomputed when the limits change
+    ax.set_xlim(2, 3)
+    fig.export_bytes("png", dpi=254)
+    assert line.get_xdata()[1] >= 2
+    assert line.get_xdata()[-2] <= 3
+    assert len(line.get_xdata()) == 2 * 450 + 2
+
+    # Vector formats use the export dpi too
+    fig.export_bytes("pdf", dpi=127)
+    assert len(line.get_xdata()) == 2 * 225 + 2
+
+
+def test_plot_dense_requires_sorted_x():
+    fig = scilayout.Figure()
+    ax = fig.add_panel((1, 1, 5, 4))
+    with pytest.raises(ValueError, match="ascending"):
+        ax.plot_dense(np.array([0, 2, 1]), np.array([0, 1, 2]))
+
+
+def test_scatter_dense(signal):
+    x, y = signal
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    ax = fig.add_panel((1, 1, 5.5, 4))
+    image = ax.scatter_dense(x, y, pixels_per_bin=2)
+    assert ax.get_xlim()[1] >= 10
+    assert ax.get_ylim()[0] <= y.min()
+
+    fig.export_bytes("png", dpi=254)
+    counts = image.get_array()
+    assert counts.shape == (150, 225)
+    assert counts.sum() == len(x)
+    # Empty bins are transparent
+    assert np.ma.count_masked(counts) > 0
+
+
+def test_scatter_dense_log_axes():
+    rng = np.random.default_rng(0)
+    x = 10 ** rng.uniform(0, 3, 200_000)
+    y = rng.uniform(0, 1, len(x))
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    ax = fig.add_panel((1, 1, 5.5, 4))
+    image = ax.scatter_dense(x, y, pixels_per_bin=5)
+    ax.set_xlim(1, 1000)
+    ax.set_ylim(0, 1)
+    fig.export_bytes("png", dpi=100)
+    linear = image.get_array().filled(0).sum(axis=0)
+    assert linear[0] > 10 * linear[-1]
+
+    # Binned evenly on the log axis, so uniform in log10 fills every column alike
+    ax.set_xscale("log")
+    fig.export_bytes("png", dpi=100)
+    columns = image.get_array().filled(0).sum(axis=0)
+    assert columns.sum() == len(x)
+    np.testing.assert_allclose(columns, columns.mean(), rtol=0.15)
@@ -0,0 +1,92 @@
+"""Check that savefigure output is byte-for-byte reproducible."""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from matplotlib.pyplot import close
+
+import scilayout
+from scilayout.base import savefigure
+
+FORMATS = [".pdf", ".eps", ".svg", ".png"]
+
+# Builds and saves a figure, run in separate processes to catch per-process randomness
+SCRIPT = """
+import sys
+
+import numpy as np
+
+import scilayout
+from scilayout.base import savefigure
+
+fig = scilayout.figure()
+fig.set_size_cm(10, 8)
+ax = fig.add_panel((1.5, 1, 8, 6), panellabel="a")
+ax.plot(np.sin(np.linspace(0, 10, 200)), label="sine")
+ax.imshow(np.arange(16).reshape(4, 4), extent=(0, 50, -1, 1), aspect="auto")
+ax.set_title("Reproducible")
+ax.legend()
+savefigure(fig, sys.argv[1])
+"""
+
+
+def build_figure() -> scilayout.classes.SciFigure:
+    fig = scilayout.figure()
+    fig.set_size_cm(10, 8)
+    ax = fig.add_panel((1.5, 1, 8, 6), panellabel="a")
+    ax.plot(np.sin(np.linspace(0, 10, 200)), label="sine")
+    ax.scatter([10, 20, 30], [0.5, -0.5, 0], clip_on=True)
+    ax.imshow(np.arange(16).reshape(4, 4), extent=(0, 50, -1, 1), aspect="auto")
+    ax.set_title("Reproducible")
+    ax.legend()
+    return fig
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_same_figure_twice(fmt, tmp_path):
+    fig = build_figure()
+    savefigure(fig, tmp_path / f"first{fmt}")
+    savefigure(fig, tmp_path / f"second{fmt}")
+    close(fig)
+    assert (tmp_path / f"first{fmt}").read_bytes() == (
+        tmp_path / f"second{fmt}"
+    ).read_bytes()
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_rebuilt_figure(fmt, tmp_path):
+    outputs = []
+    for n in range(2):
+        fig = build_figure()
+        savefigure(fig, tmp_path / f"{n}{fmt}")
+        close(fig)
+        outputs.append((tmp_path / f"{n}{fmt}").read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_separate_processes(fmt, tmp_path):
+    outputs = []
+    for n in range(2):
+        path = tmp_path / f"{n}{fmt}"
+        subprocess.run(
+            [sys.executable, "-c", SCRIPT, str(path)],
+            check=True,
+            env={**os.environ, "MPLBACKEND": "Agg"},
+        )
+        outputs.append(path.read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+def test_no_volatile_metadata(tmp_path):
+    fig = build_figure()
+    savefigure(fig, tmp_path / "figure.svg")
+    savefigure(fig, tmp_path / "figure.png")
+    close(fig)
+    svg = (tmp_path / "figure.svg").read_text()
+    assert "<dc:date>" not in svg
+    assert "Matplotlib v" not in svg
+    assert b"Software" not in (tmp_path / "figure.png").read_bytes()
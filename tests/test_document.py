@@ -0,0 +1,64 @@
+"""Tests for multi-page document export."""
+
+import re
+
+import matplotlib.pyplot as plt
+
+import scilayout
+
+
+def make_page(n):
+    fig = scilayout.figure()
+    fig.set_size_cm(8, 6)
+    ax = fig.add_panel((1.5, 1, 7, 5), panellabel="abcdefgh"[n % 8])
+    ax.plot(range(n + 2))
+    ax.set_xlabel(f"Page {n}")
+    return fig
+
+
+def count_pages(data):
+    return len(re.findall(rb"/Type /Page\b", data))
+
+
+def test_export_document(tmp_path):
+    path = tmp_path / "document.pdf"
+    n_pages = scilayout.export_document((make_page(n) for n in range(5)), path)
+    assert n_pages == 5
+    data = path.read_bytes()
+    assert count_pages(data) == 5
+    # Figures are closed once written
+    assert plt.get_fignums() == []
+
+
+def test_fonts_are_shared(tmp_path):
+    path = tmp_path / "document.pdf"
+    scilayout.export_document([lambda n=n: make_page(n) for n in range(5)], path)
+    single = make_page(0).export_bytes("pdf")
+    plt.close("all")
+    document = path.read_bytes()
+    # Each font is embedded once for the whole document, not once per page
+    assert document.count(b"/FontFile") == bytes(single).count(b"/FontFile")
+    assert len(document) < 5 * len(single)
+
+
+def test_document_is_deterministic(tmp_path):
+    first, second = tmp_path / "first.pdf", tmp_path / "second.pdf"
+    scilayout.export_document([make_page(n) for n in range(3)], first)
+    scilayout.export_document([make_page(n) for n in range(3)], second)
+    assert first.read_bytes() == second.read_bytes()
+    assert b"/CreationDate" not in first.read_bytes()
+
+
+def test_parallel_pages_are_in_order(tmp_path):
+    specs = [
+        {"size": [6, 4], "panels": [{"location": [1, 1, 5, 3], "label": label}]}
+        for label in "abcd"
+    ]
+    path = tmp_path / "document.pdf"
+    assert scilayout.export_document(specs, path, workers=2) == 4
+    serial = tmp_path / "serial.pdf"
+    scilayout.export_document(
+        [lambda spec=spec: scilayout.render.build_figure(spec) for spec in specs], serial,
+    )
+    assert path.read_bytes() == serial.read_bytes()
+    assert plt.get_fignums() == []
@@ -0,0 +1,51 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from matplotlib.pyplot import close
+
+import scilayout
+from scilayout.base import savefigure
+
+
+@pytest.fixture
+def fig():
+    scifig = scilayout.figure()
+    scifig.set_size_cm(10, 5)
+    ax = scifig.add_panel((1, 1, 8, 4), panellabel="a")
+    ax.plot([0, 1, 2], [2, 0, 1])
+    yield scifig
+    close(scifig)
+
+
+class TestExportBytes:
+    @pytest.mark.parametrize(
+        ("fmt", "signature"),
+        [("png", b"\x89PNG"), ("pdf", b"%PDF"), ("svg", b"<?xml"), ("eps", b"%!PS")],
+    )
+    def test_formats(self, fig, fmt, signature):
+        data = fig.export_bytes(format=fmt)
+        assert bytes(data[: len(signature)]) == signature
+
+    def test_matches_file_export(self, fig, tmp_path):
+        fig.export(tmp_path / "figure.png")
+        assert bytes(fig.export_bytes("png")) == (tmp_path / "figure.png").read_bytes()
+
+    def test_file_object(self, fig):
+        buffer = BytesIO()
+        savefigure(fig, buffer, format="pdf")
+        assert buffer.getvalue().startswith(b"%PDF")
+
+    def test_file_object_needs_format(self, fig):
+        with pytest.raises(ValueError, match="format"):
+            savefigure(fig, BytesIO())
+
+    def test_rgba(self, fig):
+        canvas = fig.canvas
+        dpi = fig.dpi
+        pixels = np.asarray(fig.export_bytes("rgba", dpi=254))
+        # 10 x 5 cm at 100 pixels per cm
+        assert pixels.shape == (500, 1000, 4)
+        assert not pixels.flags.owndata  # a view of the renderer buffer, not a copy
+        assert fig.canvas is canvas
+        assert fig.dpi == dpi
@@ -0,0 +1,55 @@
+"""Tests for the text measurement cache."""
+
+import pytest
+
+import scilayout
+from scilayout import extents
+from scilayout.scalebars import ScaleBar
+
+
+@pytest.fixture
+def fig():
+    extents.clear_cache()
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    return fig
+
+
+@pytest.mark.parametrize("rotation", [0, 90, 30])
+def test_text_size_matches_window_extent(fig, rotation):
+    text = fig.text(0.5, 0.5, "10 µm\nline 2", size=9, rotation=rotation)
+    bbox = text.get_window_extent(fig.canvas.get_renderer())
+    assert extents.text_size(text) == pytest.approx((bbox.width, bbox.height))
+
+
+def test_repeated_text_is_cached(fig):
+    axes = [fig.add_panel((1 + 3 * n, 1, 3 + 3 * n, 4), panellabel="a") for n in range(3)]
+    sizes = [ax.panellabel.get_size() for ax in axes]
+    assert sizes[0] == sizes[1] == sizes[2]
+    info = extents.cache_info()
+    assert info.misses == 1
+    assert info.hits == 2
+
+    # Different font properties are measured separately
+    axes[0].panellabel.text.set_fontsize(20)
+    width, height = axes[0].panellabel.get_size()
+    assert width > sizes[1][0]
+    assert extents.cache_info().misses == 2
+
+
+def test_panel_label_size_in_cm(fig):
+    ax = fig.add_panel((1, 1, 4, 4), panellabel="a")
+    width, height = ax.panellabel.get_size()
+    # A 12 point letter is a few mm across
+    assert 0.1 < width < 0.5
+    assert 0.2 < height < 0.6
+
+
+def test_scalebar_moves_use_cache(fig):
+    ax = fig.add_panel((1, 1, 9, 4))
+    ax.set_xlim(0, 100)
+    scalebar = ScaleBar(ax, (10, 0.5), 20, "µm", coordSystem="data")
+    misses = extents.cache_info().misses
+    for x in range(20, 60, 10):
+        scalebar.move(x, 0.5)
+    assert extents.cache_info().misses == misses
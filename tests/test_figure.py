@@ -0,0 +1,84 @@
+"""Tests for figures created without pyplot."""
+
+import gc
+import os
+import sys
+import weakref
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import scilayout
+
+# Lower with SCILAYOUT_LEAK_FIGURES for quicker local runs
+N_FIGURES = int(os.environ.get("SCILAYOUT_LEAK_FIGURES", 10_000))
+N_WARM_UP = 500
+
+
+def _make_figure():
+    fig = scilayout.Figure()
+    fig.set_size_cm(3, 2)
+    ax = fig.add_panel((0.5, 0.5, 2.5, 1.5), panellabel="a")
+    ax.plot([0, 1, 2], [1, 0, 1])
+    ax.set_axis_off()
+    return fig
+
+
+def _rss_mb():
+    """Peak resident set size of the process in MB."""
+    import resource
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kB elsewhere
+    return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 2**10
+
+
+def test_figure_is_not_registered_with_pyplot():
+    plt.close("all")
+    fig = scilayout.Figure()
+    assert isinstance(fig, scilayout.classes.SciFigure)
+    assert fig.canvas.manager is None
+    assert plt.get_fignums() == []
+
+
+def test_figure_features_work_without_pyplot():
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    ax = fig.add_panel((1, 1, 9, 4), panellabel="a")
+    ax.plot([0, 1], [0, 1])
+    fig.grid.show()
+    fig.grid.add_line("x", 5)
+    assert np.allclose(fig.transCM.transform((1, 1)), (0.1, 0.8))
+    assert fig.export_bytes("png")[:8] == b"\x89PNG\r\n\x1a\n"
+    assert bytes(fig.export_bytes("pdf")).startswith(b"%PDF")
+    assert plt.get_fignums() == []
+
+
+def test_set_location_without_window():
+    fig = scilayout.Figure()
+    with pytest.raises(RuntimeError):
+        fig.set_location(0, 0)
+
+
+def test_figures_are_freed():
+    pytest.importorskip("resource")
+    alive = weakref.WeakSet()
+
+    for _ in range(N_WARM_UP):
+        _make_figure().export_bytes("rgba", dpi=30)
+    gc.collect()
+    rss_start = _rss_mb()
+
+    for i in range(N_FIGURES):
+        fig = _make_figure()
+        fig.export_bytes("rgba", dpi=30)
+        if i % 100 == 0:
+            alive.add(fig)
+    del fig
+    gc.collect()
+
+    assert plt.get_fignums() == []
+    assert len(alive) == 0
+    # A leak of even a few kB per figure would show up as tens of MB here
+    assert _rss_mb() - rss_start < 20
@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from matplotlib.pyplot import close
 
 import scilayout
@@ -29,4 +31,65 @@ class TestGrid(unittest.TestCase):
         pass
     
     
-    
\ No newline at end of file
+    
+
+class TestCMOverlay(unittest.TestCase):
+    def setUp(self):
+        self.fig = scilayout.Figure()
+        self.fig.set_size_cm(6.5, 4.5)
+        self.fig.add_panel((1, 1, 5, 4), panellabel="a")
+
+    def render(self):
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+    def test_drawn_on_canvas(self):
+        without = self.render()
+        self.fig.add_overlay()
+        self.assertFalse(np.array_equal(self.render(), without))
+        self.fig.remove_overlay()
+        self.assertIsNone(self.fig.cm_overlay)
+        np.testing.assert_array_equal(self.render(), without)
+
+    def test_markers_at_whole_cm(self):
+        self.fig.add_overlay()
+        image = self.render()
+        transform = self.fig.transCM + self.fig.transFigure
+        for x, y in transform.transform([(6, 1), (5.5, 2.5), (3, 3)]):
+            row = image.shape[0] - round(y)
+            self.assertLess(image[row, round(x), 0], 255)
+
+    def test_not_saved(self):
+        without = self.fig.export_bytes("png")
+        self.fig.add_overlay()
+        self.assertEqual(self.fig.export_bytes("png"), without)
+        rgba = np.asarray(self.fig.export_bytes("rgba", dpi=100)).copy()
+        self.fig.remove_overlay()
+        np.testing.assert_array_equal(self.fig.export_bytes("rgba", dpi=100), rgba)
+
+    def test_regenerated_at_whole_cm(self):
+        overlay = self.fig.add_overlay()
+        self.render()
+        positions = overlay._positions
+        self.assertEqual(len(positions[0]), 7 * 5)  # 0 to 6 cm by 0 to 4 cm
+        self.fig.set_size_cm(6.9, 4.2)
+        self.render()
+        self.assertIs(overlay._positions, positions)
+        self.fig.set_size_cm(7.0, 4.2)
+        self.render()
+        self.assertIsNot(overlay._positions, positions)
+        self.assertEqual(len(overlay._positions[0]), 8 * 5)
+
+    def test_not_in_tight_bbox(self):
+        bbox = self.fig.get_tightbbox()
+        self.fig.add_overlay()
+        np.testing.assert_allclose(self.fig.get_tightbbox().bounds, bbox.bounds)
+
+    def test_base_functions(self):
+        overlay = scilayout.base.add_cm_overlay(self.fig)
+        self.assertIsInstance(overlay, scilayout.grid.CMOverlay)
+        self.assertIn(overlay, self.fig.artists)
+        with self.assertWarns(DeprecationWarning):
+            ax, *markers = scilayout.base.add_cm_overlay_grid(self.fig)
+        self.assertEqual(ax.get_label(), "cm_overlay")
+        self.assertEqual(len(markers), 3)
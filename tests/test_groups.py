@@ -0,0 +1,130 @@
+"""Tests for groups of panels with their own cm frame."""
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout import locations
+
+
+@pytest.fixture
+def fig():
+    fig = scilayout.Figure()
+    fig.set_size_cm(20, 15)
+    return fig
+
+
+@pytest.fixture
+def block(fig):
+    """A 3 x 3 block of image panels with a colour bar and a label."""
+    block = fig.add_group(origin=(1, 1))
+    rng = np.random.default_rng(0)
+    for row in range(3):
+        for col in range(3):
+            ax = block.add_panel(
+                (col * 2.1, row * 2.1, col * 2.1 + 2, row * 2.1 + 2),
+                panellabel="abc"[col] if row == 0 else None,
+            )
+            image = ax.imshow(rng.random((5, 5)))
+    cbar = block.add_panel((6.5, 0, 6.8, 6.2))
+    fig.colorbar(image, cax=cbar)
+    block.add_text(0, -0.5, "block")
+    return block
+
+
+def drawn_locations(fig, panels):
+    """Locations of panels from where they are drawn."""
+    fig.canvas.draw()
+    to_cm = locations.InvertedCMTransform(fig)
+    points = [to_cm.transform(ax.get_position().get_points()) for ax in panels]
+    # (left, bottom), (right, top) in cm from the top left to (x0, y0, x1, y1)
+    return np.array(points).reshape(-1, 4)[:, [0, 3, 2, 1]]
+
+
+def test_panels_in_local_frame(fig, block):
+    ax = block.panels[4]
+    assert ax.get_location() == pytest.approx((3.1, 3.1, 5.1, 5.1))
+    np.testing.assert_allclose(
+        drawn_locations(fig, block.panels), fig.panels.extents[: len(block.panels)],
+    )
+
+    ax.set_location((0, 0, 1, 1), method="size")
+    assert ax.get_location() == pytest.approx((1, 1, 2, 2))
+    assert ax._local_location == pytest.approx((0, 0, 1, 1))
+
+
+def test_move_and_scale(fig, block):
+    before = fig.panels.extents.copy()
+    label = block.panels[0].panellabel
+    label_before = np.array(label.get_location())
+
+    block.translate(3, 2)
+    np.testing.assert_allclose(fig.panels.extents, before + (3, 2, 3, 2))
+    np.testing.assert_allclose(drawn_locations(fig, block.panels), fig.panels.extents)
+    assert label.get_location() == pytest.approx(label_before + (3, 2))
+    text = block.texts[0]
+    position = text.get_transform().transform(text.get_position())
+    expected = fig.transCM.transform([(4, 2.5)]) @ np.diag(fig.bbox.size)
+    assert position == pytest.approx(expected.ravel())
+
+    block.set_scale(0.5)
+    assert block.panels[1].get_location() == pytest.approx((5.05, 3, 6.05, 4))
+    np.testing.assert_allclose(drawn_locations(fig, block.panels), fig.panels.extents)
+
+
+def test_move_does_not_reposition_children(fig, block, monkeypatch):
+    calls = []
+    for ax in block.panels:
+        monkeypatch.setattr(ax, "set_position", lambda *args: calls.append(args))
+    block.set_origin(5, 5)
+    block.set_scale(2)
+    assert calls == []
+
+
+def test_nested_groups(fig):
+    outer = fig.add_group(origin=(2, 1), scale=2)
+    inner = outer.add_group(origin=(1, 1), scale=0.5)
+    ax = inner.add_panel((0, 0, 2, 2), panellabel="a")
+    assert ax.get_location() == pytest.approx((4, 3, 6, 5))
+
+    outer.translate(1, 0)
+    assert ax.get_location() == pytest.approx((5, 3, 7, 5))
+    inner.set_scale(1)
+    assert ax.get_location() == pytest.approx((5, 3, 9, 7))
+    np.testing.assert_allclose(fig.panels.extents, [(5, 3, 9, 7)])
+    np.testing.assert_allclose(drawn_locations(fig, [ax]), [(5, 3, 9, 7)])
+    assert outer.get_panels() == [ax]
+    assert outer.get_panels(nested=False) == []
+
+
+def test_scalebars_follow_panels(fig, block):
+    bars = block.add_scalebars(2, corner="lower right")
+    ends = [line.get_xydata() for line in bars.lines]
+    block.translate(4, 4)
+    assert all(
+        np.array_equal(line.get_xydata(), end) for line, end in zip(bars.lines, ends)
+    )
+
+
+def test_group_survives_figure_resize(fig, block):
+    location = block.panels[0].get_location()
+    fig.set_size_cm(30, 20)
+    assert block.panels[0].get_location() == pytest.approx(location)
+    np.testing.assert_allclose(fig.panels.extents, drawn_locations(fig, fig.panels))
+
+
+def test_remove(fig, block):
+    block.panels[0].remove()
+    assert len(block.panels) == 9
+    assert len(fig.panels) == 9
+    block.translate(1, 1)  # the removed panel is no longer in the group
+
+    block.remove()
+    assert len(fig.panels) == 0
+    assert fig.groups == []
+    assert fig.texts == []
+
+
+def test_invalid_scale(fig):
+    with pytest.raises(ValueError, match="Scale must be positive"):
+        fig.add_group(scale=0)
@@ -1,7 +1,12 @@
+from io import BytesIO
+
+import numpy as np
 import pytest
 from matplotlib.figure import Figure
 from matplotlib.pyplot import close
+from PIL import Image
 
+import scilayout
 from scilayout.locations import locationcm_to_position
 
 places = 7
@@ -57,3 +62,16 @@ class TestLocationToPosition:
         result = locationcm_to_position(fig, location)
         for res, exp in zip(result, expected_result):
             assert res == pytest.approx(exp)
+
+
+def test_cm_transform_in_tight_export():
+    """Artists placed in cm stay in place when the export is cropped."""
+    fig = scilayout.Figure()
+    fig.set_size_cm(16, 12)
+    ax = fig.add_panel((6, 4, 10, 8))
+    ax.set_axis_off()
+    transform = fig.transCM + fig.transFigure
+    fig.text(8, 6, "X", transform=transform, ha="center", va="center")
+    image = np.asarray(Image.open(BytesIO(fig.export_bytes("png", dpi=100))))
+    centre = np.argwhere(image[..., 3] > 0).mean(axis=0)
+    assert centre == pytest.approx(np.array(image.shape[:2]) / 2, abs=5)
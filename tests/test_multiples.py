@@ -0,0 +1,101 @@
+"""Tests for rendering one layout for many datasets."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import scilayout
+
+
+def layout():
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 4)
+    fig.add_panel((1, 0.5, 3.5, 3.5), panellabel="a")
+    fig.add_panel((4.5, 0.5, 7.5, 3.5), panellabel="b")
+    return fig
+
+
+def plot(fig, data, artists):
+    ax_a, ax_b = fig.get_axes()
+    if artists is None:
+        return ax_a.plot(data["trace"])[0], ax_b.imshow(data["image"], vmin=0, vmax=1)
+    line, image = artists
+    line.set_ydata(data["trace"])
+    ax_a.relim()
+    ax_a.autoscale_view()
+    image.set_array(data["image"])
+    return artists
+
+
+def datasets(n, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield {"trace": rng.random(50), "image": rng.random((8, 8))}
+
+
+def test_small_multiples(tmp_path):
+    calls = []
+
+    def counting_layout():
+        calls.append(1)
+        return layout()
+
+    pattern = str(tmp_path / "subject_{index:02d}.png")
+    n_exported = scilayout.small_multiples(
+        counting_layout, datasets(5), plot, pattern, dpi=50,
+    )
+    assert n_exported == 5
+    assert len(calls) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"subject_{n:02d}.png" for n in range(5)
+    ]
+    assert plt.get_fignums() == []
+
+
+def test_matches_figures_built_from_scratch(tmp_path):
+    scilayout.small_multiples(layout, datasets(3), plot, str(tmp_path / "{}.svg"))
+    for n, data in enumerate(datasets(3)):
+        fig = layout()
+        plot(fig, data, None)
+        assert (tmp_path / f"{n}.svg").read_bytes() == bytes(fig.export_bytes("svg"))
+
+
+class Dataset(dict):
+    """A dataset that counts how many datasets are alive at once."""
+
+    alive = 0
+    max_alive = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        Dataset.alive += 1
+        Dataset.max_alive = max(Dataset.max_alive, Dataset.alive)
+
+    def __del__(self):
+        Dataset.alive -= 1
+
+
+def test_memory_does_not_grow(tmp_path):
+    sizes = []
+
+    def plot_and_count(fig, data, artists):
+        artists = plot(fig, data, artists)
+        sizes.append(sum(len(ax.get_children()) for ax in fig.get_axes()))
+        return artists
+
+    Dataset.max_alive = 0
+    scilayout.small_multiples(
+        layout,
+        (Dataset(**data) for data in datasets(50)),
+        plot_and_count,
+        str(tmp_path / "{}.png"),
+        dpi=20,
+    )
+    # Datasets are loaded one at a time and no artists pile up in the figure
+    assert Dataset.max_alive <= 2
+    assert len(set(sizes)) == 1
+
+
+def test_workers(tmp_path):
+    pattern = str(tmp_path / "subject_{index}.png")
+    assert scilayout.small_multiples(layout, datasets(6), plot, pattern, workers=2) == 6
+    assert len(list(tmp_path.iterdir())) == 6
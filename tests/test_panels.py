@@ -0,0 +1,142 @@
+"""Tests for the panel registry of figures."""
+
+import numpy as np
+import pytest
+
+import scilayout
+
+
+@pytest.fixture
+def fig():
+    """A 3 x 3 grid of 5 x 4 cm panels."""
+    fig = scilayout.Figure()
+    fig.set_size_cm(20, 15)
+    for row in range(3):
+        for col in range(3):
+            fig.add_panel(
+                (1 + 6 * col, 1 + 4.5 * row, 6 + 6 * col, 5 + 4.5 * row),
+                panellabel=f"{row}{col}",
+            )
+    return fig
+
+
+def locations(fig):
+    return np.array([ax.get_location() for ax in fig.panels])
+
+
+def test_registers_panels_only(fig):
+    fig.grid.show()
+    fig.add_overlay()
+    assert len(fig.panels) == 9
+    assert len(fig.get_axes()) > 9
+    assert all(ax in fig.get_axes() for ax in fig.panels)
+    np.testing.assert_allclose(fig.panels.extents, locations(fig))
+    with pytest.raises(ValueError, match="read-only"):
+        fig.panels.extents[0, 0] = 3
+
+
+def test_follows_the_figure(fig):
+    ax = fig.panels[4]
+    ax.set_location((2, 3, 4, 5), method="size")
+    row = fig.panels.index(ax)
+    np.testing.assert_array_equal(fig.panels.extents[row], (2, 3, 6, 8))
+
+    ax.remove()
+    assert len(fig.panels) == 8
+    assert ax not in fig.panels
+    np.testing.assert_allclose(fig.panels.extents, locations(fig))
+
+    fig.set_size_cm(10, 30)
+    np.testing.assert_allclose(fig.panels.extents, locations(fig))
+    assert fig.panels.extents[0].tolist() == pytest.approx([0.5, 2, 3, 10])
+
+    fig.clear()
+    assert len(fig.panels) == 0
+
+
+def test_queries(fig):
+    extents = fig.panels.extents
+    left_column = fig.panels[extents[:, 0] < 5]
+    assert [ax.panellabel.text.get_text() for ax in left_column] == ["00", "10", "20"]
+
+    assert fig.panels.in_region((0, 9, 20, 15)).sum() == 6
+    assert fig.panels.in_region((0, 9, 20, 15), within=True).sum() == 3
+    assert fig.panels[fig.panels.in_region((6.5, 5.5, 6.8, 5.8))] == []
+    with pytest.raises(ValueError, match="one element per panel"):
+        fig.panels[np.ones(3, dtype=bool)]
+
+
+def test_moves_match_set_location(fig):
+    right = fig.panels.extents[:, 2] > 15
+    before = fig.panels.extents.copy()
+    fig.panels.translate(0.5, -0.25, panels=right)
+    expected = before + np.where(right[:, None], (0.5, -0.25, 0.5, -0.25), 0)
+    np.testing.assert_allclose(fig.panels.extents, expected)
+    np.testing.assert_allclose(locations(fig), expected)
+
+    fig.panels.scale(0.5, origin=(1, 1))
+    np.testing.assert_allclose(fig.panels.extents, 1 + (expected - 1) * 0.5)
+    np.testing.assert_allclose(locations(fig), fig.panels.extents)
+
+    # The panel labels move with their panels
+    ax = fig.panels[0]
+    x0, y0, _, _ = ax.get_location()
+    offset = (ax.panellabel.xoffset, ax.panellabel.yoffset)
+    assert ax.panellabel.get_location() == pytest.approx(np.add((x0, y0), offset))
+
+
+def test_align(fig):
+    fig.panels[3].set_location((1.5, 5, 6, 9))
+    fig.panels.align("left", panels=fig.panels.extents[:, 0] < 5)
+    assert fig.panels.extents[[0, 3, 6], 0].tolist() == [1, 1, 1]
+    assert fig.panels.extents[3, 2] == 5.5  # the width is kept
+
+    fig.panels.align("vcentre", panels=[fig.panels[0], 1], value=10)
+    centres = fig.panels.extents[:2, [1, 3]].mean(axis=1)
+    assert centres.tolist() == [10, 10]
+    np.testing.assert_allclose(locations(fig), fig.panels.extents)
+    with pytest.raises(ValueError, match="Edge must be one of"):
+        fig.panels.align("middle")
+
+
+def test_hit_testing(fig):
+    assert fig.panels.panel_at(3, 3) is fig.panels[0]
+    assert fig.panels.panel_at(6.5, 3) is None
+    assert fig.panels.panel_at(-1, 3) is None
+
+    # Where panels overlap, the one drawn on top is found
+    inset = fig.add_panel((4, 3, 8, 6))
+    assert fig.panels.panel_at(5, 4) is inset
+    inset.set_zorder(-1)
+    assert fig.panels.panel_at(5, 4) is fig.panels[0]
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 21, (2000, 2))
+    extents = fig.panels.extents
+    inside = (
+        (extents[:, 0] <= points[:, :1])
+        & (points[:, :1] <= extents[:, 2])
+        & (extents[:, 1] <= points[:, 1:])
+        & (points[:, 1:] <= extents[:, 3])
+    )
+    rows = fig.panels.rows_at(points)
+    np.testing.assert_array_equal(rows >= 0, inside.any(axis=1))
+    assert inside[rows >= 0, rows[rows >= 0]].all()
+
+    # The index follows moves
+    fig.panels.translate(10, 10, panels=[inset])
+    assert fig.panels.panel_at(16, 15) is inset
+
+
+def test_hit_testing_follows_zorder(fig):
+    inset = fig.add_panel((4, 3, 8, 6))
+    assert fig.panels.panel_at(5, 4) is inset
+    zorders = fig.panels._zorders
+    assert fig.panels.panel_at(3, 3) is fig.panels[0]
+    assert fig.panels._zorders is zorders  # not looked up again for every point
+
+    # Changed after the index is built
+    fig.panels[0].set_zorder(inset.get_zorder() + 1)
+    assert fig.panels.panel_at(5, 4) is fig.panels[0]
+    inset.set_zorder(fig.panels[0].get_zorder() + 1)
+    assert fig.panels.panel_at(5, 4) is inset
@@ -0,0 +1,64 @@
+import matplotlib.pyplot as plt
+import pytest
+
+import scilayout
+from scilayout.pool import FigurePool
+
+
+def layout():
+    fig = scilayout.figure()
+    fig.set_size_cm(12, 6)
+    ax = fig.add_panel((1, 1, 5, 5), panellabel="a")
+    ax.set_xlabel("Time (s)")
+    ax.set_xticks([0, 5, 10])
+    fig.add_panel((7, 1, 11, 5), panellabel="b")
+    return fig
+
+
+@pytest.fixture
+def pool():
+    pool = FigurePool(maxsize=2)
+    yield pool
+    pool.clear()
+    plt.close("all")
+
+
+class TestFigurePool:
+    def test_reuse(self, pool):
+        with pool.figure("two", layout) as fig:
+            ax = fig.get_axes()[0]
+            ax.plot([0, 10], [0, 1])
+            ax.scatter([1, 2], [1, 2])
+            ax.text(1, 1, "note")
+            ax.legend(["line"])
+        with pool.figure("two", layout) as reused:
+            assert reused is fig
+            assert len(ax.lines) == 0
+            assert len(ax.collections) == 0
+            assert ax.get_legend() is None
+            # Layout, labels and ticks are kept
+            assert ax.get_location() == pytest.approx((1, 1, 5, 5))
+            assert ax.get_xlabel() == "Time (s)"
+            assert list(ax.get_xticks()) == [0, 5, 10]
+            assert [text.get_text() for text in ax.texts] == ["a"]
+            assert ax.panellabel.text.get_text() == "a"
+
+    def test_colour_cycle_restarts(self, pool):
+        with pool.figure("two", layout) as fig:
+            first = fig.get_axes()[0].plot([0, 1])[0].get_color()
+        with pool.figure("two", layout) as fig:
+            assert fig.get_axes()[0].plot([0, 1])[0].get_color() == first
+
+    def test_separate_figures_while_borrowed(self, pool):
+        with pool.figure("two", layout) as fig, pool.figure("two", layout) as other:
+            assert other is not fig
+        assert len(pool) == 2
+
+    def test_lru_eviction(self, pool):
+        figures = {}
+        for key in ["a", "b", "c"]:
+            with pool.figure(key, layout) as fig:
+                figures[key] = fig
+        assert len(pool) == 2
+        assert not plt.fignum_exists(figures["a"].number)
+        assert plt.fignum_exists(figures["c"].number)
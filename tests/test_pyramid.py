@@ -0,0 +1,83 @@
+"""Tests for exporting several resolutions from a single render."""
+
+import math
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import scilayout
+from scilayout import base
+
+
+@pytest.fixture
+def fig():
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 5)
+    ax = fig.add_panel((1, 0.5, 7, 4.5), panellabel="a")
+    ax.plot(np.sin(np.linspace(0, 10, 500)))
+    return fig
+
+
+def test_rendered_once(fig, tmp_path, monkeypatch):
+    calls = []
+    savefigure = base.savefigure
+
+    def counting_savefigure(*args, **kwargs):
+        calls.append(kwargs["dpi"])
+        savefigure(*args, **kwargs)
+
+    monkeypatch.setattr(base, "savefigure", counting_savefigure)
+    paths = fig.export_pyramid(str(tmp_path / "figure_{dpi}.png"), dpis=(72, 300, 150))
+    assert calls == [300]
+    assert [path.name for path in paths] == [
+        "figure_300.png", "figure_150.png", "figure_72.png",
+    ]
+
+
+def test_matches_savefigure(fig, tmp_path):
+    fig.export_pyramid(str(tmp_path / "figure_{dpi}.png"), dpis=(100, 300))
+    direct = BytesIO()
+    base.savefigure(fig, direct, dpi=300, format="png")
+    assert (tmp_path / "figure_300.png").read_bytes() == direct.getvalue()
+
+    # The downsampled image is the size of a direct render, give or take rounding
+    direct = BytesIO()
+    base.savefigure(fig, direct, dpi=100, format="png")
+    with Image.open(direct) as expected, Image.open(tmp_path / "figure_100.png") as image:
+        assert image.mode == "RGBA"
+        assert image.info["dpi"] == pytest.approx((100, 100), abs=0.01)
+        assert np.allclose(image.size, expected.size, atol=2)
+
+
+def test_thumbnail(fig, tmp_path):
+    paths = fig.export_pyramid(
+        str(tmp_path / "figure_{dpi}.png"), dpis=(300,), thumbnail=64,
+    )
+    assert paths[-1].name == "figure_thumbnail.png"
+    with Image.open(paths[-1]) as image:
+        assert max(image.size) == 64
+
+
+def test_deepzoom(fig, tmp_path):
+    fig.export_pyramid(
+        str(tmp_path / "figure_{dpi}.png"),
+        dpis=(300,),
+        deepzoom=tmp_path / "figure.dzi",
+        tile_size=128,
+    )
+    with Image.open(tmp_path / "figure_300.png") as image:
+        width, height = image.size
+    assert f'Width="{width}" Height="{height}"' in (tmp_path / "figure.dzi").read_text()
+
+    levels = sorted(
+        int(level.name) for level in (tmp_path / "figure_files").iterdir()
+    )
+    assert levels == list(range(math.ceil(math.log2(max(width, height))) + 1))
+    top = tmp_path / "figure_files" / str(levels[-1])
+    assert len(list(top.iterdir())) == math.ceil(width / 128) * math.ceil(height / 128)
+    with Image.open(top / "0_0.png") as tile:
+        assert tile.size == (129, 129)  # with the overlap on the right and bottom
+    with Image.open(tmp_path / "figure_files" / "0" / "0_0.png") as tile:
+        assert tile.size == (1, 1)
@@ -0,0 +1,112 @@
+"""Tests for incremental panel rasters."""
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout.raster import PanelRaster
+
+DPI = 100
+
+
+@pytest.fixture
+def dashboard():
+    """A figure with a grid of panels, each with a line."""
+    fig = scilayout.Figure()
+    fig.set_size_cm(20, 12)
+    rng = np.random.default_rng(0)
+    axes, lines = [], []
+    for row in range(3):
+        for col in range(3):
+            ax = fig.add_panel(
+                (1.5 + col * 6.5, 1 + row * 3.8, 6 + col * 6.5, 3.5 + row * 3.8),
+                panellabel=f"{row}{col}",
+            )
+            lines.append(ax.plot(rng.random(20))[0])
+            axes.append(ax)
+    return fig, axes, lines
+
+
+def full_render(fig):
+    return np.asarray(fig.export_bytes("rgba", dpi=DPI))
+
+
+def assert_same_image(image, expected):
+    """Images match, up to rounding of antialiased edges in the shifted regions."""
+    assert image.shape == expected.shape
+    difference = np.abs(image.astype(int) - expected)
+    assert difference.max() <= 2
+    assert np.count_nonzero(difference) < 1e-3 * difference.size
+
+
+def test_render_matches_full_render(dashboard):
+    fig, _, _ = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    np.testing.assert_array_equal(raster.render(), full_render(fig))
+
+
+def test_update_matches_full_render(dashboard):
+    fig, axes, lines = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    raster.render()
+
+    lines[4].set_ydata(np.linspace(0, 5, 20))
+    axes[4].relim()
+    axes[4].autoscale_view()  # changes the tick labels as well
+    axes[4].set_ylabel("a long label")
+    assert_same_image(raster.update(axes[4]), full_render(fig))
+
+    # Content that is removed is cleared from the raster
+    axes[4].set_ylabel("")
+    assert_same_image(raster.update(axes[4]), full_render(fig))
+
+
+def test_update_only_changes_panel_region(dashboard):
+    fig, axes, lines = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    before = raster.render().copy()
+
+    lines[0].set_color("red")
+    after = raster.update(axes[0])
+    changed_rows, changed_cols = np.nonzero(np.any(before != after, axis=-1))
+    assert len(changed_rows) > 0
+
+    # Everything that changed is within the panel's extent (top left of the figure)
+    height, width = after.shape[:2]
+    assert changed_cols.max() < width / 3
+    assert changed_rows.max() < height / 3
+
+
+def test_layout_change_renders_everything(dashboard):
+    fig, axes, _ = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    raster.render()
+
+    axes[0].set_location((2, 2, 5, 4))
+    np.testing.assert_array_equal(raster.update(axes[1]), full_render(fig))
+
+    fig.set_size_cm(21, 12)
+    image = raster.update(axes[1])
+    np.testing.assert_array_equal(image, full_render(fig))
+
+
+def test_style_change_invalidates(dashboard):
+    fig, axes, _ = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    raster.render()
+    signature = raster._signature
+    try:
+        scilayout.style.params["panellabel.fontsize"] = 20
+        assert raster._layout_signature() != signature
+    finally:
+        scilayout.style.reset()
+    assert raster._layout_signature() == signature
+
+
+def test_invalidate(dashboard):
+    fig, axes, _ = dashboard
+    raster = PanelRaster(fig, dpi=DPI)
+    raster.render()
+    raster.invalidate()
+    assert raster.image is None
+    assert_same_image(raster.update(axes[0]), full_render(fig))
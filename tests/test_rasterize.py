@@ -0,0 +1,69 @@
+"""Tests for rasterizing dense artists in vector exports."""
+
+import math
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout import base
+
+N_POINTS = 20_000
+
+
+@pytest.fixture
+def dense_figure():
+    fig = scilayout.Figure()
+    fig.set_size_cm(10, 5)
+    ax = fig.add_panel((1, 1, 9, 4), panellabel="a")
+    rng = np.random.default_rng(0)
+    scatter = ax.scatter(rng.random(N_POINTS), rng.random(N_POINTS), s=1)
+    line = ax.plot([0, 1], [0, 1])[0]
+    return fig, scatter, line
+
+
+def test_artist_complexity(dense_figure):
+    _, scatter, line = dense_figure
+    assert base.artist_complexity(scatter) >= N_POINTS
+    assert base.artist_complexity(line) == 2
+    line.set_marker("o")
+    assert base.artist_complexity(line) == 4
+
+
+def test_dense_artists(dense_figure):
+    fig, scatter, line = dense_figure
+    assert base.dense_artists(fig, 1000) == [scatter]
+    assert base.dense_artists(fig, 10 * N_POINTS) == []
+    scatter.set_rasterized(True)  # already rasterized by the user
+    assert base.dense_artists(fig, 1000) == []
+
+
+@pytest.mark.parametrize("fmt", ["pdf", "svg"])
+def test_dense_artists_are_rasterized(dense_figure, fmt):
+    fig, scatter, _ = dense_figure
+    vector = fig.export_bytes(fmt, rasterize_threshold=math.inf)
+    rasterized = fig.export_bytes(fmt, rasterize_threshold=1000)
+    assert len(rasterized) < len(vector) / 2
+    # The figure itself is left as it was
+    assert not scatter.get_rasterized()
+
+
+def test_eps_is_not_rasterized(dense_figure):
+    # eps images are uncompressed, so rasterizing rarely makes them smaller
+    fig, _, _ = dense_figure
+    vector = fig.export_bytes("eps", rasterize_threshold=math.inf)
+    assert fig.export_bytes("eps", rasterize_threshold=1000) == vector
+
+
+def test_threshold_from_style(dense_figure):
+    fig, _, _ = dense_figure
+    try:
+        scilayout.style.params["export.rasterize_threshold"] = None
+        vector = fig.export_bytes("svg")
+        scilayout.style.params["export.rasterize_threshold"] = 1000
+        rasterized = fig.export_bytes("svg")
+    finally:
+        scilayout.style.reset()
+    assert len(rasterized) < len(vector) / 2
+    # Text stays as text
+    assert b">a</text>" in bytes(rasterized)
@@ -0,0 +1,163 @@
+import json
+import os
+
+import pytest
+
+from scilayout import cli, render
+
+SCRIPT = """
+import scilayout
+fig = scilayout.figure()
+fig.set_size_cm(8, 6)
+ax = fig.add_panel((1, 1, 4, 4), panellabel="a", method="size")
+ax.plot([1, 2, 3])
+"""
+
+
+@pytest.fixture
+def sources(tmp_path):
+    script = tmp_path / "script.py"
+    script.write_text(SCRIPT)
+    spec = tmp_path / "spec.json"
+    spec.write_text(
+        json.dumps(
+            {
+                "size": [10, 6],
+                "panels": [{"location": [1, 1, 4, 4], "method": "size", "label": "a"}],
+                "export": {"dpi": 100},
+            },
+        ),
+    )
+    broken = tmp_path / "broken.py"
+    broken.write_text("raise RuntimeError('broken figure')")
+    return script, spec, broken
+
+
+class TestRender:
+    def test_render_script(self, sources, tmp_path):
+        result = render.render(sources[0], tmp_path / "out", formats=["pdf", "png"])
+        assert result.ok
+        assert [path.name for path in result.outputs] == ["script.pdf", "script.png"]
+        assert all(path.exists() for path in result.outputs)
+
+    def test_render_spec(self, sources, tmp_path):
+        result = render.render(sources[1], tmp_path / "out", formats=["png"])
+        assert result.ok
+        assert result.outputs[0].name == "spec.png"
+
+    def test_build_figure(self):
+        fig = render.build_figure(
+            {"size": [10, 6], "panels": [{"location": [1, 1, 5, 4], "label": "b"}]},
+        )
+        (ax,) = fig.get_axes()
+        assert ax.get_location() == pytest.approx((1, 1, 5, 4))
+        assert ax.panellabel.text.get_text() == "b"
+        fig.close()
+
+    def test_errors_are_reported(self, sources, tmp_path):
+        result = render.render(sources[2], tmp_path / "out")
+        assert not result.ok
+        assert "broken figure" in result.error
+
+    def test_cli(self, sources, tmp_path, capsys):
+        code = cli.main(
+            [
+                "render",
+                str(sources[0]),
+                str(sources[1]),
+                "-o",
+                str(tmp_path / "out"),
+                "-j",
+                "1",
+            ],
+        )
+        assert code == 0
+        assert "Rendered 2/2 sources" in capsys.readouterr().out
+        assert (tmp_path / "out" / "spec.pdf").exists()
+
+    def test_cli_failure_exit_code(self, sources, tmp_path):
+        code = cli.main(["render", str(sources[2]), "-o", str(tmp_path), "-j", "1"])
+        assert code == 1
+
+
+DATA_SCRIPT = """
+from pathlib import Path
+
+import numpy as np
+
+import scilayout
+
+here = Path(__file__).parent
+scilayout.style.use(here / "style.json")
+fig = scilayout.figure()
+ax = fig.add_panel((1, 1, 4, 4), panellabel="a", method="size")
+ax.plot(np.loadtxt(here / "data.txt"))
+"""
+
+
+def touch(path, text):
+    """Rewrite a file and make sure its modification time moves on."""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(text)
+    os.utime(path, ns=(mtime + 1_000_000, mtime + 1_000_000))
+
+
+class TestWatch:
+    @pytest.fixture
+    def project(self, tmp_path):
+        (tmp_path / "data.txt").write_text("1\n2\n3\n")
+        (tmp_path / "style.json").write_text('{"panellabel.fontsize": 10}')
+        (tmp_path / "data_figure.py").write_text(DATA_SCRIPT)
+        (tmp_path / "other_figure.py").write_text(SCRIPT)
+        return tmp_path
+
+    def test_dependencies(self, project):
+        result = render.render(project / "data_figure.py", project / "out")
+        assert result.ok, result.error
+        assert {path.name for path in result.dependencies} == {
+            "data_figure.py",
+            "data.txt",
+            "style.json",
+        }
+
+    def test_local_modules(self, project, monkeypatch):
+        monkeypatch.setattr("sys.dont_write_bytecode", False)
+        (project / "helper.py").write_text("COLOR = 'red'\n")
+        (project / "helper_figure.py").write_text(
+            "import helper\n" + SCRIPT.replace("3])", "3], color=helper.COLOR)"),
+        )
+        watcher = render.Watcher([project / "helper_figure.py"], project / "out")
+        # The second render imports the helper from its cached bytecode
+        for _ in range(2):
+            result = render.render(project / "helper_figure.py", project / "out")
+            assert result.ok, result.error
+            assert {path.name for path in result.dependencies} == {
+                "helper_figure.py",
+                "helper.py",
+            }
+        assert list((project / "__pycache__").glob("helper.*.pyc"))
+
+        (result,) = watcher.poll()
+        pdf = (project / "out" / "helper_figure.pdf").read_bytes()
+        touch(project / "helper.py", "COLOR = 'blue'\n")
+        (result,) = watcher.poll()
+        assert result.ok, result.error
+        assert (project / "out" / "helper_figure.pdf").read_bytes() != pdf
+
+    def test_only_changed_sources_rerender(self, project):
+        watcher = render.Watcher(
+            [project / "data_figure.py", project / "other_figure.py"], project / "out",
+        )
+        assert len(watcher.poll()) == 2
+        assert watcher.poll() == []
+
+        touch(project / "data.txt", "3\n2\n1\n")
+        (result,) = watcher.poll()
+        assert result.source.name == "data_figure.py"
+        assert result.written == [project / "out" / "data_figure.pdf"]
+
+        touch(project / "style.json", '{"panellabel.fontsize": 10}')
+        (result,) = watcher.poll()
+        assert result.source.name == "data_figure.py"
+        # Same inputs give byte identical output, so the file is left alone
+        assert result.written == []
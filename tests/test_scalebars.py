@@ -0,0 +1,84 @@
+"""Tests for scalebars."""
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout.scalebars import add_scalebars
+
+
+@pytest.fixture
+def montage():
+    """A grid of image panels, 2 cm wide, showing 100 µm."""
+    fig = scilayout.Figure()
+    fig.set_size_cm(12, 12)
+    axes = []
+    for row in range(5):
+        for col in range(5):
+            ax = fig.add_panel((1 + 2 * col, 1 + 2 * row, 2.8 + 2 * col, 2.8 + 2 * row))
+            ax.imshow(np.zeros((10, 10)), extent=(0, 100, 100, 0))
+            axes.append(ax)
+    return fig, axes
+
+
+def cm_position(ax, xy):
+    """Convert data coordinates to cm from the top left of the figure."""
+    fig = ax.get_figure()
+    fraction = fig.transFigure.inverted().transform(ax.transData.transform(xy))
+    return scilayout.locations.fraction_to_cm(fig, fraction)
+
+
+def test_add_scalebars(montage):
+    fig, axes = montage
+    group = add_scalebars(axes, 50, (0.2, 0.3), unit="µm")
+    assert len(group) == 25
+    assert group.texts[0].get_text() == "50 µm"
+    for ax, line in zip(axes, group.lines):
+        x0, y0, x1, y1 = ax.get_location()
+        xs, ys = line.get_data()
+        assert abs(xs[0] - xs[1]) == pytest.approx(50)
+        # The right end of the bar is 0.2 cm from the right edge, 0.3 cm from the bottom
+        end = cm_position(ax, (max(xs), ys[0]))
+        assert end == pytest.approx((x1 - 0.2, y1 - 0.3))
+    # Panel limits are left alone
+    assert axes[0].get_xlim() == (0, 100)
+    assert axes[0].get_ylim() == (100, 0)
+
+
+@pytest.mark.parametrize("corner", ["lower left", "upper right", "upper left"])
+def test_corners(montage, corner):
+    fig, axes = montage
+    group = add_scalebars(axes[:1], 20, (0.1, 0.1), corner=corner, orientation="v")
+    ax = axes[0]
+    x0, y0, x1, y1 = ax.get_location()
+    xs, ys = group.lines[0].get_data()
+    anchor = cm_position(ax, (xs[0], ys[0]))
+    vertical, horizontal = corner.split()
+    expected = (
+        x1 - 0.1 if horizontal == "right" else x0 + 0.1,
+        y1 - 0.1 if vertical == "lower" else y0 + 0.1,
+    )
+    assert anchor == pytest.approx(expected)
+    # The bar runs into the panel
+    other_end = cm_position(ax, (xs[1], ys[1]))
+    assert y0 < other_end[1] < y1
+
+
+def test_move_and_style(montage):
+    fig, axes = montage
+    group = add_scalebars(axes, 50, (0.2, 0.2))
+    group.move((0.5, 0.5), corner="upper left")
+    x0, y0, _, _ = axes[5].get_location()
+    xs, ys = group.lines[5].get_data()
+    assert cm_position(axes[5], (min(xs), ys[0])) == pytest.approx((x0 + 0.5, y0 + 0.5))
+
+    group.set_style(linewidth=3, color="white", fontsize=6)
+    group.set_text("0.05 mm")
+    assert all(line.get_linewidth() == 3 for line in group.lines)
+    assert all(text.get_fontsize() == 6 for text in group.texts)
+    assert group.texts[-1].get_text() == "0.05 mm"
+    fig.export_bytes("png", dpi=50)
+
+    group.remove()
+    assert len(group) == 0
+    assert all(len(ax.artists) == 0 for ax in axes)
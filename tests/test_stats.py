@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout import stats
+
+
+@pytest.fixture
+def groups():
+    rng = np.random.default_rng(0)
+    return [rng.normal(mean, 1, size) for mean, size in [(0, 12), (0.2, 9), (3, 15)]]
+
+
+def test_distributions():
+    t = np.array([0, 0.5, 1, 3, 10, 100])
+    # Closed forms of the t distribution with 1 and 2 degrees of freedom
+    np.testing.assert_allclose(stats.t_pvalue(t, 1), 1 - 2 / np.pi * np.arctan(t))
+    np.testing.assert_allclose(stats.t_pvalue(t, 2), 1 - t / np.sqrt(2 + t**2))
+    assert stats.t_pvalue(2.042272456, 30) == pytest.approx(0.05)
+    assert stats.t_pvalue(np.inf, 3) == 0
+    assert np.isnan(stats.t_pvalue(np.nan, 3))
+    z = np.array([0, 1, 1.959964, 5])
+    expected = [math.erfc(value / math.sqrt(2)) for value in z]
+    np.testing.assert_allclose(stats.normal_pvalue(z), expected, rtol=2e-7)
+
+
+def test_t_tests(groups):
+    groups[1][0] = np.nan
+    welch = stats.pairwise_tests(groups, correction=None)
+    student = stats.pairwise_tests(groups, test="student", correction=None)
+    assert welch.pairs.tolist() == [[0, 1], [0, 2], [1, 2]]
+    for k, (i, j) in enumerate(welch.pairs):
+        x, y = (group[~np.isnan(group)] for group in (groups[i], groups[j]))
+        se_x, se_y = x.var(ddof=1) / len(x), y.var(ddof=1) / len(y)
+        t = (x.mean() - y.mean()) / math.sqrt(se_x + se_y)
+        df = (se_x + se_y) ** 2 / (se_x**2 / (len(x) - 1) + se_y**2 / (len(y) - 1))
+        assert welch.statistic[k] == pytest.approx(t)
+        assert welch.pvalues[k] == pytest.approx(stats.t_pvalue(t, df))
+        pooled = ((len(x) - 1) * x.var(ddof=1) + (len(y) - 1) * y.var(ddof=1)) / (
+            len(x) + len(y) - 2
+        )
+        t = (x.mean() - y.mean()) / math.sqrt(pooled * (1 / len(x) + 1 / len(y)))
+        assert student.statistic[k] == pytest.approx(t)
+    assert welch.significant.tolist() == [False, True, True]
+
+
+def test_mann_whitney():
+    rng = np.random.default_rng(1)
+    groups = [rng.integers(0, 6, size).astype(float) for size in (7, 9, 12, 5)]
+    result = stats.pairwise_tests(groups, test="mannwhitney", correction=None)
+    for (i, j), u, p in zip(result.pairs, result.statistic, result.pvalues):
+        x, y = groups[i], groups[j]
+        assert u == sum((a > b) + 0.5 * (a == b) for a in x for b in y)
+        # Normal approximation with tie and continuity corrections
+        _, ties = np.unique(np.concatenate([x, y]), return_counts=True)
+        n = len(x) + len(y)
+        sigma = math.sqrt(
+            len(x) * len(y) / 12 * (n + 1 - (ties**3 - ties).sum() / (n * (n - 1))),
+        )
+        z = max(abs(u - len(x) * len(y) / 2) - 0.5, 0) / sigma
+        assert p == pytest.approx(math.erfc(z / math.sqrt(2)), rel=1e-6)
+
+
+def test_corrections_and_stars():
+    pvalues = [0.01, 0.04, 0.03, 0.005]
+    np.testing.assert_allclose(
+        stats.correct(pvalues, "bonferroni"), [0.04, 0.16, 0.12, 0.02],
+    )
+    np.testing.assert_allclose(stats.correct(pvalues, "holm"), [0.03, 0.06, 0.06, 0.02])
+    np.testing.assert_allclose(
+        stats.correct(pvalues, "fdr_bh"), [0.02, 0.04, 0.04, 0.02],
+    )
+    np.testing.assert_allclose(
+        stats.correct([0.3, np.nan, 0.4], "bonferroni"), [0.6, np.nan, 0.8],
+    )
+    assert stats.stars([0.0005, 0.001, 0.02, 0.2, np.nan]).tolist() == [
+        "***", "**", "*", "ns", "ns",
+    ]
+    with pytest.raises(ValueError, match="Correction must be one of"):
+        stats.correct(pvalues, "sidak")
+
+
+def test_compare(groups):
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 8)
+    ax = fig.add_panel((1, 3, 7, 7))
+    ax.boxplot(groups, positions=[1, 2, 4])
+    limits = ax.get_xlim(), ax.get_ylim()
+    result = stats.compare(ax, groups, positions=[1, 2, 4])
+    brackets = result.brackets
+    # Only significant pairs, the shorter bracket below
+    assert len(brackets) == 2
+    assert brackets.x0.tolist() == [1, 2]
+    assert brackets.x1.tolist() == [4, 4]
+    step = scilayout.style.params["stats.step"]
+    assert brackets.y.tolist() == pytest.approx([1.05 + step, 1.05])
+    assert brackets.labels.tolist() == result.stars[result.significant].tolist()
+    assert (ax.get_xlim(), ax.get_ylim()) == limits
+    assert brackets in ax.get_children()
+
+    # Drawn above the panel, and kept in tight exports
+    extent = brackets.get_window_extent()
+    assert extent.y0 > ax.get_window_extent().y1
+    assert fig.get_tightbbox().y1 == pytest.approx(extent.y1 / fig.dpi)
+    svg = bytes(fig.export_bytes("svg")).decode()
+    assert '<g id="statsbrackets' in svg
+
+    shown = stats.compare(ax, groups, positions=[1, 2, 4], show_ns=True, step=0.1)
+    assert len(shown.brackets) == 3
+    assert sorted(shown.brackets.y) == pytest.approx([1.05, 1.15, 1.25])
+
+
+def test_many_groups():
+    rng = np.random.default_rng(2)
+    groups = [rng.normal(k / 50, 1, 20) for k in range(200)]
+    for test in stats.TESTS:
+        result = stats.pairwise_tests(groups, test=test, correction="fdr_bh")
+        assert result.pairs.shape == (200 * 199 // 2, 2)
+        assert ((result.adjusted >= result.pvalues) & (result.adjusted <= 1)).all()
+    assert result.significant.any()
+
+    fig = scilayout.Figure()
+    ax = fig.add_panel((1, 1, 10, 8))
+    ax.set_xlim(-1, 200)
+    result = stats.compare(ax, groups, pairs=[(k, k + 20) for k in range(180)])
+    assert len(result.pairs) == 180
+    fig.export_bytes("png")
+
+
+def test_invalid(groups):
+    fig = scilayout.Figure()
+    ax = fig.add_panel((1, 1, 5, 5))
+    with pytest.raises(ValueError, match="Test must be one of"):
+        stats.compare(ax, groups, test="anova")
+    with pytest.raises(ValueError, match="two different groups"):
+        stats.compare(ax, groups, pairs=[(0, 0)])
+    with pytest.raises(ValueError, match="one position for each group"):
+        stats.compare(ax, groups, positions=[0, 1])
@@ -0,0 +1,147 @@
+"""Tests for rendering png and tiff exports in strips."""
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import scilayout
+from scilayout import base, strips
+
+DPI = 150
+
+
+@pytest.fixture
+def fig():
+    fig = scilayout.Figure()
+    fig.set_size_cm(12, 12)
+    rng = np.random.default_rng(0)
+    ax = fig.add_panel((1.5, 1, 11, 5.5), panellabel="a")
+    ax.plot(rng.random(2000), lw=2)
+    ax.scatter(rng.random(40) * 2000, rng.random(40))
+    ax = fig.add_panel((1.5, 7, 5.5, 11), panellabel="b")
+    ax.imshow(rng.random((10, 10)))
+    ax.set_title("an image")
+    ax = fig.add_panel((7, 7, 11, 11), panellabel="c")
+    ax.fill_between(np.arange(10), rng.random(10), hatch="//", alpha=0.5)
+    return fig
+
+
+def premultiplied(image):
+    """Colours weighted by alpha, as fully transparent pixels have no colour."""
+    return image[..., :3].astype(int) * image[..., 3:] // 255
+
+
+def assert_same_image(image, expected):
+    """Images match, up to rounding of a few antialiased edges of strokes."""
+    assert image.shape == expected.shape
+    difference = np.abs(premultiplied(image) - premultiplied(expected))
+    assert difference.max() <= 1
+    assert np.count_nonzero(difference) < 1e-4 * difference.size
+
+
+def export(fig, file_format, **kwargs):
+    buffer = BytesIO()
+    base.savefigure(fig, buffer, dpi=DPI, format=file_format, **kwargs)
+    with Image.open(buffer) as image:
+        return np.asarray(image.convert("RGBA"))
+
+
+@pytest.mark.parametrize("file_format", ["png", "tif"])
+@pytest.mark.parametrize("strip_height", [29, 500])
+def test_matches_full_render(fig, file_format, strip_height):
+    assert_same_image(
+        export(fig, file_format, strip_height=strip_height),
+        export(fig, file_format),
+    )
+
+
+def test_whole_figure(fig):
+    for bbox in ("tight", None):
+        full = export(fig, "png", bbox=bbox)
+        np.testing.assert_array_equal(
+            export(fig, "png", bbox=bbox, strip_height=len(full)), full,
+        )
+
+
+def test_without_strokes():
+    fig = scilayout.Figure()
+    fig.set_size_cm(8, 8)
+    rng = np.random.default_rng(1)
+    ax = fig.add_panel((1, 1, 7, 7), panellabel="a")
+    ax.imshow(rng.random((30, 30)))
+    ax.fill_between(np.arange(30), rng.random(30) * 10, hatch="x", alpha=0.5)
+    ax.set_title("no strokes crossing strips")
+    np.testing.assert_array_equal(
+        export(fig, "png", strip_height=37), export(fig, "png"),
+    )
+
+
+def test_png_file(fig, tmp_path):
+    base.savefigure(fig, tmp_path / "figure.png", dpi=DPI, strip_height=64)
+    with Image.open(tmp_path / "figure.png") as image:
+        assert image.mode == "RGBA"
+        assert image.info["dpi"] == pytest.approx((DPI, DPI), abs=0.02)
+        assert "Software" not in image.info
+
+
+def test_tiff_file(fig, tmp_path):
+    base.savefigure(fig, tmp_path / "figure.tiff", dpi=DPI, strip_height=64)
+    with Image.open(tmp_path / "figure.tiff") as image:
+        assert image.mode == "RGBA"
+        assert image.info["compression"] == "tiff_adobe_deflate"
+        assert image.info["dpi"] == pytest.approx((DPI, DPI), abs=0.02)
+        image.load()
+
+
+def test_strips_are_bounded(fig):
+    height = 64
+    renderers = []
+    draw = fig.draw
+
+    def recording_draw(renderer):
+        renderers.append(renderer)
+        draw(renderer)
+
+    fig.draw = recording_draw
+    fig.set_dpi(DPI)
+    rows = [len(strip) for strip in strips.render_strips(fig, height)]
+    assert sum(rows) == int(fig.bbox.height)
+    assert max(rows) == height
+    assert max(r.height for r in renderers) <= height + 3 * DPI
+
+
+@pytest.mark.parametrize("profile", sorted(strips.PNG_PROFILES))
+def test_png_profiles(fig, profile):
+    expected = export(fig, "png")
+    np.testing.assert_array_equal(export(fig, "png", png_profile=profile), expected)
+    assert_same_image(
+        export(fig, "png", png_profile=profile, strip_height=200), expected,
+    )
+
+
+def test_png_profile_sizes(fig):
+    sizes = {}
+    for profile in (None, *strips.PNG_PROFILES):
+        sizes[profile] = len(fig.export_bytes("png", dpi=DPI, png_profile=profile))
+    assert sizes["small"] < min(sizes[None], sizes["parallel"])
+    assert sizes["fast"] > sizes[None]
+
+
+def test_parallel_pieces():
+    # Random rows leave nothing to compress, and several threads write pieces
+    rng = np.random.default_rng(2)
+    image = rng.integers(0, 256, (3 * strips._PARALLEL_ROWS + 5, 50, 4), np.uint8)
+    buffer = BytesIO()
+    strips.write_png(
+        buffer, iter(np.split(image, [100, 300])), 50, len(image), 72, workers=3,
+    )
+    buffer.seek(0)
+    with Image.open(buffer) as decoded:
+        np.testing.assert_array_equal(np.asarray(decoded), image)
+
+
+def test_unknown_png_profile(fig):
+    with pytest.raises(ValueError, match="Unknown png profile"):
+        export(fig, "png", png_profile="tiny")
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+import pytest
+
+from scilayout import style
+
+
+@pytest.fixture(autouse=True)
+def _reset_style():
+    yield
+    style.reset()
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text(json.dumps({"panellabel.fontsize": 9, "scalebars.fontsize": 6}))
+    return path
+
+
+class TestStyleSheets:
+    def test_use_and_reset(self, sheet):
+        style.use(sheet)
+        assert style.params["panellabel.fontsize"] == 9
+        assert style.params["scalebars.fontsize"] == 6
+        style.reset()
+        assert style.params == style.defaultstyles
+
+    def test_invalid_keys(self):
+        path = os.path.join(os.path.dirname(__file__), "teststyle.json")
+        with pytest.raises(ValueError, match="Invalid keys"):
+            style.use(path)
+        style.use(path, allow_only_valid_keys=False)
+        assert "test.ignore" not in style.params
+
+    def test_parsed_once(self, sheet, monkeypatch):
+        style.use(sheet)
+        monkeypatch.setattr(style.json, "load", lambda f: pytest.fail("re-parsed"))
+        style.use(sheet)
+        assert style.params["panellabel.fontsize"] == 9
+
+    def test_cache_invalidated_on_change(self, sheet):
+        style.use(sheet)
+        sheet.write_text(json.dumps({"panellabel.fontsize": 7}))
+        stat = sheet.stat()
+        os.utime(sheet, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        style.use(sheet)
+        assert style.params["panellabel.fontsize"] == 7
+
+    def test_layers(self, sheet):
+        style.use([sheet, {"panellabel.fontsize": 14}])
+        assert style.params["panellabel.fontsize"] == 14
+        assert style.params["scalebars.fontsize"] == 6
+
+    def test_compose_does_not_modify_cache(self, sheet):
+        config = style.compose(sheet, {"panellabel.fontsize": 14})
+        assert config["panellabel.fontsize"] == 14
+        assert style.compose(sheet)["panellabel.fontsize"] == 9
+
+    def test_package_resource(self, tmp_path, monkeypatch):
+        package = tmp_path / "journalstyles"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "nature.json").write_text(json.dumps({"panellabel.case": "lower"}))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        style.use(style.resource("journalstyles", "nature.json"))
+        assert style.params["panellabel.case"] == "lower"
+
+
+class TestContext:
+    def test_changes_stay_in_context(self, sheet):
+        with style.context(sheet):
+            assert style.params["panellabel.fontsize"] == 9
+            style.params["scalebars.fontsize"] = 4
+            assert style.params["scalebars.fontsize"] == 4
+        assert style.params == style.defaultstyles
+
+    def test_starts_from_current_params(self, sheet):
+        style.use(sheet)
+        with style.context({"panellabel.fontsize": 14}):
+            assert style.params["panellabel.fontsize"] == 14
+            assert style.params["scalebars.fontsize"] == 6
+            style.reset()
+            assert style.params == style.defaultstyles
+        assert style.params["panellabel.fontsize"] == 9
+
+    def test_threads_are_isolated(self):
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def work(size):
+            with style.context({"panellabel.fontsize": size}):
+                barrier.wait()  # both contexts are active at once
+                seen[size] = style.params["panellabel.fontsize"]
+
+        threads = [threading.Thread(target=work, args=(size,)) for size in (5, 20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert seen == {5: 5, 20: 20}
+        assert style.params == style.defaultstyles
@@ -0,0 +1,72 @@
+"""Tests for exporting figures from a pool of threads."""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pytest
+
+import scilayout
+from scilayout import style
+
+STYLES = [
+    {"panellabel.fontsize": 7, "scalebars.fontsize": 5, "panellabel.case": "upper"},
+    {"panellabel.fontsize": 12, "scalebars.fontsize": 9, "panellabel.case": "lower"},
+    {"panellabel.fontsize": 9, "scalebars.linewidth": 2},
+]
+
+
+def make_figure(n, journal_style):
+    with style.context(journal_style):
+        fig = scilayout.Figure()
+        fig.set_size_cm(6, 4)
+        ax = fig.add_panel((1, 0.5, 5.5, 3.5), panellabel="a")
+        ax.plot(np.sin(np.linspace(0, n, 200)))
+        scilayout.scalebars.add_scalebars([ax], 50, unit="ms")
+    return fig
+
+
+def jobs(tmp_path, n):
+    return [
+        (
+            partial(make_figure, i, STYLES[i % len(STYLES)]),
+            tmp_path / f"figure_{i}.{'svg' if i % 2 else 'png'}",
+        )
+        for i in range(n)
+    ]
+
+
+def test_mixed_styles_match_serial(tmp_path):
+    serial = scilayout.export_threaded(jobs(tmp_path / "serial", 12), workers=1)
+    threaded = scilayout.export_threaded(jobs(tmp_path / "threaded", 12), workers=6)
+    assert [path.name for path in threaded] == [path.name for path in serial]
+    for a, b in zip(serial, threaded):
+        assert a.read_bytes() == b.read_bytes(), a.name
+    # Styles used inside the jobs do not leak out
+    assert style.params == style.defaultstyles
+
+
+def test_label_uses_thread_style():
+    figures = {}
+
+    def build(i):
+        figures[i] = make_figure(i, STYLES[i % len(STYLES)])
+        return figures[i]
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(build, range(18)))
+    for i, fig in figures.items():
+        label = fig.get_axes()[0].panellabel.text
+        journal_style = STYLES[i % len(STYLES)]
+        assert label.get_fontsize() == journal_style["panellabel.fontsize"]
+        upper = journal_style.get("panellabel.case") == "upper"
+        assert label.get_text() == ("A" if upper else "a")
+
+
+def test_pyplot_figure_rejected(tmp_path):
+    fig = scilayout.figure()
+    try:
+        with pytest.raises(ValueError, match="pyplot"):
+            scilayout.export_threaded([(fig, tmp_path / "figure.png")])
+    finally:
+        fig.close()